@@ -1,41 +1,37 @@
 import streamlit as st
-import json
-import os
+
+from app.services.user_service import (register_user, login_user, migrate_legacy_users,
+                                       start_session, current_user, end_session)
 
 st.set_page_config(page_title="Login", layout="centered")
 
-USERS_FILE = "users.json"
+
+@st.cache_resource
+def migrate_once():
+    """Copy users.json / DATA/users.txt accounts into the users table (once per server)."""
+    return migrate_legacy_users()
+
+
+migrate_once()
 
 # --- LOGOUT HANDLER FUNCTION ---
 def logout():
-    """Clears the session state to log the user out."""
+    """Ends the server-side session and clears the session state."""
+    end_session(st.session_state.get("session_token"))
+    st.session_state.session_token = None
     st.session_state.logged_in = False
     st.session_state.username = ""
     # Updated to the current, recommended function
     st.rerun()
 # --------------------------------
 
-# LOAD USERS FROM FILE
-def load_users():
-    if os.path.exists(USERS_FILE):
-        with open(USERS_FILE, "r") as file:
-            return json.load(file)
-    return {}
-
-# SAVE USERS TO FILE
-def save_users(users_dict):
-    with open(USERS_FILE, "w") as file:
-        json.dump(users_dict, file, indent=4)
-
-# Load persistent users
-persistent_users = load_users()
-
 # SESSION INITIALIZATION
-if "logged_in" not in st.session_state:
-    st.session_state.logged_in = False
-
-if "username" not in st.session_state:
-    st.session_state.username = ""
+# only the session token lives in the browser session; the user comes from the store
+session = current_user(st.session_state.get("session_token"))
+st.session_state.logged_in = session is not None
+st.session_state.username = session[0] if session else ""
+if session is None:
+    st.session_state.session_token = None
 
 # --- CONDITIONAL LOGOUT SECTION ---
 if st.session_state.logged_in:
@@ -61,7 +57,9 @@ with login_tab:
     password = st.text_input("Password", type="password")
 
     if st.button("Sign In"):
-        if username in persistent_users and persistent_users[username] == password:
+        ok, _ = login_user(username, password)
+        if ok:
+            st.session_state.session_token = start_session(username)
             st.session_state.logged_in = True
             st.session_state.username = username
             st.success("You are now logged in!")
@@ -83,11 +81,9 @@ with register_tab:
             st.warning("Please fill in all fields.")
         elif new_pass != confirm:
             st.error("Passwords do not match.")
-        elif new_user in persistent_users:
-            st.error("That username already exists.")
         else:
-            # Save new user permanently
-            persistent_users[new_user] = new_pass
-            save_users(persistent_users)
-
-            st.success("Account created successfully! Switch to Login tab to sign in.") 
\ No newline at end of file
+            ok, message = register_user(new_user, new_pass)
+            if ok:
+                st.success("Account created successfully! Switch to Login tab to sign in.")
+            else:
+                st.error("That username already exists.")
@@ -1,11 +1,15 @@
 import streamlit as st
-import pandas as pd
 from pathlib import Path
 
+from app.data.sidecar import read_table_cached
+from app.ui.tables import paginated_csv_table
+from app.data.stats import summarize_csv
+from app.services.user_service import current_user, end_session
+
 st.set_page_config(page_title="Dashboard", layout="wide")
 
 # --- PAGE ACCESS CONTROL ---
-if "logged_in" not in st.session_state or st.session_state.logged_in is False:
+if current_user(st.session_state.get("session_token")) is None:
     st.error("Access denied. Please log in first.")
     if st.button("Return to Login Page"):
         st.switch_page("Home.py")
@@ -19,6 +23,8 @@ st.write("Welcome to your Week 09 dashboard area.")
 st.divider()
 
 if st.button("Sign Out"):
+    end_session(st.session_state.get("session_token"))
+    st.session_state.session_token = None
     st.session_state.logged_in = False
     st.session_state.username = ""
     st.info("You have been signed out.")
@@ -43,17 +49,18 @@ st.subheader("CSV Tables")
 if not csv_files:
     st.info("No CSV files found in project root or DATA/ folder.")
 else:
+    exact_stats = st.toggle("Exact summary statistics", value=False,
+                            help="Off: one streaming pass with sketches, cached per file version.")
     for fp in csv_files:
         st.markdown(f"**{fp.name}** — {fp}")
         try:
-            df = pd.read_csv(fp)
+            paginated_csv_table(fp, key=f"dash_{fp.name}")
         except Exception as e:
             st.error(f"Failed to read {fp.name}: {e}")
             continue
-        st.dataframe(df.head(10), use_container_width=True)
-        st.caption(f"Showing first 10 rows of {fp.name} — {len(df)} rows × {len(df.columns)} columns.")
         try:
-            summary = df.describe(include="all").transpose().fillna("")
+            frame = read_table_cached(fp) if exact_stats else None
+            summary = summarize_csv(fp, exact=exact_stats, frame=frame).astype(object).fillna("")
             st.table(summary)
         except Exception:
             pass
\ No newline at end of file
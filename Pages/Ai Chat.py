@@ -1,19 +1,16 @@
 import streamlit as st
-import pandas as pd
 from pathlib import Path
-import importlib
 import os
 
-# Support both new (openai>=1.0.0) and legacy (openai<1.0.0) packages.
-try:
-    openai_mod = importlib.import_module("openai")
-    OpenAI = getattr(openai_mod, "OpenAI", None)
-    has_openai_v1 = OpenAI is not None
-    openai_legacy = openai_mod
-except Exception:
-    OpenAI = None
-    has_openai_v1 = False
-    openai_legacy = None
+from app.data.sidecar import read_table_cached
+from app.services.chat_service import (
+    DEFAULT_MODEL, ChatStream, ResponseCache, context_digest, dataset_fingerprint, make_client,
+    response_cache,
+)
+from app.data.retrieval import search
+from app.services.context_builder import (
+    DEFAULT_TOKEN_BUDGET, build_messages, find_dataset, format_hits, get_digest,
+)
 
 # ------------------------------------------------------
 # STREAMLIT SETUP
@@ -33,21 +30,9 @@ except Exception:
 if not api_key:
     api_key = os.environ.get("OPENAI_API_KEY")
 
-# Build client for either new or legacy SDK
-client = None
-if api_key:
-    if has_openai_v1 and OpenAI is not None:
-        client = OpenAI(api_key=api_key)
-    else:
-        # Legacy client: set the api_key on the module and use it directly as `client`.
-        if openai_legacy is not None:
-            openai_legacy.api_key = api_key
-            client = openai_legacy
-        else:
-            client = None
-else:
-    client = None
-MODEL_NAME = "gpt-4o-mini"
+# OPENAI_BASE_URL points the page at another compatible server (e.g. a local one)
+client = make_client(api_key, os.environ.get("OPENAI_BASE_URL"))
+MODEL_NAME = DEFAULT_MODEL
 
 # ------------------------------------------------------
 # DATA SELECTION
@@ -60,39 +45,21 @@ choice = st.selectbox(
     ["Cyber Incidents", "Datasets metadata", "IT tickets"]
 )
 
-def find_preview(choice):
-    files = []
-
-    if choice == "Cyber Incidents":
-        files = list(data_dir.glob("cyber_incidents*.csv")) + list(base_dir.glob("cyber_incidents*.csv"))
-    elif choice == "IT tickets":
-        files = list(data_dir.glob("it_tickets*.csv")) + list(base_dir.glob("it_tickets*.csv"))
-    else:
-        files = (
-            list(data_dir.glob("*metadata*.csv"))
-            + list(data_dir.glob("*meta*.csv"))
-            + list(base_dir.glob("*metadata*.csv"))
-            + list(base_dir.glob("*.csv"))
-        )
+budget = st.sidebar.slider("Context budget (tokens)", 500, 8000, DEFAULT_TOKEN_BUDGET, step=250)
 
-    if not files:
-        return None, None, None
-
-    fp = files[0]
+fp = find_dataset(choice, data_dir, base_dir)
+digest = None
+if fp:
     try:
-        df = pd.read_csv(fp, nrows=20)
-        preview_csv = df.head(10).to_csv(index=False)
-        meta = {"path": str(fp), "columns": list(df.columns)}
-        return fp, preview_csv, meta
+        # computed once per file version, not on every rerun
+        digest = get_digest(fp)
     except Exception as e:
-        return fp, None, {"error": str(e)}
-
-fp, preview_csv, meta = find_preview(choice)
+        st.warning(f"Could not summarise {fp.name}: {e}")
 
 if fp:
     st.markdown(f"**Using:** `{fp}`")
     if st.checkbox("Show table preview"):
-        st.dataframe(pd.read_csv(fp).head(10), use_container_width=True)
+        st.dataframe(read_table_cached(fp).head(10), use_container_width=True)
 else:
     st.info("No CSV found for selected context.")
 
@@ -122,86 +89,78 @@ if st.button("Clear conversation"):
 # ------------------------------------------------------
 system_prompt = (
     "You are a concise and helpful AI assistant. "
-    "Use the dataset context when answering."
+    "Use the dataset context and matching records when answering."
 )
 
-if preview_csv:
-    system_prompt += f"\n\nDataset preview:\n{preview_csv[:3000]}"
-
-messages = [{"role": "system", "content": system_prompt}]
-messages.extend(st.session_state.ai_history)
 
 # ------------------------------------------------------
-# SEND MESSAGE (STREAMING)
+# SEND MESSAGE (STREAMING IN THE BACKGROUND)
 # ------------------------------------------------------
-if send and user_input.strip():
-    st.session_state.ai_history.append(
-        {"role": "user", "content": user_input}
-    )
-    messages.append({"role": "user", "content": user_input})
-
-    out_box = st.empty()
-    partial = ""
+def show_api_error(e):
+    # Surface a clearer message and hint for migration
+    msg = str(e)
+    if "ChatCompletion" in msg and "no longer supported" in msg:
+        st.error("OpenAI SDK migration issue: your environment is using a mixture of old and new OpenAI SDK APIs.\nTry running `pip install --upgrade openai` to use the new API or pin to the old interface with `pip install openai==0.28`.")
+    else:
+        st.error(f"API error: {e}")
 
-    try:
-        # Prefer the modern OpenAI client (v1+)
-        if hasattr(client, "chat") and hasattr(client.chat, "completions"):
-            stream = client.chat.completions.create(
-                model=MODEL_NAME,
-                messages=messages,
-                temperature=0.2,
-                stream=True,
-            )
-        else:
-            # Fallback for older openai packages that expose ChatCompletion
-            # (this will work if openai.ChatCompletion exists)
-            try:
-                import openai as _openai
-                stream = _openai.ChatCompletion.create(model=MODEL_NAME, messages=messages, temperature=0.2, stream=True)
-            except Exception as e2:
-                raise
-
-        for chunk in stream:
-            # Support multiple possible chunk shapes from different SDK versions
-            content_piece = None
-            # new-style: object with .choices[0].delta.content
-            try:
-                if hasattr(chunk, "choices") and chunk.choices:
-                    ch0 = chunk.choices[0]
-                    # delta content (chat streaming)
-                    if hasattr(ch0, "delta") and getattr(ch0.delta, "content", None) is not None:
-                        content_piece = ch0.delta.content
-                    # legacy text field
-                    elif getattr(ch0, "text", None) is not None:
-                        content_piece = ch0.text
-            except Exception:
-                content_piece = None
-
-            # dict-like fallback
-            if content_piece is None:
-                try:
-                    # chunk may be a dict
-                    if isinstance(chunk, dict):
-                        choices = chunk.get("choices") or []
-                        if choices:
-                            delta = choices[0].get("delta") or {}
-                            content_piece = delta.get("content") or choices[0].get("text")
-                except Exception:
-                    content_piece = None
-
-            if content_piece:
-                partial += content_piece
-                out_box.markdown(partial.replace("\n", "  \n"))
-
-        st.session_state.ai_history.append({"role": "assistant", "content": partial})
 
-    except Exception as e:
-        # Surface a clearer message and hint for migration
-        msg = str(e)
-        if "ChatCompletion" in msg and "no longer supported" in msg:
-            st.error("OpenAI SDK migration issue: your environment is using a mixture of old and new OpenAI SDK APIs.\nTry running `pip install --upgrade openai` to use the new API or pin to the old interface with `pip install openai==0.28`.")
-        else:
-            st.error(f"API error: {e}")
+if send and user_input.strip() and "ai_stream" not in st.session_state:
+    if client is None:
+        st.error("No OpenAI API key configured.")
+    else:
+        try:
+            hits = search(user_input, k=5, csv_paths=sorted(data_dir.glob("*.csv")))
+        except Exception:
+            hits = []  # answer without grounding rather than fail the turn
+        messages = build_messages(system_prompt, st.session_state.ai_history, user_input, digest, budget,
+                                  retrieved=format_hits(hits))
+        # the key covers the context actually sent, so new rows or hits miss the cache
+        cache_key = ResponseCache.key(dataset_fingerprint(fp), user_input,
+                                      context_digest(messages, MODEL_NAME))
+        st.session_state.ai_history.append({"role": "user", "content": user_input})
+        # the request runs in a thread; this script run ends straight away
+        st.session_state.ai_stream = ChatStream(client, messages, MODEL_NAME, 0.2,
+                                                cache=response_cache, cache_key=cache_key)
+
+
+def finish_stream(stream):
+    del st.session_state.ai_stream
+    if stream.error is not None:
+        st.session_state.ai_error = stream.error
+    if stream.text:
+        st.session_state.ai_history.append({"role": "assistant", "content": stream.text})
+
+
+def show_stream():
+    stream = st.session_state.get("ai_stream")
+    if stream is None:
+        return
+    stream.drain()
+    st.markdown(stream.text.replace("\n", "  \n") or "_Thinking..._")
+    if stream.done:
+        finish_stream(stream)
+        st.rerun()
+
+
+if "ai_stream" in st.session_state:
+    if st.button("Stop"):
+        stream = st.session_state.ai_stream
+        stream.cancel()
+        finish_stream(stream)
+        st.rerun()
+    if hasattr(st, "fragment"):
+        # re-render only this block a few times a second while tokens arrive
+        st.fragment(run_every=0.25)(show_stream)()
+    else:
+        out_box = st.empty()
+        stream = st.session_state.ai_stream
+        for _ in stream.tokens():
+            out_box.markdown(stream.text.replace("\n", "  \n"))
+        finish_stream(stream)
+
+if "ai_error" in st.session_state:
+    show_api_error(st.session_state.pop("ai_error"))
 
 # ------------------------------------------------------
 # SHOW RECENT CONVERSATION
@@ -3,22 +3,34 @@ import pandas as pd
 from pathlib import Path
 import plotly.express as px
 
+from app.data.sidecar import read_table_cached
+from app.data.db import get_connection, read_connection
+from app.data.ticket_aggregates import sync_csv_rollups, read_rollup, csv_source
+from app.data.trend_rollups import GRAINS, install_trend_rollups, read_trend
+from app.services.kpi_service import get_kpis
+from app.services.ticket_analytics import ticket_report
+from app.services.user_service import current_user
+
 st.set_page_config(page_title="Analytics", layout="wide")
 
 # --- PAGE AUTHENTICATION ---
-if "logged_in" not in st.session_state or st.session_state.logged_in is False:
+if current_user(st.session_state.get("session_token")) is None:
     st.error("You need to sign in to continue.")
     st.stop()
 
 st.title("📈 Analytics Overview")
 
-col1, col2, col3 = st.columns(3)
-with col1:
-    st.metric("Current Threats", 14, "+2")
-with col2:
-    st.metric("Incidents Closed", 32, "+5")
-with col3:
-    st.metric("Pending Tickets", 6, "-1")
+# live KPIs (one query, cached for a few seconds across sessions)
+try:
+    kpis = get_kpis()
+except Exception as e:
+    kpis = []
+    st.warning(f"KPIs unavailable: {e}")
+
+for col, kpi in zip(st.columns(3), kpis):
+    with col:
+        delta = None if kpi["delta"] is None else f"{kpi['delta']:+d}"
+        st.metric(kpi["label"], kpi["value"], delta)
 
 # quick sample chart
 data = pd.DataFrame({"Time": ["Mon", "Tue", "Wed", "Thu", "Fri"], "CPU Usage": [45, 55, 70, 60, 50]})
@@ -41,7 +53,7 @@ else:
     for fp in csv_files:
         st.markdown(f"### {fp.name}")
         try:
-            df = pd.read_csv(fp)
+            df = read_table_cached(fp)
         except Exception as e:
             st.error(f"Failed to read {fp.name}: {e}")
             continue
@@ -52,6 +64,7 @@ else:
         dt_cols = [c for c in df.columns if pd.api.types.is_datetime64_any_dtype(df[c])]
         # try parsing common date-like columns
         if not dt_cols:
+            df = df.copy()  # cached frame is shared, don't convert it in place
             for c in df.columns:
                 if "date" in c.lower() or "time" in c.lower():
                     try:
@@ -139,47 +152,85 @@ else:
     tickets_path = base_dir / "DATA" / "it_tickets.csv"
     if tickets_path.exists():
         try:
-            tickets = pd.read_csv(tickets_path, parse_dates=["created_date", "resolved_date"], infer_datetime_format=True)
+            # charts read precomputed rollups (rebuilt only if the CSV changed outside the CRUD helpers)
+            with get_connection() as conn:
+                sync_csv_rollups(conn, tickets_path, loader=read_table_cached)
+            source = csv_source(tickets_path)
+            with read_connection() as conn:
+                prio = read_rollup(conn, source, "priority")
+                status_prio = read_rollup(conn, source, "status_priority")
+                assigned = read_rollup(conn, source, "assigned_to")
             st.divider()
             st.subheader("Additional Visualizations (from it_tickets.csv)")
 
             # 1) Tickets by priority (bar)
-            if "priority" in tickets.columns:
-                prio = tickets["priority"].fillna("N/A").value_counts().reset_index()
-                prio.columns = ["priority", "count"]
+            if not prio.empty:
+                prio = prio.sort_values("count", ascending=False)
                 fig_prio = px.bar(prio, x="priority", y="count", color="priority", title="Tickets by Priority")
                 st.plotly_chart(fig_prio, use_container_width=True)
 
             # 2) Status by priority (grouped bar)
-            if {"status", "priority"}.issubset(tickets.columns):
-                fig_status = px.histogram(
-                    tickets.fillna("N/A"),
+            if not status_prio.empty:
+                fig_status = px.bar(
+                    status_prio,
                     x="status",
+                    y="count",
                     color="priority",
                     barmode="group",
                     title="Ticket Status grouped by Priority"
                 )
                 st.plotly_chart(fig_status, use_container_width=True)
 
-            # 3) Tickets created per month (time series)
-            if "created_date" in tickets.columns:
-                tickets["created_date"] = pd.to_datetime(tickets["created_date"], errors="coerce", infer_datetime_format=True)
-                ts = tickets.dropna(subset=["created_date"]).copy()
-                if not ts.empty:
-                    ts["month"] = ts["created_date"].dt.to_period("M").astype(str)
-                    monthly = ts.groupby("month").size().reset_index(name="count")
-                    fig_ts = px.line(monthly, x="month", y="count", title="Tickets Created per Month")
-                    fig_ts.update_xaxes(type="category")
-                    st.plotly_chart(fig_ts, use_container_width=True)
+            # 3) Tickets created per period (time series, from the trend rollups)
+            grain = st.selectbox("Ticket trend grain", list(GRAINS), index=list(GRAINS).index("month"),
+                                 key="ticket_trend_grain")
+            with read_connection() as conn:
+                trend = read_trend(conn, source, grain, by="level")
+            if not trend.empty:
+                trend = trend.rename(columns={"level": "priority"})
+                fig_ts = px.line(trend, x="period", y="count", color="priority",
+                                 title=f"Tickets Created per {grain.title()}")
+                st.plotly_chart(fig_ts, use_container_width=True)
 
             # 4) Assigned-to distribution (donut)
-            if "assigned_to" in tickets.columns:
-                assigned = tickets["assigned_to"].fillna("Unassigned").value_counts().reset_index()
-                assigned.columns = ["assigned_to", "count"]
+            if not assigned.empty:
+                assigned = assigned.sort_values("count", ascending=False)
                 fig_assign = px.pie(assigned, names="assigned_to", values="count", title="Assigned To (Donut)", hole=0.4)
                 st.plotly_chart(fig_assign, use_container_width=True)
 
+            # 5) Resolution times, backlog age and SLA breaches
+            report = ticket_report(tickets_path)
+            st.markdown("**Resolution time (days) by priority**")
+            st.dataframe(report["resolution_by_priority"].round(1), use_container_width=True)
+            aging = report["backlog_aging"].drop(columns="total").reset_index()
+            if not aging.empty:
+                aging = aging.melt(id_vars="priority", var_name="age", value_name="open tickets")
+                fig_age = px.bar(aging, x="age", y="open tickets", color="priority", title="Open Backlog by Age")
+                st.plotly_chart(fig_age, use_container_width=True)
+            sla = report["sla_by_priority"].reset_index()
+            if not sla.empty:
+                fig_sla = px.bar(sla, x="priority", y="breach_rate", title="SLA Breach Rate by Priority")
+                fig_sla.update_yaxes(tickformat=".0%")
+                st.plotly_chart(fig_sla, use_container_width=True)
+
         except Exception as e:
             st.error(f"Failed to build additional visuals from {tickets_path.name}: {e}")
     else:
-        st.info("Additional graphs skipped: DATA/it_tickets.csv not found.")
\ No newline at end of file
+        st.info("Additional graphs skipped: DATA/it_tickets.csv not found.")
+
+# --- Incident trend (cyber_incidents table, kept up to date by triggers) ---
+try:
+    with get_connection() as conn:
+        install_trend_rollups(conn, "cyber_incidents")  # no-op once installed
+    grain = st.selectbox("Incident trend grain", list(GRAINS), index=list(GRAINS).index("week"),
+                         key="incident_trend_grain")
+    with read_connection() as conn:
+        incidents_trend = read_trend(conn, "cyber_incidents", grain, by="level")
+    if not incidents_trend.empty:
+        st.divider()
+        incidents_trend = incidents_trend.rename(columns={"level": "severity"})
+        fig_inc = px.bar(incidents_trend, x="period", y="count", color="severity",
+                         title=f"Incidents per {grain.title()} by Severity")
+        st.plotly_chart(fig_inc, use_container_width=True)
+except Exception as e:
+    st.warning(f"Incident trend unavailable: {e}")
\ No newline at end of file
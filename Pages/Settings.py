@@ -1,8 +1,9 @@
 import streamlit as st
+from app.services.user_service import current_user
 
 st.set_page_config(page_title="Settings", layout="wide")
 
-if "logged_in" not in st.session_state or st.session_state.logged_in is False:
+if current_user(st.session_state.get("session_token")) is None:
     st.error("Access denied. Please log in first.")
     if st.button("Return to Login Page"):
         st.switch_page("Home.py")
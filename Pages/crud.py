@@ -1,12 +1,20 @@
 import streamlit as st
 import sqlite3
 import pandas as pd
+from datetime import date
 from pathlib import Path
 
+from app.data.db import DB_PATH, get_connection, read_connection
+from app.data.fts import RANK_WINDOW, search as fts_search
+from app.data.retrieval import sync_csv_source
+from app.data.ticket_aggregates import csv_source
+from app.ui.tables import paginated_csv_table, paginated_sqlite_table
+from app.services.user_service import current_user
+
 st.set_page_config(page_title="CRUD", layout="wide")
 
 # --- AUTH ---
-if "logged_in" not in st.session_state or not st.session_state.logged_in:
+if current_user(st.session_state.get("session_token")) is None:
     st.error("Access denied. Please sign in.")
     if st.button("Return to Login Page"):
         st.switch_page("Home.py")
@@ -18,9 +26,9 @@ base_dir = Path(__file__).parents[1]
 data_dir = base_dir / "DATA"
 data_dir.mkdir(exist_ok=True)
 
-# defaults
-incidents_db = data_dir / "incidents.db"
-cyber_db = data_dir / "cyber_incidents.db"
+# defaults: incidents live in the canonical database; the old
+# DATA/incidents.db and DATA/cyber_incidents.db are only read by migrate.py
+incidents_db = DB_PATH
 tickets_csv = data_dir / "it_tickets.csv"
 
 # try to import helpers (fall back to raw operations)
@@ -40,7 +48,7 @@ except Exception:
 st.divider()
 st.subheader("Quick Actions")
 
-col1, col2, col3 = st.columns(3)
+col1, col2 = st.columns(2)
 
 with col1:
     st.markdown("### Incidents")
@@ -51,12 +59,12 @@ with col1:
         if st.form_submit_button("Add"):
             try:
                 if add_incident_db:
-                    add_incident_db(incidents_db, title, severity, status)
+                    add_incident_db(incidents_db, title, severity, status, date.today().isoformat())
                 else:
                     conn = sqlite3.connect(str(incidents_db))
                     cur = conn.cursor()
                     cur.execute("CREATE TABLE IF NOT EXISTS cyber_incidents (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, severity TEXT, status TEXT, date TEXT)")
-                    cur.execute("INSERT INTO cyber_incidents (title,severity,status) VALUES (?,?,?)", (title, severity, status))
+                    cur.execute("INSERT INTO cyber_incidents (title,severity,status,date) VALUES (?,?,?,?)", (title, severity, status, date.today().isoformat()))
                     conn.commit()
                     conn.close()
                 st.success("Incident added")
@@ -104,96 +112,101 @@ with col2:
                 st.error(f"Add failed: {e}")
 
     with st.form("del_ticket"):
-        tid = st.text_input("Ticket id to delete", key="tic_del_id")
+        tid = st.text_input("Ticket id to delete", key="tic_del_id", placeholder="e.g. 5 or TCK0005").strip()
         if st.form_submit_button("Delete Ticket"):
             try:
                 removed = 0
                 if delete_ticket_csv:
-                    removed = delete_ticket_csv(tickets_csv, int(tid))
+                    # the ticket store resolves 5, "5" and "TCK0005" alike
+                    removed = delete_ticket_csv(tickets_csv, tid)
                 else:
                     if tickets_csv.exists():
                         df = pd.read_csv(tickets_csv)
                         before = len(df)
-                        df = df[df.get("id", pd.Series(range(len(df)))) != int(tid)]
+                        df = df[df.get("id", pd.Series(range(len(df)))).astype(str) != tid]
                         df.to_csv(tickets_csv, index=False)
                         removed = before - len(df)
                 st.info(f"Removed: {removed}")
             except Exception as e:
                 st.error(f"Delete failed: {e}")
 
-with col3:
-    st.markdown("### Cyber_Incidents")
-    with st.form("add_cy"):
-        title = st.text_input("Title", key="cy_add_title")
-        severity = st.selectbox("Severity", ["low", "medium", "high"], index=1, key="cy_add_sev")
-        status = st.selectbox("Status", ["open", "resolved", "closed"], index=0, key="cy_add_stat")
-        if st.form_submit_button("Add Cyber"):
-            try:
-                if add_incident_db:
-                    add_incident_db(cyber_db, title, severity, status)
-                else:
-                    conn = sqlite3.connect(str(cyber_db))
-                    cur = conn.cursor()
-                    cur.execute("CREATE TABLE IF NOT EXISTS cyber_incidents (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, severity TEXT, status TEXT, date TEXT)")
-                    cur.execute("INSERT INTO cyber_incidents (title,severity,status) VALUES (?,?,?)", (title, severity, status))
-                    conn.commit()
-                    conn.close()
-                st.success("Cyber incident added")
-            except Exception as e:
-                st.error(f"Add failed: {e}")
-
-    with st.form("del_cy"):
-        did = st.number_input("ID to delete", min_value=1, step=1, key="cy_del_id")
-        if st.form_submit_button("Delete Cyber"):
-            try:
-                if delete_incident_db:
-                    removed = delete_incident_db(cyber_db, int(did))
-                else:
-                    conn = sqlite3.connect(str(cyber_db))
-                    cur = conn.cursor()
-                    cur.execute("DELETE FROM cyber_incidents WHERE id = ?", (int(did),))
-                    conn.commit()
-                    removed = cur.rowcount
-                    conn.close()
-                st.info(f"Removed: {removed}")
-            except Exception as e:
-                st.error(f"Delete failed: {e}")
+st.divider()
+st.subheader("Search")
+
+SEARCH_SCOPES = {
+    "Incidents": (incidents_db, "cyber_incidents"),
+    "Tickets (CSV)": (DB_PATH, "search_docs"),
+}
+
+search_col, scope_col = st.columns([4, 1])
+with search_col:
+    query = st.text_input("Search titles and descriptions", key="crud_search",
+                          placeholder="e.g. phishing, pass, TCK0005")
+with scope_col:
+    scope = st.selectbox("In", list(SEARCH_SCOPES), key="crud_search_scope")
+newest_only = st.checkbox(f"Rank only the newest {RANK_WINDOW:,} matches (faster for broad queries)",
+                          key="crud_search_window")
+
+if query.strip():
+    db_path, table = SEARCH_SCOPES[scope]
+    if st.session_state.get("crud_search_sig") != (query, scope, newest_only):
+        # new query: back to the first page
+        st.session_state.crud_search_sig = (query, scope, newest_only)
+        st.session_state.crud_search_offset = 0
+    offset = st.session_state.get("crud_search_offset", 0)
+    try:
+        sources = None
+        if table == "search_docs":
+            with get_connection(db_path) as conn:
+                sync_csv_source(conn, tickets_csv)
+            sources = [csv_source(tickets_csv)]
+        results, next_offset = fts_search(query, table, db_path=db_path, limit=10, offset=offset,
+                                          sources=sources, window=RANK_WINDOW if newest_only else None)
+        if results.attrs.get("truncated"):
+            st.caption(f"Only the newest {RANK_WINDOW:,} matches were ranked; "
+                       "untick the box above to search older records too.")
+        if results.empty:
+            st.write("No matches")
+        else:
+            label = "key" if table == "search_docs" else "id"
+            for _, row in results.iterrows():
+                st.markdown(f"**{row[label]}** — {row['snippet']}")
+            prev_col, next_col, _ = st.columns([1, 1, 6])
+            with prev_col:
+                if st.button("◀ Prev", key="crud_search_prev", disabled=offset == 0):
+                    st.session_state.crud_search_offset = max(0, offset - 10)
+                    st.rerun()
+            with next_col:
+                if st.button("Next ▶", key="crud_search_next", disabled=next_offset is None):
+                    st.session_state.crud_search_offset = next_offset
+                    st.rerun()
+    except Exception as e:
+        st.error(f"Search failed: {e}")
 
 st.divider()
 st.subheader("Preview (short: Title / Severity / Status)")
 
-def show_incident_table(db_path):
+def show_incident_table(db_path, key):
     try:
-        conn = sqlite3.connect(str(db_path))
-        df = pd.read_sql_query("SELECT id, title, severity, status FROM cyber_incidents ORDER BY id DESC LIMIT 10", conn)
-        conn.close()
-        if not df.empty:
-            st.table(df[["id","title","severity","status"]])
-        else:
-            st.write("No rows")
+        status = st.selectbox("Status filter", ["all", "open", "resolved", "closed"], key=f"{key}_status")
+        filters = None if status == "all" else {"status": status}
+        with read_connection(db_path) as conn:
+            paginated_sqlite_table(conn, "cyber_incidents", key, ("id", "title", "severity", "status"),
+                                   page_size=10, filters=filters, as_table=True)
     except Exception:
         st.write("No DB or table")
 
-col_a, col_b, col_c = st.columns(3)
+col_a, col_b = st.columns(2)
 with col_a:
-    st.markdown("**Incidents (latest 10)**")
-    show_incident_table(incidents_db)
+    st.markdown("**Incidents (latest first)**")
+    show_incident_table(incidents_db, "prev_inc")
 with col_b:
-    st.markdown("**Tickets (latest 10)**")
+    st.markdown("**Tickets**")
     try:
         if tickets_csv.exists():
-            df = pd.read_csv(tickets_csv)
-            short = pd.DataFrame({
-                "id": df.get("id", pd.Series(range(1, len(df)+1))).astype(object),
-                "title": df.get("title", ""),
-                "severity": df.get("severity", ""),
-                "status": df.get("status", "")
-            })
-            st.table(short.head(10))
+            paginated_csv_table(tickets_csv, "prev_tic", page_size=10,
+                                columns=["id", "ticket_id", "title", "subject", "severity", "priority", "status"])
         else:
             st.write("No tickets CSV")
     except Exception:
         st.write("Failed to read tickets")
-with col_c:
-    st.markdown("**Cyber_Incidents (latest 10)**")
-    show_incident_table(cyber_db)
\ No newline at end of file
@@ -0,0 +1,90 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from itertools import islice
+
+from .db import DB_PATH, get_connection
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# ids of connections currently inside a unit_of_work block -> nesting depth
+_open_units = {}
+_units_lock = threading.Lock()
+
+
+def in_unit_of_work(conn: sqlite3.Connection) -> bool:
+    """True while conn is inside a unit_of_work block."""
+    return id(conn) in _open_units
+
+
+def commit(conn: sqlite3.Connection):
+    """
+    Commit unless conn belongs to an open unit of work.
+    Single-row helpers call this so they can be grouped into one commit.
+    """
+    if not in_unit_of_work(conn):
+        conn.commit()
+
+
+@contextmanager
+def unit_of_work(conn: sqlite3.Connection = None, db_path=DB_PATH):
+    """
+    Group several writes into a single transaction (one commit, one fsync).
+
+    Pass an existing connection, or leave conn as None to borrow a pooled
+    connection for db_path. Everything is rolled back if the block raises.
+
+        with unit_of_work() as conn:
+            insert_incident(conn, ...)
+            delete_dataset(conn, ...)
+    """
+    if conn is None:
+        with get_connection(db_path) as pooled:
+            with unit_of_work(pooled) as inner:
+                yield inner
+        return
+
+    key = id(conn)
+    with _units_lock:
+        outer = key not in _open_units
+        _open_units[key] = _open_units.get(key, 0) + 1
+
+    try:
+        if outer and not conn.in_transaction:
+            conn.execute("BEGIN")
+        yield conn
+        if outer:
+            conn.commit()
+    except Exception:
+        if outer and conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        with _units_lock:
+            _open_units[key] -= 1
+            if _open_units[key] == 0:
+                del _open_units[key]
+
+
+def chunked(rows, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Yield lists of at most chunk_size items from any iterable."""
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def executemany_chunked(conn: sqlite3.Connection, sql: str, rows, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Run executemany over rows in chunks inside one transaction.
+    Returns the total number of rows affected.
+    """
+    total = 0
+    with unit_of_work(conn):
+        cursor = conn.cursor()
+        for chunk in chunked(rows, chunk_size):
+            cursor.executemany(sql, chunk)
+            total += cursor.rowcount
+    return total
@@ -2,7 +2,9 @@ import pandas as pd
 from pathlib import Path
 import sqlite3
 
-from .db import connect_database
+from .db import get_connection
+from .batch import commit, executemany_chunked, DEFAULT_CHUNK_SIZE
+from .ingest import ingest_csv, DEFAULT_CSV_CHUNKSIZE
 from .schema import create_datasets_metadata_table
 
 DATA_DIR = Path("DATA")
@@ -26,43 +28,83 @@ def insert_dataset(
         (dataset_name, category, source, last_updated, record_count, file_size_mb)
         VALUES (?, ?, ?, ?, ?, ?)
     """, (dataset_name, category, source, last_updated, record_count, file_size_mb))
-    conn.commit()
+    commit(conn)
     return cursor.lastrowid
 
 
 def get_all_datasets(conn: sqlite3.Connection = None):
     """Return all datasets as a DataFrame."""
-    close_after = False
+    query = "SELECT * FROM datasets_metadata ORDER BY id DESC"
     if conn is None:
-        conn = connect_database()
-        close_after = True
+        with get_connection() as pooled:
+            return pd.read_sql_query(query, pooled)
 
-    df = pd.read_sql_query(
-        "SELECT * FROM datasets_metadata ORDER BY id DESC",
-        conn
-    )
-
-    if close_after:
-        conn.close()
-
-    return df
+    return pd.read_sql_query(query, conn)
 
 
 def delete_dataset(conn: sqlite3.Connection, dataset_id: int):
     """Delete dataset by id. Returns number of deleted rows."""
     cursor = conn.cursor()
     cursor.execute("DELETE FROM datasets_metadata WHERE id = ?", (dataset_id,))
-    conn.commit()
+    commit(conn)
     return cursor.rowcount
 
+
+def insert_datasets_many(conn: sqlite3.Connection, datasets, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Insert many dataset rows in one transaction.
+    Each item is a tuple in insert_dataset() argument order or a dict with those keys.
+    Returns the number of inserted rows.
+    """
+    cols = ("dataset_name", "category", "source", "last_updated", "record_count", "file_size_mb")
+    rows = (
+        tuple(d.get(c) for c in cols) if isinstance(d, dict) else tuple(d)
+        for d in datasets
+    )
+    return executemany_chunked(conn, """
+        INSERT INTO datasets_metadata
+        (dataset_name, category, source, last_updated, record_count, file_size_mb)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, rows, chunk_size)
+
+
+def delete_datasets_many(conn: sqlite3.Connection, dataset_ids, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Delete many datasets by id in one transaction. Returns number of deleted rows."""
+    return executemany_chunked(
+        conn,
+        "DELETE FROM datasets_metadata WHERE id = ?",
+        ((int(i),) for i in dataset_ids),
+        chunk_size,
+    )
+
 # CSV LOADING (2b)
 
+# renaming possible header variants
+DATASET_RENAME_MAP = {
+    "name": "dataset_name",
+    "dataset": "dataset_name",
+    "datasetname": "dataset_name",
+
+    "updated": "last_updated",
+    "lastupdate": "last_updated",
+    "last_updated_date": "last_updated",
+
+    "records": "record_count",
+    "recordcount": "record_count",
+
+    "size": "file_size_mb",
+    "filesize": "file_size_mb",
+    "file_size": "file_size_mb",
+}
+
+
 def load_datasets_metadata_csv(
     conn: sqlite3.Connection,
-    csv_filename: str = "datasets_metadata_1000.csv"
+    csv_filename: str = "datasets_metadata_1000.csv",
+    chunksize: int = DEFAULT_CSV_CHUNKSIZE
 ):
     """
-    Load datasets metadata CSV into datasets_metadata table.
+    Stream datasets metadata CSV into datasets_metadata table.
     Expected columns: id, dataset_name, category, source, last_updated, record_count, file_size_mb
     """
     create_datasets_metadata_table(conn)
@@ -72,42 +114,21 @@ def load_datasets_metadata_csv(
         print(f" datasets CSV not found: {csv_path}")
         return 0
 
-    df = pd.read_csv(csv_path)
-    df.columns = df.columns.str.strip().str.lower()
-
-    #renaming possible variants
-    rename_map = {
-        "name": "dataset_name",
-        "dataset": "dataset_name",
-        "datasetname": "dataset_name",
-
-        "updated": "last_updated",
-        "lastupdate": "last_updated",
-        "last_updated_date": "last_updated",
-
-        "records": "record_count",
-        "recordcount": "record_count",
-
-        "size": "file_size_mb",
-        "filesize": "file_size_mb",
-        "file_size": "file_size_mb",
-    }
-    df=df.rename(columns=rename_map)
-
     expected_cols = ["dataset_name", "category", "source",
         "last_updated", "record_count", "file_size_mb"
     ]
 
-    #keep only cols that exist 
-    missing = [c for c in expected_cols if c not in df.columns]
-    if missing:
-        print("Your datasets CSV headers are:", list(df.columns))
-        print("Still missing columns:", missing)
-        return 0
-    df = df[expected_cols]
-
-    # Keep ids from CSV (so your counts match the lab)
-    df.to_sql("datasets_metadata", conn, if_exists="append", index=False)
+    loaded = ingest_csv(
+        conn,
+        csv_path,
+        "datasets_metadata",
+        columns=expected_cols,
+        rename_map=DATASET_RENAME_MAP,
+        lower_headers=True,
+        dtypes={"record_count": "int", "file_size_mb": "float"},
+        required=["dataset_name"],
+        chunksize=chunksize,
+    )
 
-    print(f"Loaded {len(df)} rows into datasets_metadata")
-    return len(df)
\ No newline at end of file
+    print(f"Loaded {loaded} rows into datasets_metadata")
+    return loaded
@@ -1,8 +1,50 @@
 import sqlite3
+from contextlib import contextmanager
 from pathlib import Path
 
+from .pool import get_pool, all_pool_stats, apply_pragmas
+from .replica import REPLICA_MAX_AGE, get_replica
+
 DB_PATH = Path("DATA") / "intelligence_platform.db"
 
 def connect_database(db_path=DB_PATH):
-    """Connect to SQLite database."""
-    return sqlite3.connect(str(db_path))
\ No newline at end of file
+    """Connect to SQLite database (caller closes it). WAL mode, like the pools."""
+    conn = sqlite3.connect(str(db_path))
+    apply_pragmas(conn)
+    return conn
+
+
+@contextmanager
+def get_connection(db_path=DB_PATH):
+    """
+    Borrow a pooled connection for db_path.
+    Commits when the block finishes, rolls back if it raises.
+    """
+    with get_pool(db_path).connection() as conn:
+        yield conn
+
+
+@contextmanager
+def read_connection(db_path=DB_PATH, max_age: float = None):
+    """
+    Borrow a read-only pooled connection for db_path (for page reads).
+    All queries in the block see one snapshot, and under WAL they never
+    block the writers or get blocked by them.
+
+    With a replica (max_age seconds, default APP_READ_REPLICA) the reads go
+    to a backup copy at most that old instead of the live file.
+    """
+    max_age = REPLICA_MAX_AGE if max_age is None else max_age
+    if max_age > 0:
+        source = get_replica(db_path).connection(max_age)
+    else:
+        source = get_pool(db_path, readonly=True).connection()
+    with source as conn:
+        if not conn.in_transaction:
+            conn.execute("BEGIN")  # hold one read snapshot for the whole block
+        yield conn
+
+
+def pool_stats():
+    """Return checkout/hit/open/wait counters for every pool in use."""
+    return all_pool_stats()
@@ -0,0 +1,111 @@
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+# Memory budget for all cached frames together (bytes).
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _freeze(value):
+    """Turn read options into something hashable for the cache key."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def file_version(path):
+    """(mtime_ns, size) of a file; changes whenever the file is rewritten."""
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+class FrameCache:
+    """
+    Process-wide LRU cache of parsed DataFrames.
+
+    Entries are keyed by (path, mtime, size, read options), so a file that
+    changes on disk is simply a cache miss. Least recently used frames are
+    evicted once the total in-memory size passes max_bytes.
+
+    The same DataFrame object is handed to every caller: copy it before
+    modifying it in place.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (frame, nbytes)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _evict(self, key):
+        _, nbytes = self._entries.pop(key)
+        self._bytes -= nbytes
+        self._stats["evictions"] += 1
+
+    def get(self, path, loader=pd.read_csv, **read_kwargs) -> pd.DataFrame:
+        """Return the frame for path, parsing it with loader on a miss."""
+        path = Path(path).resolve()
+        mtime, size = file_version(path)
+        key = (str(path), mtime, size, getattr(loader, "__name__", repr(loader)), _freeze(read_kwargs))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[0]
+            self._stats["misses"] += 1
+
+        # parse outside the lock so other files can still be served
+        frame = loader(path, **read_kwargs)
+        nbytes = int(frame.memory_usage(deep=True).sum())
+
+        with self._lock:
+            # drop frames for older versions of this file
+            for old in [k for k in self._entries if k[0] == key[0] and k[1:3] != key[1:3]]:
+                self._evict(old)
+
+            if nbytes > self.max_bytes:
+                return frame  # too big to keep, but still usable by the caller
+
+            if key in self._entries:
+                self._bytes -= self._entries[key][1]
+            self._entries[key] = (frame, nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                self._evict(next(iter(self._entries)))
+        return frame
+
+    def invalidate(self, path=None):
+        """Forget one file (all read options) or everything."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            target = str(Path(path).resolve())
+            for key in [k for k in self._entries if k[0] == target]:
+                self._bytes -= self._entries.pop(key)[1]
+
+    def stats(self) -> dict:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["entries"] = len(self._entries)
+            snapshot["bytes"] = self._bytes
+            snapshot["max_bytes"] = self.max_bytes
+        return snapshot
+
+
+# one cache per process, shared by every Streamlit session
+frame_cache = FrameCache()
+
+
+def read_csv_cached(path, **read_kwargs) -> pd.DataFrame:
+    """pd.read_csv through the shared cache. Do not mutate the result."""
+    return frame_cache.get(path, pd.read_csv, **read_kwargs)
@@ -0,0 +1,141 @@
+import re
+import sqlite3
+
+import pandas as pd
+
+from .db import DB_PATH, get_connection
+from .schema import FTS_TABLES, create_fts_tables
+
+DEFAULT_PAGE_SIZE = 10
+SNIPPET_TOKENS = 12
+# opt-in window for broad queries: bm25 then ranks only the newest
+# RANK_WINDOW matches, so a query over millions of rows costs the same as a
+# narrow one (exact below the window; see search(window=...))
+RANK_WINDOW = 2_000
+
+# table searched -> its FTS5 index
+FTS_FOR = {table: name for name, (table, _, _) in FTS_TABLES.items()}
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def to_match_query(text: str, prefix: bool = True) -> str:
+    """
+    Turn free text into a safe FTS5 MATCH expression: every word must
+    match, quoted so FTS5 syntax in the input is taken literally; with
+    prefix=True the last word also matches as a prefix ("pass" -> pass*).
+    """
+    terms = _TERM_RE.findall(text or "")
+    if not terms:
+        return ""
+    quoted = [f'"{t}"' for t in terms]
+    if prefix:
+        quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def make_snippet(texts, terms, prefix: bool = True, size: int = SNIPPET_TOKENS) -> str:
+    """
+    Up to `size` words around the first query term found in texts, with
+    matches in **bold** (the last term also matches as a prefix).
+    """
+    if not terms:
+        return ""
+    patterns = [re.escape(t) + (r"\w*" if prefix and i == len(terms) - 1 else r"\b")
+                for i, t in enumerate(terms)]
+    hit = re.compile(r"\b(?:" + "|".join(patterns) + ")", re.IGNORECASE)
+    for text in texts:
+        words = str(text or "").split()
+        first = next((i for i, w in enumerate(words) if hit.search(w)), None)
+        if first is None:
+            continue
+        start = max(0, min(first - size // 3, len(words) - size))
+        shown = " ".join(words[start:start + size])
+        shown = hit.sub(lambda m: f"**{m.group(0)}**", shown)
+        return ("…" if start else "") + shown + ("…" if start + size < len(words) else "")
+    return ""
+
+
+def search(query: str, table: str = "cyber_incidents", conn: sqlite3.Connection = None,
+           db_path=DB_PATH, limit: int = DEFAULT_PAGE_SIZE, offset: int = 0,
+           prefix: bool = True, sources=None, window: int = None):
+    """
+    Full-text search over one table's FTS5 index, best matches first (bm25).
+
+    Every match is ranked by default. With window (e.g. RANK_WINDOW) only
+    the newest `window` matches are ranked and paged, which keeps broad
+    queries fast; df.attrs["truncated"] is then True if older matches
+    were left out.
+
+    :param table: cyber_incidents, it_tickets or search_docs (which holds the
+                  tickets CSV; narrow it with sources, e.g. [csv_source(path)])
+    :return: (DataFrame of the matching rows plus `snippet` and `rank`,
+              offset of the next page or None)
+    """
+    if conn is None:
+        with get_connection(db_path) as pooled:
+            return search(query, table, pooled, db_path, limit, offset, prefix, sources, window)
+
+    fts = FTS_FOR[table]
+    match = to_match_query(query, prefix)
+    if not match:
+        return pd.DataFrame(), None
+    create_fts_tables(conn)
+    _, rowid, indexed = FTS_TABLES[fts]
+
+    source_join, source_filter, params = "", "", [match]
+    if sources:
+        source_join = f"JOIN {table} AS d ON d.{rowid} = {fts}.rowid"
+        source_filter = f"AND d.source IN ({', '.join('?' for _ in sources)})"
+        params.extend(sources)
+    matches = f"FROM {fts} {source_join} WHERE {fts} MATCH ? {source_filter}"
+
+    try:
+        if window:
+            # the newest matches come straight off the index in rowid order and
+            # only those are ranked; the page is then joined to its rows
+            df = pd.read_sql_query(f"""
+                WITH recent AS (
+                    SELECT {fts}.rowid AS hit, {fts}.rank AS rank
+                    {matches}
+                    ORDER BY {fts}.rowid DESC
+                    LIMIT ?
+                ),
+                page AS (
+                    SELECT hit, rank FROM recent ORDER BY rank, hit DESC LIMIT ? OFFSET ?
+                )
+                SELECT t.*, page.rank AS rank
+                FROM page JOIN {table} AS t ON t.{rowid} = page.hit
+                ORDER BY page.rank, page.hit DESC
+            """, conn, params=params + [window, limit + 1, offset])
+            truncated = conn.execute(
+                f"SELECT 1 {matches} ORDER BY {fts}.rowid DESC LIMIT 1 OFFSET ?", params + [window]
+            ).fetchone() is not None
+        else:
+            df = pd.read_sql_query(f"""
+                WITH page AS (
+                    SELECT {fts}.rowid AS hit, {fts}.rank AS rank
+                    {matches}
+                    ORDER BY {fts}.rank, {fts}.rowid DESC
+                    LIMIT ? OFFSET ?
+                )
+                SELECT t.*, page.rank AS rank
+                FROM page JOIN {table} AS t ON t.{rowid} = page.hit
+                ORDER BY page.rank, page.hit DESC
+            """, conn, params=params + [limit + 1, offset])
+            truncated = False
+    except (sqlite3.OperationalError, pd.errors.DatabaseError) as e:
+        if "no such table" in str(e):
+            return pd.DataFrame(), None  # table (or FTS5) not available here
+        raise
+
+    # one extra row tells us whether there is another page
+    next_offset = offset + limit if len(df) > limit else None
+    df = df.head(limit).copy()
+    # snippets are cut here from the page's rows: FTS5 snippet() would re-run the MATCH per row
+    terms = _TERM_RE.findall(query)
+    cols = [c for c in indexed if c in df.columns]
+    df.insert(len(df.columns) - 1, "snippet",
+              [make_snippet([row[c] for c in cols], terms, prefix) for _, row in df.iterrows()])
+    df.attrs["truncated"] = truncated
+    return df, next_offset
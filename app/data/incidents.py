@@ -1,11 +1,12 @@
-import pandas as pd
 from pathlib import Path
 import sqlite3
 from typing import Optional, Union
 
 #Relative imports (works when you run: python3 -m app.data.incidents)
-from .db import connect_database
+from .batch import commit, executemany_chunked, DEFAULT_CHUNK_SIZE
+from .ingest import ingest_csv, DEFAULT_CSV_CHUNKSIZE
 from .schema import create_cyber_incidents_table
+from .write_queue import get_write_queue, write_operation
 
 
 DATA_DIR = Path("DATA")  # folder where CSVs live
@@ -23,7 +24,7 @@ def insert_incident(conn: sqlite3.Connection, title, severity, status="open", da
         """,
         (title, severity, status, date)
     )
-    conn.commit()
+    commit(conn)
     return cursor.lastrowid
 
 
@@ -63,7 +64,7 @@ def update_incident(conn, incident_id, title=None, severity=None, status=None, d
         WHERE id = ?
     """, (new_title, new_severity, new_status, new_date, incident_id))
 
-    conn.commit()
+    commit(conn)
     return True
 
 
@@ -74,16 +75,49 @@ def delete_incident(conn: sqlite3.Connection, incident_id: int):
         "DELETE FROM cyber_incidents WHERE id = ?",
         (incident_id,)
     )
-    conn.commit()
+    commit(conn)
     return cursor.rowcount
 
 
+# BATCH WRITES
+
+
+def insert_incidents_many(conn: sqlite3.Connection, incidents, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Insert many incidents in one transaction.
+    Each item is a (title, severity, status, date) tuple or a dict with those keys.
+    Returns the number of inserted rows.
+    """
+    rows = (
+        (i["title"], i["severity"], i.get("status", "open"), i.get("date"))
+        if isinstance(i, dict) else tuple(i)
+        for i in incidents
+    )
+    return executemany_chunked(
+        conn,
+        "INSERT INTO cyber_incidents (title, severity, status, date) VALUES (?, ?, ?, ?)",
+        rows,
+        chunk_size,
+    )
+
+
+def delete_incidents_many(conn: sqlite3.Connection, incident_ids, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Delete many incidents by id in one transaction. Returns number of deleted rows."""
+    return executemany_chunked(
+        conn,
+        "DELETE FROM cyber_incidents WHERE id = ?",
+        ((int(i),) for i in incident_ids),
+        chunk_size,
+    )
+
+
 # CSV LOADING
 
 
-def load_cyber_incidents_csv(conn: sqlite3.Connection, csv_filename="cyber_incidents_1000.csv"):
+def load_cyber_incidents_csv(conn: sqlite3.Connection, csv_filename="cyber_incidents_1000.csv",
+                             chunksize: int = DEFAULT_CSV_CHUNKSIZE):
     """
-    Load cyber incidents from CSV into cyber_incidents table.
+    Stream cyber incidents from CSV into cyber_incidents table.
     CSV columns expected: id,title,severity,status,date
     """
     csv_path = DATA_DIR / csv_filename
@@ -92,49 +126,48 @@ def load_cyber_incidents_csv(conn: sqlite3.Connection, csv_filename="cyber_incid
         print(f" CSV not found: {csv_path}")
         return 0
 
-    df = pd.read_csv(csv_path)
-    df.columns = df.columns.str.strip()  # clean headers
+    # DB auto-generates ids, so the CSV id column is not inserted
+    loaded = ingest_csv(
+        conn,
+        csv_path,
+        "cyber_incidents",
+        columns=["title", "severity", "status", "date"],
+        dtypes={"title": "str", "severity": "str", "status": "str", "date": "str"},
+        required=["title", "severity", "date"],
+        chunksize=chunksize,
+    )
 
-    #  Keep only columns that match your schema
-    expected_cols = ["id", "title", "severity", "status", "date"]
-    df = df[expected_cols]
+    print(f"Loaded {loaded} rows into cyber_incidents")
+    return loaded
 
-    # If you want DB to auto-generate ids, drop id from insert
-    df = df.drop(columns=["id"])
 
-    df.to_sql("cyber_incidents", conn, if_exists="append", index=False)
+# --- New helpers: wrappers that open/close DB and ensure table exists ---
+# The CRUD page's writes go through the write queue (write_queue.py): one
+# background writer applies them with group commits.
 
-    print(f"Loaded {len(df)} rows into cyber_incidents")
-    return len(df)
 
+@write_operation("add_incident", prepare=create_cyber_incidents_table)
+def _add_incident(conn: sqlite3.Connection, title, severity, status="open", date=None):
+    return insert_incident(conn, title, severity, status, date)
 
-# --- New helpers: wrappers that open/close DB and ensure table exists ---
+
+@write_operation("delete_incident")
+def _delete_incident(conn: sqlite3.Connection, incident_id):
+    return delete_incident(conn, int(incident_id))
 
 
-def add_incident_db(db_path: Union[str, Path], title: str, severity: str, status: str = "open", date: Optional[str] = None) -> int:
+def add_incident_db(db_path: Union[str, Path], title: str, severity: str, status: str = "open",
+                    date: Optional[str] = None, wait: bool = True):
     """
-    Open sqlite DB at db_path, ensure cyber_incidents table exists, insert incident and return new id.
+    Queue an insert into db_path's cyber_incidents table (created if missing).
+    Returns the new id, or a Future of it when wait is False.
     """
-    db_path = str(db_path)
-    conn = sqlite3.connect(db_path)
-    try:
-        try:
-            create_cyber_incidents_table(conn)
-        except Exception:
-            # if schema helper not available or fails, proceed and let insert raise if table missing
-            pass
-        new_id = insert_incident(conn, title, severity, status, date)
-        return new_id
-    finally:
-        conn.close()
-
-
-def delete_incident_db(db_path: Union[str, Path], incident_id: int) -> int:
+    return get_write_queue()("add_incident", db_path, title, severity, status, date, wait=wait)
+
+
+def delete_incident_db(db_path: Union[str, Path], incident_id: int, wait: bool = True):
     """
-    Open sqlite DB at db_path and delete incident by id. Returns number of rows deleted.
+    Queue the delete of an incident by id. Returns the number of rows
+    deleted, or a Future of it when wait is False.
     """
-    conn = sqlite3.connect(str(db_path))
-    try:
-        return delete_incident(conn, incident_id)
-    finally:
-        conn.close()
\ No newline at end of file
+    return get_write_queue()("delete_incident", db_path, int(incident_id), wait=wait)
@@ -0,0 +1,178 @@
+import os
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+from .batch import unit_of_work
+
+DEFAULT_CSV_CHUNKSIZE = 10_000
+
+
+def create_ingest_progress_table(conn: sqlite3.Connection):
+    """Create the checkpoint table used to resume interrupted CSV loads."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_progress (
+            job TEXT PRIMARY KEY,
+            chunks_done INTEGER NOT NULL,
+            rows_read INTEGER NOT NULL,
+            rows_loaded INTEGER NOT NULL
+        );
+    """)
+    conn.commit()
+
+
+def normalise_headers(columns, rename_map=None, lower=False):
+    """Strip (and optionally lowercase) CSV headers, then apply rename_map."""
+    cleaned = [str(c).strip() for c in columns]
+    if lower:
+        cleaned = [c.lower() for c in cleaned]
+    rename_map = rename_map or {}
+    return [rename_map.get(c, c) for c in cleaned]
+
+
+def validate_chunk(df: pd.DataFrame, dtypes=None, required=None):
+    """
+    Coerce columns to the expected types and drop rows that can't be stored.
+
+    dtypes maps column -> "int", "float" or "str". Values that fail to
+    convert become missing; rows missing any `required` column are dropped.
+    Returns (clean_df, rejected_count).
+    """
+    for col, kind in (dtypes or {}).items():
+        if col not in df.columns:
+            continue
+        if kind == "int":
+            df[col] = pd.to_numeric(df[col], errors="coerce").round().astype("Int64")
+        elif kind == "float":
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        else:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str).str.strip())
+
+    before = len(df)
+    if required:
+        df = df.dropna(subset=[c for c in required if c in df.columns])
+    return df, before - len(df)
+
+
+def _table_columns(conn: sqlite3.Connection, table: str):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _job_key(csv_path: Path, table: str):
+    # a changed file (size or mtime) must not resume from an old checkpoint
+    st = os.stat(csv_path)
+    return f"{table}:{csv_path.resolve()}:{st.st_size}:{int(st.st_mtime)}"
+
+
+def _print_progress(table, chunk_index, rows_read, rows_loaded):
+    print(f"  {table}: chunk {chunk_index} done — {rows_read} rows read, {rows_loaded} loaded")
+
+
+def ingest_csv(
+    conn: sqlite3.Connection,
+    csv_path,
+    table: str,
+    columns=None,
+    rename_map=None,
+    lower_headers=False,
+    dtypes=None,
+    required=None,
+    chunksize: int = DEFAULT_CSV_CHUNKSIZE,
+    progress=_print_progress,
+    resume: bool = True,
+    on_chunk=None,
+):
+    """
+    Stream a CSV into `table` chunk by chunk.
+
+    Each chunk is read with pandas `chunksize`, has its headers normalised,
+    is validated, then written with executemany. The rows and the
+    checkpoint for that chunk are committed together, so after a crash the
+    next call (with resume=True) skips every chunk that already landed.
+
+    columns: table columns to load; None means every CSV column that the
+             table also has.
+    progress: callable(table, chunk_index, rows_read, rows_loaded) or None.
+    on_chunk: optional callable(conn, chunk_df) run inside each chunk's
+              transaction, e.g. to keep summary tables in step.
+
+    Returns the number of rows loaded by this call.
+    """
+    csv_path = Path(csv_path)
+    create_ingest_progress_table(conn)
+
+    header = pd.read_csv(csv_path, nrows=0).columns
+    names = normalise_headers(header, rename_map, lower_headers)
+
+    if columns is None:
+        table_cols = set(_table_columns(conn, table))
+        columns = [c for c in names if c in table_cols]
+    missing = [c for c in columns if c not in names]
+    if missing or not columns:
+        print(f"Your {table} CSV headers are:", names)
+        print("Still missing columns:", missing)
+        return 0
+
+    job = _job_key(csv_path, table)
+    chunks_done = rows_read = rows_loaded = 0
+    if resume:
+        row = conn.execute(
+            "SELECT chunks_done, rows_read, rows_loaded FROM ingest_progress WHERE job = ?",
+            (job,)
+        ).fetchone()
+        if row:
+            chunks_done, rows_read, rows_loaded = row
+            print(f"Resuming {table} load from chunk {chunks_done} ({rows_read} rows already read)")
+    else:
+        conn.execute("DELETE FROM ingest_progress WHERE job = ?", (job,))
+        conn.commit()
+
+    loaded_before = rows_loaded
+    to_skip = rows_read
+    reader = pd.read_csv(csv_path, chunksize=chunksize)
+
+    placeholders = ", ".join("?" for _ in columns)
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+    for chunk in reader:
+        # rows already committed by an interrupted run are parsed but not re-written
+        if to_skip >= len(chunk):
+            to_skip -= len(chunk)
+            continue
+        if to_skip:
+            chunk = chunk.iloc[to_skip:]
+            to_skip = 0
+
+        chunk.columns = names
+        read = len(chunk)
+        chunk, rejected = validate_chunk(chunk[columns].copy(), dtypes, required)
+        if rejected:
+            print(f"  {table}: skipped {rejected} invalid rows in chunk {chunks_done}")
+
+        rows = chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None)
+        with unit_of_work(conn):
+            cursor = conn.cursor()
+            cursor.executemany(sql, rows)
+            if on_chunk:
+                on_chunk(conn, chunk)
+            chunks_done += 1
+            rows_read += read
+            rows_loaded += len(chunk)
+            cursor.execute("""
+                INSERT INTO ingest_progress (job, chunks_done, rows_read, rows_loaded)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(job) DO UPDATE SET
+                    chunks_done = excluded.chunks_done,
+                    rows_read = excluded.rows_read,
+                    rows_loaded = excluded.rows_loaded
+            """, (job, chunks_done, rows_read, rows_loaded))
+
+        if progress:
+            progress(table, chunks_done, rows_read, rows_loaded)
+
+    # finished cleanly: the next call is a fresh load, not a resume
+    conn.execute("DELETE FROM ingest_progress WHERE job = ?", (job,))
+    conn.commit()
+
+    return rows_loaded - loaded_before
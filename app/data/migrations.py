@@ -0,0 +1,225 @@
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .db import DB_PATH, connect_database
+from .schema import FTS_TABLES, create_all_tables, create_fts_tables
+from .trend_rollups import TREND_SPECS, install_trend_rollups
+
+PROJECT_DIR = Path(__file__).resolve().parents[2]
+COPY_BATCH = 5000  # legacy rows per INSERT ... SELECT (and per commit)
+
+# Database files written by older parts of the project, relative to PROJECT_DIR.
+# database/schema.DatabaseSchema made platform.db / flatform.db; the CRUD page
+# used to write incidents to DATA/incidents.db and DATA/cyber_incidents.db.
+LEGACY_DATABASES = [
+    "platform.db",
+    "flatform.db",
+    "database/platform.db",
+    "DATA/incidents.db",
+    "DATA/cyber_incidents.db",
+]
+
+# How legacy tables map onto the canonical ones:
+# (legacy table, columns it must have, target table, target columns, SELECT expressions)
+# :source is the legacy file's name; (source_db, legacy_id) makes copies idempotent.
+COPY_SPECS = [
+    # DatabaseSchema tables
+    ("it_tickets", {"ticket_id", "created_at"}, "it_tickets",
+     ("title", "priority", "status", "created_date", "description", "reporter", "assigned_to",
+      "legacy_id", "source_db"),
+     ("COALESCE(title, '')", "'Unknown'", "COALESCE(status, 'open')",
+      "COALESCE(date(created_at), created_at, '')", "description", "reporter", "assigned_to",
+      "ticket_id", ":source")),
+    ("security_incidents", {"incident_id"}, "cyber_incidents",
+     ("title", "severity", "status", "date", "description", "legacy_id", "source_db"),
+     ("COALESCE(incident_type, '')", "COALESCE(severity, 'Unknown')", "'open'",
+      "COALESCE(date(reported_at), reported_at, '')", "description", "incident_id", ":source")),
+    ("datasets", {"dataset_id"}, "datasets_metadata",
+     ("name", "source", "category", "size", "description", "legacy_id", "source_db"),
+     ("name", "COALESCE(source, '')", "'Uncategorised'", "0", "description", "dataset_id", ":source")),
+    # legacy users have no password: '!' is not a bcrypt hash, so they can't
+    # log in until an admin sets one
+    ("users", {"user_id", "email"}, "users",
+     ("username", "password_hash", "role", "email", "active"),
+     ("username", "'!'", "COALESCE(role, 'user')", "email", "COALESCE(active, 1)")),
+    # CRUD page incident files (same layout as the app table)
+    ("cyber_incidents", {"id", "title", "severity"}, "cyber_incidents",
+     ("title", "severity", "status", "date", "legacy_id", "source_db"),
+     ("COALESCE(title, '')", "COALESCE(severity, 'Unknown')", "COALESCE(status, 'open')",
+      "COALESCE(date(date), date, '')", "CAST(id AS TEXT)", ":source")),
+]
+
+# columns the canonical tables gain so legacy rows fit without losing data
+LEGACY_COLUMNS = {
+    "it_tickets": ("description TEXT", "reporter TEXT", "assigned_to TEXT", "legacy_id TEXT", "source_db TEXT"),
+    "cyber_incidents": ("description TEXT", "legacy_id TEXT", "source_db TEXT"),
+    "datasets_metadata": ("description TEXT", "legacy_id TEXT", "source_db TEXT"),
+    "users": ("email TEXT", "active INTEGER DEFAULT 1"),
+}
+
+
+# MIGRATIONS
+
+
+def _create_app_tables(conn):
+    create_all_tables(conn)
+
+
+def _add_legacy_columns(conn):
+    for table, columns in LEGACY_COLUMNS.items():
+        have = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for column in columns:
+            if column.split()[0] not in have:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column}")
+        if "legacy_id TEXT" in columns:
+            # NULLs are distinct, so rows created by the app itself are unaffected
+            conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_legacy ON {table} (source_db, legacy_id)")
+
+    # rebuild the full-text indexes so they cover the new description columns
+    for name, (table, _, _) in FTS_TABLES.items():
+        if table in LEGACY_COLUMNS:
+            for suffix in ("ai", "ad", "au"):
+                conn.execute(f"DROP TRIGGER IF EXISTS {name}_{suffix}")
+            conn.execute(f"DROP TABLE IF EXISTS {name}")
+    create_fts_tables(conn)
+
+
+def _import_legacy(conn):
+    import_legacy(conn)
+
+
+def _install_trends(conn):
+    for table in TREND_SPECS:
+        install_trend_rollups(conn, table)
+
+
+# (version, name, function); append only, never edit a released step.
+# Steps must be safe to re-run: a failed step is retried from the start.
+MIGRATIONS = [
+    (1, "create app tables", _create_app_tables),
+    (2, "add legacy columns", _add_legacy_columns),
+    (3, "import legacy databases", _import_legacy),
+    (4, "install trend rollups", _install_trends),
+]
+
+
+def _ensure_version_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL,
+            seconds REAL NOT NULL
+        )
+    """)
+    conn.commit()
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    """Highest migration applied to the database (0 if none)."""
+    _ensure_version_table(conn)
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def migrate(db_path=DB_PATH, target: int = None, conn: sqlite3.Connection = None):
+    """
+    Apply pending MIGRATIONS up to target (default: all) in order.
+
+    Steps are not atomic: several commit as they go (create_all_tables,
+    each copy_table batch, install_trend_rollups). Instead every step is
+    idempotent and its schema_version row is only written once it has
+    finished, so after a failure or a crash running migrate() again
+    resumes the step and skips work already done.
+    Returns [(version, name, seconds)] for the steps applied.
+    """
+    own = conn is None
+    conn = conn or connect_database(db_path)
+    applied = []
+    try:
+        done = current_version(conn)
+        for version, name, step in MIGRATIONS:
+            if version <= done or (target is not None and version > target):
+                continue
+            t = time.perf_counter()
+            try:
+                step(conn)
+                seconds = time.perf_counter() - t
+                conn.execute(
+                    "INSERT INTO schema_version (version, name, applied_at, seconds) VALUES (?, ?, ?, ?)",
+                    (version, name, datetime.now(timezone.utc).isoformat(timespec="seconds"), seconds)
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()  # only the step's uncommitted tail
+                raise
+            print(f"migration {version} ({name}): {seconds:.2f}s")
+            applied.append((version, name, seconds))
+    finally:
+        if own:
+            conn.close()
+    return applied
+
+
+# LEGACY IMPORT
+
+
+def _columns(conn, schema, table):
+    return {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")}
+
+
+def copy_table(conn, source: str, legacy_table: str, target: str, columns, selects,
+               batch: int = COPY_BATCH) -> int:
+    """
+    INSERT ... SELECT rows of legacy.legacy_table into target in rowid
+    batches (one transaction each), skipping rows copied before.
+    Returns the number of rows inserted.
+    """
+    sql = (
+        f"INSERT INTO main.{target} ({', '.join(columns)}) "
+        f"SELECT {', '.join(selects)} FROM legacy.{legacy_table} "
+        f"WHERE rowid > :lo AND rowid <= :hi ORDER BY rowid "
+        f"ON CONFLICT DO NOTHING"
+    )
+    lo, hi = conn.execute(f"SELECT MIN(rowid) - 1, MAX(rowid) FROM legacy.{legacy_table}").fetchone()
+    if hi is None:
+        return 0
+    inserted = 0
+    while lo < hi:
+        # rowcount, not total_changes: the FTS/search triggers' writes don't count
+        inserted += conn.execute(sql, {"source": source, "lo": lo, "hi": lo + batch}).rowcount
+        conn.commit()
+        lo += batch
+    return inserted
+
+
+def import_legacy(conn: sqlite3.Connection, databases=None, base_dir=PROJECT_DIR, batch: int = COPY_BATCH):
+    """
+    Copy every recognised table (COPY_SPECS) out of the legacy database
+    files into the canonical database, attaching each file in turn.
+    Safe to run again: rows already copied are skipped.
+    Returns [(file, legacy table, target table, rows inserted, seconds)].
+    """
+    conn.commit()  # ATTACH is not allowed inside a transaction
+    main_file = Path(conn.execute("PRAGMA database_list").fetchone()[2] or "").resolve()
+    report = []
+    for rel in databases or LEGACY_DATABASES:
+        path = (Path(base_dir) / rel).resolve()
+        if not path.exists() or path.stat().st_size == 0 or path == main_file:
+            continue
+        conn.execute("ATTACH DATABASE ? AS legacy", (str(path),))
+        try:
+            tables = {row[0] for row in conn.execute("SELECT name FROM legacy.sqlite_master WHERE type = 'table'")}
+            for legacy_table, required, target, columns, selects in COPY_SPECS:
+                if legacy_table not in tables or not required <= _columns(conn, "legacy", legacy_table):
+                    continue
+                t = time.perf_counter()
+                rows = copy_table(conn, rel, legacy_table, target, columns, selects, batch)
+                seconds = time.perf_counter() - t
+                print(f"  {rel}:{legacy_table} -> {target}: {rows} rows in {seconds:.2f}s")
+                report.append((rel, legacy_table, target, rows, seconds))
+        finally:
+            conn.commit()
+            conn.execute("DETACH DATABASE legacy")
+    return report
@@ -0,0 +1,174 @@
+import sqlite3
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from .frame_cache import file_version
+from . import sidecar
+from .ticket_store import iter_records
+
+
+# SQLITE (keyset pagination)
+
+
+def fetch_page(
+    conn: sqlite3.Connection,
+    table: str,
+    columns=("*",),
+    page_size: int = 10,
+    cursor=None,
+    filters=None,
+    sort_by: str = "id",
+    descending: bool = True,
+):
+    """
+    Return one page of `table` plus the cursor for the next page.
+
+    Uses keyset pagination: the page starts right after `cursor` (the
+    (sort value, id) of the last row shown) instead of using OFFSET, so
+    every page costs O(page_size) no matter how deep you go. `filters`
+    is {column: value} and is applied in SQL.
+
+    Returns (DataFrame, next_cursor); next_cursor is None on the last page.
+    """
+    op = "<" if descending else ">"
+    direction = "DESC" if descending else "ASC"
+
+    where, params = [], []
+    for col, value in (filters or {}).items():
+        where.append(f"{col} = ?")
+        params.append(value)
+
+    if cursor is not None:
+        if sort_by == "id":
+            where.append(f"id {op} ?")
+            params.append(cursor[-1])
+        else:
+            where.append(f"({sort_by}, id) {op} (?, ?)")
+            params.extend(cursor)
+
+    select_cols = list(columns)
+    extra = [c for c in (sort_by, "id") if "*" not in select_cols and c not in select_cols]
+    sql = f"SELECT {', '.join(select_cols + extra)} FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    order = "id" if sort_by == "id" else f"{sort_by} {direction}, id"
+    sql += f" ORDER BY {order} {direction} LIMIT ?"
+    # one extra row tells us whether there is a next page
+    params.append(page_size + 1)
+
+    df = pd.read_sql_query(sql, conn, params=params)
+    has_more = len(df) > page_size
+    df = df.head(page_size)
+
+    next_cursor = None
+    if has_more:
+        last = df.iloc[-1]
+        next_cursor = (last["id"],) if sort_by == "id" else (last[sort_by], last["id"])
+        next_cursor = tuple(v.item() if hasattr(v, "item") else v for v in next_cursor)
+
+    if extra:
+        df = df.drop(columns=extra)
+    return df, next_cursor
+
+
+# CSV / PARQUET (row-offset pagination)
+
+# byte offset of every ROW_CHECKPOINT-th data row, so a page seeks close to
+# its first row and parses at most ROW_CHECKPOINT extra rows
+ROW_CHECKPOINT = 1000
+
+_row_maps = {}
+_row_maps_lock = threading.Lock()
+
+
+def _row_map(csv_path):
+    """
+    (data rows, checkpoint offsets) of a CSV, built once per file version.
+
+    Rows are counted as CSV records, not lines: blank lines and ticket store
+    tombstones don't count, and a quoted field spanning lines is one row.
+    """
+    csv_path = Path(csv_path)
+    key = (str(csv_path.resolve()), file_version(csv_path))
+    with _row_maps_lock:
+        if key in _row_maps:
+            return _row_maps[key]
+
+    rows, checkpoints, seen_header = 0, [], False
+    with open(csv_path, "rb") as f:
+        for offset, raw in iter_records(f):
+            if not raw.strip():
+                continue
+            if not seen_header:
+                seen_header = True
+                continue
+            if rows % ROW_CHECKPOINT == 0:
+                checkpoints.append(offset)
+            rows += 1
+
+    with _row_maps_lock:
+        _row_maps[key] = (rows, checkpoints)
+    return rows, checkpoints
+
+
+def csv_row_count(csv_path):
+    """Number of data rows in a CSV, counted once per file version."""
+    return _row_map(csv_path)[0]
+
+
+def read_csv_page(csv_path, offset: int = 0, limit: int = 10, columns=None):
+    """Read rows [offset, offset + limit) of a CSV without parsing the rest."""
+    header = pd.read_csv(csv_path, nrows=0).columns
+    usecols = [c for c in columns if c in header] if columns is not None else None
+    rows, checkpoints = _row_map(csv_path)
+    if offset >= rows:
+        return pd.read_csv(csv_path, nrows=0, usecols=usecols)
+
+    skip = offset % ROW_CHECKPOINT
+    with open(csv_path, "rb") as f:
+        f.seek(checkpoints[offset // ROW_CHECKPOINT])
+        df = pd.read_csv(f, header=None, names=list(header), usecols=usecols, nrows=skip + limit)
+    return df.iloc[skip:].reset_index(drop=True)
+
+
+def read_parquet_page(parquet_path, offset: int = 0, limit: int = 10, columns=None):
+    """Read rows [offset, offset + limit) touching only the row groups that hold them."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(parquet_path)
+    if columns is not None:
+        columns = [c for c in columns if c in pf.schema_arrow.names]
+
+    tables, first_start, start = [], None, 0
+    for i in range(pf.num_row_groups):
+        n = pf.metadata.row_group(i).num_rows
+        if start + n > offset and start < offset + limit:
+            if first_start is None:
+                first_start = start
+            tables.append(pf.read_row_group(i, columns=columns))
+        start += n
+        if start >= offset + limit:
+            break
+
+    if not tables:
+        return pf.schema_arrow.empty_table().select(columns or pf.schema_arrow.names).to_pandas()
+    return pa.concat_tables(tables).slice(offset - first_start, limit).to_pandas()
+
+
+def read_table_page(csv_path, offset: int = 0, limit: int = 10, columns=None):
+    """
+    One page of a DATA/*.csv table: from the Parquet sidecar when it is
+    enabled (see app.data.sidecar), otherwise straight from the CSV.
+    Returns (DataFrame, total_rows).
+    """
+    if sidecar.ENABLED and sidecar.HAS_PYARROW:
+        try:
+            parquet_path = sidecar.ensure_sidecar(csv_path)
+            total = sidecar.pq.ParquetFile(parquet_path).metadata.num_rows
+            return read_parquet_page(parquet_path, offset, limit, columns), total
+        except OSError:
+            pass
+    return read_csv_page(csv_path, offset, limit, columns), csv_row_count(csv_path)
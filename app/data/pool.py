@@ -0,0 +1,240 @@
+import sqlite3
+import threading
+import time
+import queue
+from contextlib import contextmanager
+from pathlib import Path
+
+# Pragmas applied to every pooled connection when it is first opened.
+# WAL lets readers and a writer work at the same time, NORMAL sync is safe
+# under WAL, cache_size is negative so it is in KiB (~16 MB) and mmap_size
+# lets SQLite read pages straight from the OS page cache.
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -16000,
+    "mmap_size": 64 * 1024 * 1024,
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+
+
+# Pragmas for read-only connections: journal_mode can't be changed through
+# them, and query_only makes an accidental write fail instead of locking.
+READ_PRAGMAS = {
+    "cache_size": -16000,
+    "mmap_size": 64 * 1024 * 1024,
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+    "query_only": 1,
+}
+
+
+def read_only_uri(db_path, immutable: bool = False) -> str:
+    """file: URI opening db_path read-only (immutable=1 also skips locking; only for files nobody writes)."""
+    uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+    return uri + "&immutable=1" if immutable else uri
+
+
+def apply_pragmas(conn: sqlite3.Connection, pragmas=None):
+    """Apply PRAGMA settings to an open connection."""
+    for name, value in (pragmas or DEFAULT_PRAGMAS).items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections for one database file.
+
+    A thread that checks out a connection keeps getting the same one for
+    nested checkouts until the outermost checkout is released, so helpers
+    that call other helpers don't need a second connection.
+    """
+
+    def __init__(self, db_path, size: int = 5, timeout: float = 30.0, pragmas=None,
+                 readonly: bool = False, immutable: bool = False):
+        self.db_path = str(db_path)
+        self.size = size
+        self.timeout = timeout
+        self.readonly = readonly or immutable
+        self.immutable = immutable
+        if pragmas is None:
+            pragmas = READ_PRAGMAS if self.readonly else DEFAULT_PRAGMAS
+        self.pragmas = pragmas
+
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._opened = 0
+        self._closed = False
+
+        self._stats = {
+            "checkouts": 0,
+            "hits": 0,
+            "opens": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "timeouts": 0,
+        }
+
+    # internal helpers
+
+    def _open(self):
+        if self.readonly:
+            conn = sqlite3.connect(read_only_uri(self.db_path, self.immutable), uri=True,
+                                   check_same_thread=False, timeout=self.timeout)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=self.timeout)
+        apply_pragmas(conn, self.pragmas)
+        self._stats["opens"] += 1
+        return conn
+
+    def _take(self):
+        """Return an idle connection, open a new one, or wait for a release."""
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self._stats["hits"] += 1
+            return conn
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                try:
+                    return self._open()
+                except Exception:
+                    self._opened -= 1
+                    raise
+
+        start = time.perf_counter()
+        try:
+            conn = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise TimeoutError(f"No free connection for {self.db_path} after {self.timeout}s")
+        with self._lock:
+            self._stats["waits"] += 1
+            self._stats["wait_time"] += time.perf_counter() - start
+        return conn
+
+    # public API
+
+    def acquire(self) -> sqlite3.Connection:
+        """Check out a connection for the calling thread."""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            self._local.depth += 1
+            return held
+
+        conn = self._take()
+        self._local.conn = conn
+        self._local.depth = 1
+        with self._lock:
+            self._stats["checkouts"] += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection obtained from acquire()."""
+        if getattr(self._local, "conn", None) is not conn:
+            raise ValueError("Connection was not checked out by this thread")
+
+        self._local.depth -= 1
+        if self._local.depth > 0:
+            return
+
+        self._local.conn = None
+        # never hand a half-finished transaction to the next caller
+        if conn.in_transaction:
+            conn.rollback()
+
+        if self._closed:
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+            return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager around acquire()/release().
+        Commits on success and rolls back if the block raises.
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+            if conn.in_transaction and self._local.depth == 1:
+                conn.commit()
+        except Exception:
+            if conn.in_transaction and self._local.depth == 1:
+                conn.rollback()
+            raise
+        finally:
+            self.release(conn)
+
+    def stats(self) -> dict:
+        """Snapshot of pool counters, useful for sizing the pool under load."""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["size"] = self.size
+            snapshot["open"] = self._opened
+        snapshot["idle"] = self._idle.qsize()
+        snapshot["in_use"] = snapshot["open"] - snapshot["idle"]
+        waits = snapshot["waits"]
+        snapshot["avg_wait_ms"] = (snapshot["wait_time"] / waits * 1000) if waits else 0.0
+        return snapshot
+
+    def close_all(self):
+        """Close idle connections; busy ones are closed when released."""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path, size: int = 5, readonly: bool = False, immutable: bool = False, **kwargs) -> ConnectionPool:
+    """
+    Return the shared pool for db_path, creating it on first use.
+    Read-only (and immutable) connections get a pool of their own.
+    """
+    key = str(Path(db_path).resolve())
+    if readonly or immutable:
+        key += "?immutable" if immutable else "?ro"
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = ConnectionPool(db_path, size=size, readonly=readonly, immutable=immutable, **kwargs)
+            _pools[key] = pool
+        return pool
+
+
+def all_pool_stats() -> dict:
+    """Stats for every pool opened in this process, keyed by db path."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {path: pool.stats() for path, pool in pools.items()}
+
+
+def close_all_pools():
+    """Close every pool (e.g. at shutdown or between tests)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
@@ -0,0 +1,172 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from .pool import ConnectionPool
+
+# Serve page reads from a replica at most this many seconds old (0 = read
+# the live database through read-only connections instead).
+REPLICA_MAX_AGE = float(os.environ.get("APP_READ_REPLICA", "0"))
+REPLICA_DIRNAME = ".replica"
+
+
+class Replica:
+    """
+    Read-only copy of a database for dashboards, made with SQLite's online
+    backup API.
+
+    Each refresh() copies the database in one pass (a single read snapshot;
+    under WAL the writers carry on meanwhile) into a new generation file and
+    switches new readers over to it. Replica files are never written after
+    that, so they are opened immutable: no locks, no journal, nothing for
+    writers to wait on. Each generation counts the connections reading it
+    and is closed and deleted when the last one is released.
+    """
+
+    def __init__(self, db_path, folder=None):
+        self.db_path = Path(db_path).resolve()
+        self.folder = Path(folder) if folder else self.db_path.parent / REPLICA_DIRNAME
+        self.current = None
+        self.refreshed_at = 0.0
+        self.refreshes = 0
+        self.last_seconds = 0.0
+        # _lock guards the generation bookkeeping below and is only held
+        # briefly; _refresh_lock serialises the (slow) copies, so readers
+        # never wait for a backup to finish
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._pools = {}    # generation path -> its immutable pool
+        self._readers = {}  # generation path -> connections checked out
+        self._stop = None
+
+    def age(self) -> float:
+        """Seconds since the last refresh (inf if there is no replica yet)."""
+        return time.monotonic() - self.refreshed_at if self.current else float("inf")
+
+    def refresh(self) -> Path:
+        """Copy the database into a new replica generation and point readers at it."""
+        with self._refresh_lock:
+            return self._refresh()
+
+    def _refresh(self) -> Path:
+        t = time.perf_counter()
+        self.folder.mkdir(parents=True, exist_ok=True)
+        target = self.folder / f"{self.db_path.stem}.{time.time_ns()}.db"
+
+        source = sqlite3.connect(str(self.db_path), timeout=30)
+        copy = sqlite3.connect(str(target))
+        try:
+            source.backup(copy)
+            # a plain rollback-journal file, so immutable readers need no -wal/-shm
+            copy.execute("PRAGMA journal_mode = DELETE")
+            copy.commit()
+        finally:
+            copy.close()
+            source.close()
+
+        pool = ConnectionPool(target, immutable=True)
+        with self._lock:
+            previous, self.current = self.current, target
+            self._pools[target] = pool
+            self.refreshed_at = time.monotonic()
+            self.refreshes += 1
+            self.last_seconds = time.perf_counter() - t
+            if previous is not None and not self._readers.get(previous):
+                # otherwise the last reader of previous retires it
+                self._retire(previous)
+        self._remove_old()
+        return target
+
+    def _retire(self, path):
+        """Close a generation nobody reads any more and delete its file (under _lock)."""
+        pool = self._pools.pop(path, None)
+        if pool is not None:
+            pool.close_all()
+        try:
+            path.unlink()
+        except OSError:
+            pass  # still open somewhere (Windows); _remove_old retries
+
+    def _remove_old(self):
+        """Delete generation files that are neither current nor being read."""
+        with self._lock:
+            keep = set(self._pools) | {self.current}
+        for path in self.folder.glob(f"{self.db_path.stem}.*.db"):
+            if path not in keep:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass  # still open somewhere (Windows); retried on the next refresh
+
+    @contextmanager
+    def connection(self, max_age: float = REPLICA_MAX_AGE):
+        """
+        Read-only connection to the current replica, refreshing it first if
+        older than max_age. The generation it reads stays open and on disk
+        until the block exits, even if a refresh replaces it meanwhile.
+        """
+        if self.age() > max_age:
+            with self._refresh_lock:
+                # another reader may have refreshed while we waited
+                if self.age() > max_age:
+                    self._refresh()
+        with self._lock:
+            path = self.current
+            pool = self._pools[path]
+            self._readers[path] = self._readers.get(path, 0) + 1
+        try:
+            with pool.connection() as conn:
+                yield conn
+        finally:
+            with self._lock:
+                self._readers[path] -= 1
+                if not self._readers[path]:
+                    del self._readers[path]
+                    if path != self.current:
+                        self._retire(path)
+
+    def start(self, interval: float):
+        """Refresh every interval seconds in a daemon thread (until stop())."""
+        if self._stop is not None:
+            return
+        self._stop = threading.Event()
+        stop = self._stop
+
+        def run():
+            while not stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:  # keep serving the previous generation
+                    print(f"replica refresh of {self.db_path.name} failed: {e}")
+
+        threading.Thread(target=run, name=f"replica-{self.db_path.name}", daemon=True).start()
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+    def stats(self) -> dict:
+        return {
+            "path": str(self.current) if self.current else None,
+            "age": self.age(),
+            "refreshes": self.refreshes,
+            "last_refresh_seconds": self.last_seconds,
+        }
+
+
+_replicas = {}
+_replicas_lock = threading.Lock()
+
+
+def get_replica(db_path) -> Replica:
+    """Return the shared Replica of db_path, creating it on first use."""
+    key = str(Path(db_path).resolve())
+    with _replicas_lock:
+        replica = _replicas.get(key)
+        if replica is None:
+            replica = _replicas[key] = Replica(db_path)
+        return replica
@@ -0,0 +1,581 @@
+import math
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .batch import unit_of_work
+from .db import DB_PATH, get_connection
+from .frame_cache import file_version
+from .schema import create_fts_tables
+from .sidecar import SIDECAR_DIRNAME
+from .ticket_aggregates import csv_source
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# pending postings are folded into the per-term arrays past this many
+MERGE_AT = 50_000
+# write a new snapshot after this many documents changed since the last one
+SAVE_EVERY = 5_000
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("""
+    a an and are as at be by for from has have in is it its of on or that the
+    this to was were will with what which who how when where why do does did
+""".split())
+
+# table -> (columns whose text is searchable, columns shown with a hit).
+# The first searchable column that exists is used.
+DB_SOURCES = {
+    "cyber_incidents": (("title",), ("severity", "status", "date")),
+    "it_tickets": (("title",), ("priority", "status", "created_date")),
+    "datasets_metadata": (("name", "dataset_name"), ("category", "source")),
+}
+
+# CSV file name prefix -> (id column, searchable columns). Every column is shown
+# with a hit. Files without a unique id column (None) are keyed by row number.
+CSV_SOURCES = {
+    "cyber_incidents": ("incident_id", ("title",)),
+    "it_tickets": ("ticket_id", ("subject", "description")),
+    "datasets_metadata": (None, ("name", "source")),
+}
+
+
+def tokenize(text) -> list:
+    """Lower-cased alphanumeric terms without stopwords ("CI1003" -> "ci1003")."""
+    if not text:
+        return []
+    return [t for t in TOKEN_RE.findall(str(text).lower()) if t not in STOPWORDS]
+
+
+# DOCUMENT TABLES
+#
+# search_docs holds the text of every searchable row; rows are never
+# updated in place, so doc_id only grows and an index can catch up by
+# reading doc_id > last seen. Removals are logged in search_tombstones.
+
+
+def create_search_tables(conn: sqlite3.Connection):
+    """Create the document tables and keep DB_SOURCES in sync via triggers."""
+    # plain execute() rather than executescript(), which would commit the caller's transaction
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS search_docs (
+            doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source TEXT NOT NULL,
+            key TEXT NOT NULL,
+            body TEXT NOT NULL,
+            display TEXT NOT NULL,
+            UNIQUE (source, key)
+        );
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS search_tombstones (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            doc_id INTEGER NOT NULL
+        );
+    """)
+    conn.execute("CREATE TABLE IF NOT EXISTS search_sources (source TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER)")
+    conn.execute("CREATE TABLE IF NOT EXISTS search_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    conn.execute("INSERT OR IGNORE INTO search_meta (key, value) VALUES ('generation', ?)",
+                 (uuid.uuid4().hex,))
+
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    triggers = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    for table, (body_cols, display_cols) in DB_SOURCES.items():
+        if table in tables and f"search_{table}_insert" not in triggers:
+            _create_source_triggers(conn, table, body_cols, display_cols)
+    if "search_docs_fts" not in tables:
+        create_fts_tables(conn)
+
+
+def _create_source_triggers(conn: sqlite3.Connection, table, body_cols, display_cols):
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    body = next((c for c in body_cols if c in columns), None)
+    if body is None:
+        return
+    shown = [c for c in display_cols if c in columns]
+
+    def display(r):
+        parts = [f"'#' || {r}.id || ' ' || COALESCE({r}.{body}, '')"]
+        parts += [f"' | {c}: ' || COALESCE({r}.{c}, '')" for c in shown]
+        return " || ".join(parts)
+
+    insert = f"""
+        INSERT INTO search_docs (source, key, body, display)
+        VALUES ('{table}', CAST(NEW.id AS TEXT), COALESCE(NEW.{body}, ''), {display('NEW')});"""
+    remove = f"""
+        INSERT INTO search_tombstones (doc_id)
+            SELECT doc_id FROM search_docs WHERE source = '{table}' AND key = CAST(OLD.id AS TEXT);
+        DELETE FROM search_docs WHERE source = '{table}' AND key = CAST(OLD.id AS TEXT);"""
+
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS search_{table}_insert AFTER INSERT ON {table} BEGIN {insert} END")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS search_{table}_delete AFTER DELETE ON {table} BEGIN {remove} END")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS search_{table}_update AFTER UPDATE ON {table} "
+                 f"BEGIN {remove} {insert} END")
+    # index the rows that were there before the triggers
+    conn.execute(f"""
+        INSERT OR IGNORE INTO search_docs (source, key, body, display)
+        SELECT '{table}', CAST(NEW.id AS TEXT), COALESCE(NEW.{body}, ''), {display('NEW')}
+        FROM {table} AS NEW
+    """)
+
+
+def _remove_docs(conn: sqlite3.Connection, source: str, keys=None):
+    """Tombstone the docs of source (all of them when keys is None)."""
+    if keys is None:
+        conn.execute("INSERT INTO search_tombstones (doc_id) SELECT doc_id FROM search_docs WHERE source = ?",
+                     (source,))
+        conn.execute("DELETE FROM search_docs WHERE source = ?", (source,))
+        return
+    rows = [(source, str(k)) for k in keys]
+    conn.executemany("""
+        INSERT INTO search_tombstones (doc_id)
+        SELECT doc_id FROM search_docs WHERE source = ? AND key = ?
+    """, rows)
+    conn.executemany("DELETE FROM search_docs WHERE source = ? AND key = ?", rows)
+
+
+def _add_docs(conn: sqlite3.Connection, source: str, docs):
+    """docs: iterable of (key, body, display). Replaces existing docs with the same key."""
+    docs = [(source, str(k), body, display) for k, body, display in docs]
+    _remove_docs(conn, source, [d[1] for d in docs])
+    conn.executemany("INSERT INTO search_docs (source, key, body, display) VALUES (?, ?, ?, ?)", docs)
+
+
+# CSV SOURCES
+
+
+def csv_spec(csv_path):
+    """(id column, searchable columns) for a known CSV, else None."""
+    stem = Path(csv_path).stem
+    for prefix, spec in CSV_SOURCES.items():
+        if stem.startswith(prefix):
+            return spec
+    return None
+
+
+def _csv_docs(rows, id_col, body_cols):
+    for number, row in enumerate(rows, start=1):
+        key = row.get(id_col) if id_col else f"row{number}"
+        if not key:
+            continue
+        body = " ".join([str(key)] + [str(row.get(c) or "") for c in body_cols])
+        display = " | ".join(f"{c}: {v}" for c, v in row.items() if v not in (None, ""))
+        yield key, body, display
+
+
+def sync_csv_source(conn: sqlite3.Connection, csv_path):
+    """
+    Re-index a CSV if it changed since it was last indexed (one read of the
+    file). Returns True if it was re-indexed.
+    """
+    spec = csv_spec(csv_path)
+    if spec is None:
+        return False
+    create_search_tables(conn)
+    source = csv_source(csv_path)
+    version = file_version(csv_path)
+    recorded = conn.execute("SELECT mtime_ns, size FROM search_sources WHERE source = ?", (source,)).fetchone()
+    if recorded and tuple(recorded) == version:
+        return False
+
+    rows = pd.read_csv(csv_path, dtype=str, keep_default_na=False).to_dict("records")
+    with unit_of_work(conn):
+        _remove_docs(conn, source)
+        _add_docs(conn, source, _csv_docs(rows, *spec))
+        _record_csv_version(conn, source, version)
+    return True
+
+
+def _record_csv_version(conn, source, version):
+    conn.execute("INSERT OR REPLACE INTO search_sources (source, mtime_ns, size) VALUES (?, ?, ?)",
+                 (source, version[0], version[1]))
+
+
+def apply_csv_change(conn: sqlite3.Connection, csv_path, before_version, after_version,
+                     row=None, removed: bool = False):
+    """
+    Fold one CSV write (row appended, or removed) into the search docs.
+    Like apply_csv_delta(), does nothing if the source was already stale
+    at before_version; the next sync_csv_source() re-indexes it. Does not commit.
+    """
+    spec = csv_spec(csv_path)
+    if spec is None:
+        return False
+    create_search_tables(conn)
+    source = csv_source(csv_path)
+    recorded = conn.execute("SELECT mtime_ns, size FROM search_sources WHERE source = ?", (source,)).fetchone()
+    if not recorded or tuple(recorded) != tuple(before_version):
+        return False
+    if row is not None:
+        docs = list(_csv_docs([row], *spec))
+        if removed:
+            _remove_docs(conn, source, [key for key, _, _ in docs])
+        else:
+            _add_docs(conn, source, docs)
+    _record_csv_version(conn, source, after_version)
+    return True
+
+
+# IN-MEMORY BM25 INDEX
+
+
+class SearchIndex:
+    """
+    BM25 inverted index held as numpy arrays.
+
+    Documents live at dense positions. Postings are stored CSR-style: the
+    positions and term frequencies of every term back to back, with an
+    offsets array per term id. Small updates go to pending lists that are
+    folded in (one linear merge, no sort of the old postings) once they
+    grow; removals only clear an alive flag. A query scores the postings
+    of its terms into a reusable buffer, so it costs O(postings of the
+    query terms), not O(documents).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        """Empty the index; the lock is kept, so it is safe while holding it."""
+        self.generation = None
+        self.last_doc = 0          # highest search_docs.doc_id indexed
+        self.last_tombstone = 0    # highest search_tombstones.seq applied
+        self.n = 0                 # document positions in use
+        self.live = 0
+        self._live_len = 0.0
+        # per position, with spare capacity; doc ids only grow so _doc_ids stays sorted
+        self._doc_ids = np.empty(0, dtype=np.int64)
+        self._doc_len = np.empty(0, dtype=np.float32)
+        self._doc_src = np.empty(0, dtype=np.int16)
+        self._alive = np.empty(0, dtype=bool)
+        self._scores = np.empty(0, dtype=np.float32)   # kept all-zero between queries
+        self.sources = []
+        self.vocab = {}            # term -> term id
+        self.offsets = np.zeros(1, dtype=np.int64)     # term id -> slice of positions/tfs
+        self.positions = np.empty(0, dtype=np.int32)
+        self.tfs = np.empty(0, dtype=np.uint16)
+        self.pending = {}          # term id -> ([positions], [tf]) not merged yet
+        self.pending_count = 0
+        self.changed = 0           # documents added/removed since the last save
+
+    def __len__(self):
+        return self.live
+
+    @property
+    def doc_ids(self):
+        return self._doc_ids[:self.n]
+
+    @property
+    def alive(self):
+        return self._alive[:self.n]
+
+    # updates
+
+    def _source_code(self, source):
+        if source not in self.sources:
+            self.sources.append(source)
+        return self.sources.index(source)
+
+    def _reserve(self, extra):
+        needed = self.n + extra
+        if needed <= len(self._doc_ids):
+            return
+        capacity = max(needed, 2 * len(self._doc_ids), 1024)
+        for name in ("_doc_ids", "_doc_len", "_doc_src", "_alive", "_scores"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def add_documents(self, docs):
+        """Index (doc_id, source, body) tuples; doc_ids must be increasing."""
+        with self._lock:
+            ids, lens, srcs = [], [], []
+            term_ids, positions, tfs = [], [], []
+            vocab = self.vocab
+            for doc_id, source, body in docs:
+                pos = self.n + len(ids)
+                tokens = tokenize(body)
+                ids.append(doc_id)
+                lens.append(len(tokens))
+                srcs.append(self._source_code(source))
+                for term, tf in Counter(tokens).items():
+                    tid = vocab.get(term)
+                    if tid is None:
+                        tid = vocab[term] = len(vocab)
+                    term_ids.append(tid)
+                    positions.append(pos)
+                    tfs.append(min(tf, 65535))
+            if not ids:
+                return 0
+
+            self._reserve(len(ids))
+            span = slice(self.n, self.n + len(ids))
+            self._doc_ids[span] = ids
+            self._doc_len[span] = lens
+            self._doc_src[span] = srcs
+            self._alive[span] = True
+            self.n += len(ids)
+            self.live += len(ids)
+            self._live_len += float(sum(lens))
+            self.last_doc = max(self.last_doc, int(ids[-1]))
+            self.changed += len(ids)
+
+            if len(term_ids) >= MERGE_AT:
+                self._merge(np.asarray(term_ids, dtype=np.int64),
+                            np.asarray(positions, dtype=np.int32),
+                            np.asarray(tfs, dtype=np.uint16))
+            else:
+                for tid, pos, tf in zip(term_ids, positions, tfs):
+                    plist = self.pending.setdefault(tid, ([], []))
+                    plist[0].append(pos)
+                    plist[1].append(tf)
+                self.pending_count += len(term_ids)
+                if self.pending_count >= MERGE_AT:
+                    self.flush_pending()
+            return len(ids)
+
+    def _merge(self, term_ids, positions, tfs):
+        """Merge a batch of postings into the CSR arrays in one linear pass."""
+        vocab_size = len(self.vocab)
+        old_counts = np.zeros(vocab_size, dtype=np.int64)
+        old_counts[:len(self.offsets) - 1] = np.diff(self.offsets)
+        new_counts = np.bincount(term_ids, minlength=vocab_size)
+        offsets = np.zeros(vocab_size + 1, dtype=np.int64)
+        np.cumsum(old_counts + new_counts, out=offsets[1:])
+
+        out_pos = np.empty(offsets[-1], dtype=np.int32)
+        out_tf = np.empty(offsets[-1], dtype=np.uint16)
+        # old postings keep their order at the start of each term's slice
+        old_tid = np.repeat(np.arange(vocab_size), old_counts)
+        old_at = offsets[old_tid] + (np.arange(len(old_tid)) - self.offsets[old_tid])
+        out_pos[old_at], out_tf[old_at] = self.positions, self.tfs
+        # new postings follow, grouped by term
+        order = np.argsort(term_ids, kind="stable")
+        new_tid = term_ids[order]
+        group_start = np.concatenate([[0], np.cumsum(new_counts)])
+        new_at = offsets[new_tid] + old_counts[new_tid] + (np.arange(len(new_tid)) - group_start[new_tid])
+        out_pos[new_at], out_tf[new_at] = positions[order], tfs[order]
+
+        self.offsets, self.positions, self.tfs = offsets, out_pos, out_tf
+
+    def flush_pending(self):
+        with self._lock:
+            if not self.pending:
+                return
+            term_ids, positions, tfs = [], [], []
+            for tid, (pos, tf) in self.pending.items():
+                term_ids.extend([tid] * len(pos))
+                positions.extend(pos)
+                tfs.extend(tf)
+            self.pending = {}
+            self.pending_count = 0
+            self._merge(np.asarray(term_ids, dtype=np.int64),
+                        np.asarray(positions, dtype=np.int32),
+                        np.asarray(tfs, dtype=np.uint16))
+
+    def remove_documents(self, doc_ids):
+        """Mark doc_ids as deleted (unknown ids are ignored)."""
+        with self._lock:
+            doc_ids = np.asarray(list(doc_ids), dtype=np.int64)
+            if not len(doc_ids) or not self.n:
+                return 0
+            pos = np.searchsorted(self.doc_ids, doc_ids)
+            pos = pos[pos < self.n]
+            pos = np.unique(pos[np.isin(self._doc_ids[pos], doc_ids)])
+            pos = pos[self._alive[pos]]
+            self._alive[pos] = False
+            self.live -= len(pos)
+            self._live_len -= float(self._doc_len[pos].sum())
+            self.changed += len(pos)
+            return len(pos)
+
+    # queries
+
+    def _term_postings(self, tid):
+        if tid + 1 < len(self.offsets):
+            start, end = self.offsets[tid], self.offsets[tid + 1]
+            pos, tf = self.positions[start:end], self.tfs[start:end]
+        else:
+            pos, tf = self.positions[:0], self.tfs[:0]
+        extra = self.pending.get(tid)
+        if extra:
+            pos = np.concatenate([pos, np.asarray(extra[0], dtype=np.int32)])
+            tf = np.concatenate([tf, np.asarray(extra[1], dtype=np.uint16)])
+        return pos, tf
+
+    def search(self, query: str, k: int = 5, sources=None):
+        """Top-k (doc_id, score) pairs for query, best first."""
+        with self._lock:
+            if not self.live:
+                return []
+            avgdl = max(self._live_len / self.live, 1.0)
+            scores = self._scores
+            touched = []
+            for term in set(tokenize(query)):
+                tid = self.vocab.get(term)
+                if tid is None:
+                    continue
+                pos, tf = self._term_postings(tid)
+                if not len(pos):
+                    continue
+                idf = math.log(1 + (self.live - len(pos) + 0.5) / (len(pos) + 0.5))
+                tf = tf.astype(np.float32)
+                norm = K1 * (1 - B + B * self._doc_len[pos] / avgdl)
+                scores[pos] += idf * tf * (K1 + 1) / (tf + norm)
+                touched.append(pos)
+            if not touched:
+                return []
+
+            # read the touched scores back and leave the buffer zeroed
+            cand = np.concatenate(touched)
+            vals = scores[cand]
+            scores[cand] = 0
+            keep = self._alive[cand]
+            if sources is not None:
+                codes = [self.sources.index(s) for s in sources if s in self.sources]
+                keep &= np.isin(self._doc_src[cand], codes)
+            cand, vals = cand[keep], vals[keep]
+            if not len(cand):
+                return []
+
+            # a position repeats once per matching term, so over-fetch before de-duplicating
+            m = min(len(cand), k * len(touched))
+            top = np.argpartition(-vals, m - 1)[:m]
+            top = top[np.argsort(-vals[top], kind="stable")]
+            results, seen = [], set()
+            for i in top:
+                p = int(cand[i])
+                if p not in seen:
+                    seen.add(p)
+                    results.append((int(self._doc_ids[p]), float(vals[i])))
+                    if len(results) == k:
+                        break
+            return results
+
+    # catching up with the database
+
+    def refresh(self, conn: sqlite3.Connection):
+        """Apply docs added and removed in the database since the last refresh."""
+        create_search_tables(conn)
+        with self._lock, unit_of_work(conn):
+            generation = conn.execute("SELECT value FROM search_meta WHERE key = 'generation'").fetchone()[0]
+            if generation != self.generation:
+                # different (or recreated) database: start over
+                self._reset()
+                self.generation = generation
+            added = self.add_documents(conn.execute(
+                "SELECT doc_id, source, body FROM search_docs WHERE doc_id > ? ORDER BY doc_id",
+                (self.last_doc,)))
+            removed = conn.execute(
+                "SELECT seq, doc_id FROM search_tombstones WHERE seq > ? ORDER BY seq",
+                (self.last_tombstone,)).fetchall()
+            if removed:
+                self.remove_documents(d for _, d in removed)
+                self.last_tombstone = removed[-1][0]
+        return added, len(removed)
+
+    # persistence
+
+    def save(self, path):
+        """Write the index to an .npz file (atomically)."""
+        with self._lock:
+            self.flush_pending()
+            path = Path(path)
+            tmp = path.with_name(path.name + ".tmp.npz")
+            np.savez(
+                tmp,
+                meta=np.array([self.generation or "", str(self.last_doc), str(self.last_tombstone),
+                               repr(self._live_len)]),
+                sources=np.array(self.sources, dtype=str),
+                terms=np.array(sorted(self.vocab, key=self.vocab.get), dtype=str),
+                offsets=self.offsets, positions=self.positions, tfs=self.tfs,
+                doc_ids=self.doc_ids, doc_len=self._doc_len[:self.n],
+                doc_src=self._doc_src[:self.n], alive=self.alive,
+            )
+            os.replace(tmp, path)
+            self.changed = 0
+
+    @classmethod
+    def load(cls, path):
+        index = cls()
+        with np.load(path) as data:
+            generation, last_doc, last_tombstone, live_len = data["meta"].tolist()
+            index.generation = generation or None
+            index.last_doc = int(last_doc)
+            index.last_tombstone = int(last_tombstone)
+            index._live_len = float(live_len)
+            index.sources = data["sources"].tolist()
+            index.vocab = {term: tid for tid, term in enumerate(data["terms"].tolist())}
+            index.offsets, index.positions, index.tfs = data["offsets"], data["positions"], data["tfs"]
+            index._doc_ids, index._doc_len = data["doc_ids"], data["doc_len"]
+            index._doc_src, index._alive = data["doc_src"], data["alive"]
+            index.n = len(index._doc_ids)
+            index.live = int(index._alive.sum())
+            index._scores = np.zeros(index.n, dtype=np.float32)
+        return index
+
+
+# SHARED INDEX PER DATABASE
+
+
+def index_path(db_path=DB_PATH):
+    db_path = Path(db_path)
+    return db_path.parent / SIDECAR_DIRNAME / f"{db_path.stem}.search.npz"
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(db_path=DB_PATH) -> SearchIndex:
+    """Process-wide index for db_path, loaded from its snapshot when there is one."""
+    key = str(Path(db_path).resolve())
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            path = index_path(db_path)
+            try:
+                index = SearchIndex.load(path) if path.exists() else SearchIndex()
+            except (OSError, ValueError, KeyError):
+                index = SearchIndex()  # unreadable snapshot: rebuild from the tables
+            _indexes[key] = index
+        return index
+
+
+def search(query: str, k: int = 5, sources=None, db_path=DB_PATH, csv_paths=()):
+    """
+    Top-k documents for query as dicts (source, key, display, score).
+    csv_paths are re-indexed first if they changed on disk.
+    """
+    index = get_search_index(db_path)
+    with get_connection(db_path) as conn:
+        for csv_path in csv_paths:
+            sync_csv_source(conn, csv_path)
+        index.refresh(conn)
+        if index.changed >= SAVE_EVERY:
+            path = index_path(db_path)
+            path.parent.mkdir(exist_ok=True)
+            index.save(path)
+
+        hits = index.search(query, k, sources)
+        if not hits:
+            return []
+        marks = ", ".join("?" for _ in hits)
+        rows = {row[0]: row[1:] for row in conn.execute(
+            f"SELECT doc_id, source, key, display FROM search_docs WHERE doc_id IN ({marks})",
+            [doc_id for doc_id, _ in hits])}
+    return [
+        {"source": rows[doc_id][0], "key": rows[doc_id][1], "display": rows[doc_id][2], "score": score}
+        for doc_id, score in hits if doc_id in rows
+    ]
@@ -1,5 +1,43 @@
 import sqlite3
 
+# Bump INDEX_VERSION whenever INDEXES changes so create_indexes() reapplies them.
+INDEX_VERSION = 1
+
+# (index name, table, columns)
+INDEXES = [
+    ("idx_cyber_incidents_status_severity", "cyber_incidents", ("status", "severity")),
+    ("idx_cyber_incidents_date", "cyber_incidents", ("date",)),
+    ("idx_it_tickets_priority_status", "it_tickets", ("priority", "status")),
+    ("idx_it_tickets_created_date", "it_tickets", ("created_date",)),
+    ("idx_datasets_metadata_category", "datasets_metadata", ("category",)),
+]
+
+# Queries the pages and helpers actually run; none of them may fall back
+# to a full table scan once the indexes above exist.
+CANONICAL_QUERIES = {
+    "incidents_by_status_severity": (
+        "SELECT * FROM cyber_incidents WHERE status = ? AND severity = ?", ("open", "high")),
+    "incidents_by_status": (
+        "SELECT COUNT(*) FROM cyber_incidents WHERE status = ?", ("open",)),
+    "incidents_by_date_range": (
+        "SELECT * FROM cyber_incidents WHERE date BETWEEN ? AND ? ORDER BY date", ("2024-01-01", "2024-12-31")),
+    "tickets_by_priority_status": (
+        "SELECT * FROM it_tickets WHERE priority = ? AND status = ?", ("High", "open")),
+    "tickets_by_priority": (
+        "SELECT COUNT(*) FROM it_tickets WHERE priority = ?", ("High",)),
+    "tickets_by_created_range": (
+        "SELECT * FROM it_tickets WHERE created_date >= ? AND created_date < ?", ("2024-01-01", "2024-02-01")),
+    # all-time monthly totals come from the trend rollups (trend_rollups.py);
+    # only a bounded window is ever counted from the table itself
+    "tickets_per_month": (
+        "SELECT substr(created_date, 1, 7) AS month, COUNT(*) FROM it_tickets "
+        "WHERE created_date >= ? AND created_date < ? GROUP BY month", ("2024-01-01", "2025-01-01")),
+    "datasets_by_category": (
+        "SELECT * FROM datasets_metadata WHERE category = ?", ("Sales",)),
+    "user_by_username": (
+        "SELECT * FROM users WHERE username = ?", ("alice",)),
+}
+
 
 def create_users_table(conn: sqlite3.Connection):
     """Create users table."""
@@ -64,10 +102,180 @@ def create_it_tickets_table(conn: sqlite3.Connection):
     print("it_tickets table created successfully!")
 
 
+# FULL-TEXT SEARCH
+
+# FTS5 table -> (content table, its rowid column, indexed columns). Only the
+# columns the content table actually has are indexed. search_docs is the
+# retrieval document table, which also mirrors the tickets CSV.
+FTS_TABLES = {
+    "cyber_incidents_fts": ("cyber_incidents", "id", ("title", "description")),
+    "it_tickets_fts": ("it_tickets", "id", ("title", "subject", "description")),
+    "search_docs_fts": ("search_docs", "doc_id", ("body",)),
+}
+
+
+def fts5_available(conn: sqlite3.Connection):
+    """True if this SQLite build has the FTS5 extension."""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def create_fts_tables(conn: sqlite3.Connection):
+    """
+    Create the FTS5 indexes in FTS_TABLES as external-content tables (the
+    text isn't stored twice) plus the triggers that keep them in sync.
+    New indexes are filled from their table once. Skips content tables
+    that don't exist yet and SQLite builds without FTS5. Does not commit.
+    """
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+    missing = [name for name, (table, _, _) in FTS_TABLES.items() if table in existing and name not in existing]
+    if not missing or not fts5_available(conn):
+        return []
+
+    for name in missing:
+        table, rowid, wanted = FTS_TABLES[name]
+        columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        cols = [c for c in wanted if c in columns]
+        if not cols:
+            continue
+        col_list = ", ".join(cols)
+        new_vals = ", ".join(f"new.{c}" for c in cols)
+        old_vals = ", ".join(f"old.{c}" for c in cols)
+
+        # prefix indexes make "pass*" style queries as cheap as whole words
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE {name} USING fts5(
+                {col_list}, content='{table}', content_rowid='{rowid}', prefix='2 3'
+            )
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {name} (rowid, {col_list}) VALUES (new.{rowid}, {new_vals});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {name} ({name}, rowid, {col_list}) VALUES ('delete', old.{rowid}, {old_vals});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE ON {table} BEGIN
+                INSERT INTO {name} ({name}, rowid, {col_list}) VALUES ('delete', old.{rowid}, {old_vals});
+                INSERT INTO {name} (rowid, {col_list}) VALUES (new.{rowid}, {new_vals});
+            END
+        """)
+        conn.execute(f"INSERT INTO {name} ({name}) VALUES ('rebuild')")
+        # merge the b-tree segments the rebuild left behind into one
+        conn.execute(f"INSERT INTO {name} ({name}) VALUES ('optimize')")
+    print(f"full-text indexes created: {', '.join(missing)}")
+    return missing
+
+
+def get_index_version(conn: sqlite3.Connection):
+    """Return the index set version recorded in the database (0 if none)."""
+    conn.execute("CREATE TABLE IF NOT EXISTS schema_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    row = conn.execute("SELECT value FROM schema_meta WHERE key = 'index_version'").fetchone()
+    return int(row[0]) if row else 0
+
+
+def create_indexes(conn: sqlite3.Connection, force: bool = False):
+    """
+    Create the secondary indexes in INDEXES that are missing (all of them
+    if INDEX_VERSION changed) and record INDEX_VERSION once every indexed
+    table exists. Tables that don't exist yet are skipped and picked up by
+    a later call. Returns the names created.
+    """
+    stale = force or get_index_version(conn) < INDEX_VERSION
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    pending = [(name, table, columns) for name, table, columns in INDEXES
+               if table in tables and (stale or name not in indexes)]
+    complete = all(table in tables for _, table, _ in INDEXES)
+    if not pending and not (stale and complete):
+        return []
+
+    created = []
+    for name, table, columns in pending:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+        created.append(name)
+
+    # refresh planner statistics so the new indexes are actually picked
+    conn.execute("ANALYZE")
+    if complete:
+        conn.execute(
+            "INSERT OR REPLACE INTO schema_meta (key, value) VALUES ('index_version', ?)",
+            (str(INDEX_VERSION),)
+        )
+    conn.commit()
+    print(f"indexes (v{INDEX_VERSION}) created successfully!")
+    return created
+
+
 def create_all_tables(conn: sqlite3.Connection):
     """Create all tables."""
     create_users_table(conn)
     create_cyber_incidents_table(conn)
     create_datasets_metadata_table(conn)
     create_it_tickets_table(conn)
-    print("all tables created successfully!")
\ No newline at end of file
+    create_indexes(conn)
+
+    from .retrieval import create_search_tables
+    create_search_tables(conn)
+    create_fts_tables(conn)
+    conn.commit()
+    print("all tables created successfully!")
+
+
+# QUERY PLAN AUDIT
+
+
+def explain(query: str, params=(), conn: sqlite3.Connection = None):
+    """Return the EXPLAIN QUERY PLAN detail lines for query."""
+    if conn is None:
+        from .db import get_connection
+        with get_connection() as pooled:
+            return explain(query, params, pooled)
+
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def is_full_scan(detail: str):
+    """
+    True for plan steps that read a whole table, including walking a whole
+    (covering) index: only SEARCH steps look up a range of rows.
+    """
+    return detail.startswith("SCAN") and detail != "SCAN CONSTANT ROW"
+
+
+def audit_query_plans(conn: sqlite3.Connection, queries=None):
+    """
+    Run explain() over the canonical queries.
+    Returns {query name: [full-scan plan steps]} for every query that scans.
+    """
+    failures = {}
+    for name, (query, params) in (queries or CANONICAL_QUERIES).items():
+        scans = [d for d in explain(query, params, conn) if is_full_scan(d)]
+        if scans:
+            failures[name] = scans
+    return failures
+
+
+def check_query_plans(conn: sqlite3.Connection, queries=None):
+    """Raise AssertionError if any canonical query regresses to a full SCAN."""
+    failures = audit_query_plans(conn, queries)
+    if failures:
+        lines = [f"  {name}: {'; '.join(steps)}" for name, steps in failures.items()]
+        raise AssertionError("Queries fell back to a full table scan:\n" + "\n".join(lines))
+
+
+if __name__ == "__main__":
+    # python3 -m app.data.schema  -> audit plans against a fresh in-memory schema
+    memory = sqlite3.connect(":memory:")
+    create_all_tables(memory)
+    check_query_plans(memory)
+    print(f"query plan audit passed ({len(CANONICAL_QUERIES)} queries)")
\ No newline at end of file
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from .frame_cache import frame_cache, file_version
+
+# pyarrow is optional: without it every read falls back to the CSV itself
+try:
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    pq = None
+    HAS_PYARROW = False
+
+# Opt in with APP_SIDECAR_CACHE=1 (or set ENABLED = True at startup).
+ENABLED = os.environ.get("APP_SIDECAR_CACHE", "0").lower() in ("1", "true", "yes")
+
+SIDECAR_DIRNAME = ".sidecar"
+
+
+def sidecar_paths(csv_path: Path):
+    """(parquet path, meta json path) that sit next to csv_path."""
+    folder = csv_path.parent / SIDECAR_DIRNAME
+    return folder / f"{csv_path.stem}.parquet", folder / f"{csv_path.stem}.meta.json"
+
+
+def file_hash(path: Path, block_size: int = 1 << 20):
+    """sha1 of a file's bytes, read in blocks."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def infer_types(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Parse date-like text columns once, at build time.
+    Text columns stay plain strings; Parquet dictionary-encodes them on disk.
+    """
+    for col in df.columns:
+        if not (df[col].dtype == object or pd.api.types.is_string_dtype(df[col])):
+            continue
+        if "date" in col.lower() or "time" in col.lower():
+            parsed = pd.to_datetime(df[col], errors="coerce")
+            if parsed.notna().any():
+                df[col] = parsed
+    return df
+
+
+def _load_meta(meta_path: Path):
+    try:
+        return json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _publish(path: Path, write):
+    """
+    write(tmp_path) into a temp file of its own next to path, then rename it
+    over path, so concurrent builders never share or tear a file.
+    """
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp",
+                                     delete=False) as f:
+        tmp = Path(f.name)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _write_meta(meta_path: Path, meta: dict):
+    _publish(meta_path, lambda tmp: tmp.write_text(json.dumps(meta)))
+
+
+def build_sidecar(csv_path, digest=None):
+    """Convert csv_path to a typed Parquet sidecar. Returns the parquet path."""
+    csv_path = Path(csv_path)
+    parquet_path, meta_path = sidecar_paths(csv_path)
+    parquet_path.parent.mkdir(exist_ok=True)
+
+    df = infer_types(pd.read_csv(csv_path))
+    _publish(parquet_path, lambda tmp: df.to_parquet(tmp, index=False))
+
+    mtime, size = file_version(csv_path)
+    _write_meta(meta_path, {
+        "sha1": digest or file_hash(csv_path),
+        "mtime_ns": mtime,
+        "size": size,
+        "rows": len(df),
+    })
+    return parquet_path
+
+
+def ensure_sidecar(csv_path):
+    """
+    Return an up-to-date sidecar for csv_path, rebuilding it if the CSV's
+    contents changed. The hash is only recomputed when mtime or size moved.
+    """
+    csv_path = Path(csv_path)
+    parquet_path, meta_path = sidecar_paths(csv_path)
+    meta = _load_meta(meta_path)
+    mtime, size = file_version(csv_path)
+
+    if meta and parquet_path.exists():
+        if (meta.get("mtime_ns"), meta.get("size")) == (mtime, size):
+            return parquet_path
+        digest = file_hash(csv_path)
+        if digest == meta.get("sha1"):
+            # touched but unchanged: just remember the new mtime
+            meta.update(mtime_ns=mtime, size=size)
+            _write_meta(meta_path, meta)
+            return parquet_path
+        return build_sidecar(csv_path, digest)
+
+    return build_sidecar(csv_path)
+
+
+def read_table(csv_path, columns=None) -> pd.DataFrame:
+    """
+    Read a DATA/*.csv table, only the requested columns when given.
+    Uses the Parquet sidecar when enabled and pyarrow is installed,
+    otherwise parses the CSV directly.
+    """
+    csv_path = Path(csv_path)
+    if ENABLED and HAS_PYARROW:
+        try:
+            parquet_path = ensure_sidecar(csv_path)
+            if columns is not None:
+                available = set(pq.read_schema(parquet_path).names)
+                columns = [c for c in columns if c in available]
+            return pd.read_parquet(parquet_path, columns=columns)
+        except OSError:
+            pass  # read-only folder etc.: fall back to the CSV
+
+    if columns is None:
+        return pd.read_csv(csv_path)
+    wanted = set(columns)
+    return pd.read_csv(csv_path, usecols=lambda c: c in wanted)
+
+
+def read_table_cached(csv_path, columns=None) -> pd.DataFrame:
+    """read_table through the shared frame cache. Do not mutate the result."""
+    columns = list(columns) if columns is not None else None
+    return frame_cache.get(csv_path, read_table, columns=columns)
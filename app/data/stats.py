@@ -0,0 +1,273 @@
+import base64
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .frame_cache import file_version
+from .sidecar import SIDECAR_DIRNAME
+
+DEFAULT_STATS_CHUNKSIZE = 50_000
+
+
+# MERGEABLE SKETCHES
+
+
+class NumericSummary:
+    """count / min / max / mean / variance, mergeable (Chan et al.)."""
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, minimum=None, maximum=None):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = minimum
+        self.max = maximum
+
+    def update(self, values: pd.Series):
+        values = values.dropna()
+        if values.empty:
+            return
+        arr = values.to_numpy(dtype="float64")
+        other = NumericSummary(len(arr), float(arr.mean()), float(((arr - arr.mean()) ** 2).sum()),
+                               float(arr.min()), float(arr.max()))
+        self.merge(other)
+
+    def merge(self, other: "NumericSummary"):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2, self.min, self.max = (
+                other.count, other.mean, other.m2, other.min, other.max)
+            return
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self.m2 += other.m2 + delta * delta * self.count * other.count / n
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else float("nan")
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean, "m2": self.m2, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["count"], d["mean"], d["m2"], d["min"], d["max"])
+
+
+class HyperLogLog:
+    """Distinct-count sketch with 2**p one-byte registers."""
+
+    def __init__(self, p: int = 12, registers=None):
+        self.p = p
+        self.m = 1 << p
+        self.registers = registers if registers is not None else np.zeros(self.m, dtype=np.uint8)
+
+    def update(self, values: pd.Series):
+        values = values.dropna()
+        if values.empty:
+            return
+        h = pd.util.hash_pandas_object(values.astype(str), index=False).to_numpy(dtype=np.uint64)
+        idx = (h >> np.uint64(64 - self.p)).astype(np.int64)
+        w = h << np.uint64(self.p)
+
+        # count leading zeros of w exactly with a binary search on the bits
+        lz = np.zeros(len(w), dtype=np.uint8)
+        x = w.copy()
+        for shift in (32, 16, 8, 4, 2, 1):
+            top_clear = x < np.uint64(1 << (64 - shift))
+            lz[top_clear] += shift
+            x[top_clear] <<= np.uint64(shift)
+        lz[w == 0] = 64
+        rank = np.minimum(lz + 1, 64 - self.p + 1).astype(np.uint8)
+
+        np.maximum.at(self.registers, idx, rank)
+
+    def merge(self, other: "HyperLogLog"):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * math.log(m / zeros)))  # linear counting for small sets
+        return int(round(raw))
+
+    def to_dict(self):
+        return {"p": self.p, "registers": base64.b64encode(self.registers.tobytes()).decode("ascii")}
+
+    @classmethod
+    def from_dict(cls, d):
+        regs = np.frombuffer(base64.b64decode(d["registers"]), dtype=np.uint8).copy()
+        return cls(d["p"], regs)
+
+
+class MisraGries:
+    """Heavy-hitters sketch keeping at most k counters; counts are lower bounds."""
+
+    def __init__(self, k: int = 64, counters=None):
+        self.k = k
+        self.counters = dict(counters or {})
+
+    def _reduce(self):
+        if len(self.counters) <= self.k:
+            return
+        cut = sorted(self.counters.values(), reverse=True)[self.k]
+        self.counters = {v: c - cut for v, c in self.counters.items() if c > cut}
+
+    def update(self, values: pd.Series):
+        for value, count in values.dropna().astype(str).value_counts().items():
+            self.counters[value] = self.counters.get(value, 0) + int(count)
+        self._reduce()
+
+    def merge(self, other: "MisraGries"):
+        for value, count in other.counters.items():
+            self.counters[value] = self.counters.get(value, 0) + count
+        self._reduce()
+
+    def top(self):
+        if not self.counters:
+            return None, None
+        value = max(self.counters, key=self.counters.get)
+        return value, self.counters[value]
+
+    def to_dict(self):
+        return {"k": self.k, "counters": self.counters}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["k"], d["counters"])
+
+
+# COLUMN / FILE SUMMARIES
+
+
+class ColumnStats:
+    """All sketches for one column; numeric columns get moments, others get distinct/top."""
+
+    def __init__(self, numeric: bool):
+        self.numeric = numeric
+        self.rows = 0
+        self.nulls = 0
+        self.moments = NumericSummary()
+        self.distinct = HyperLogLog()
+        self.heavy = MisraGries()
+
+    def update(self, values: pd.Series):
+        self.rows += len(values)
+        self.nulls += int(values.isna().sum())
+        if self.numeric:
+            self.moments.update(pd.to_numeric(values, errors="coerce"))
+        else:
+            self.distinct.update(values)
+            self.heavy.update(values)
+
+    def merge(self, other: "ColumnStats"):
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.moments.merge(other.moments)
+        self.distinct.merge(other.distinct)
+        self.heavy.merge(other.heavy)
+
+    def row(self):
+        """One describe()-style row."""
+        if self.numeric:
+            m = self.moments
+            return {"count": m.count, "unique": None, "top": None, "freq": None,
+                    "mean": m.mean if m.count else None, "std": m.std if m.count > 1 else None,
+                    "min": m.min, "max": m.max}
+        top, freq = self.heavy.top()
+        return {"count": self.rows - self.nulls, "unique": self.distinct.estimate(), "top": top,
+                "freq": freq, "mean": None, "std": None, "min": None, "max": None}
+
+    def to_dict(self):
+        return {"numeric": self.numeric, "rows": self.rows, "nulls": self.nulls,
+                "moments": self.moments.to_dict(), "distinct": self.distinct.to_dict(),
+                "heavy": self.heavy.to_dict()}
+
+    @classmethod
+    def from_dict(cls, d):
+        col = cls(d["numeric"])
+        col.rows, col.nulls = d["rows"], d["nulls"]
+        col.moments = NumericSummary.from_dict(d["moments"])
+        col.distinct = HyperLogLog.from_dict(d["distinct"])
+        col.heavy = MisraGries.from_dict(d["heavy"])
+        return col
+
+
+def collect_stats(chunks):
+    """One pass over DataFrame chunks -> {column: ColumnStats}."""
+    columns = {}
+    for chunk in chunks:
+        for name in chunk.columns:
+            if name not in columns:
+                # the first chunk decides whether a column is numeric
+                columns[name] = ColumnStats(pd.api.types.is_numeric_dtype(chunk[name])
+                                            and not pd.api.types.is_bool_dtype(chunk[name]))
+            columns[name].update(chunk[name])
+    return columns
+
+
+def stats_frame(columns) -> pd.DataFrame:
+    """Turn {column: ColumnStats} into a describe(include="all").transpose() lookalike."""
+    return pd.DataFrame({name: col.row() for name, col in columns.items()}).transpose()
+
+
+# PERSISTENCE PER FILE VERSION
+
+
+def _stats_path(csv_path: Path):
+    return csv_path.parent / SIDECAR_DIRNAME / f"{csv_path.stem}.stats.json"
+
+
+def _load_cached(csv_path: Path, version):
+    try:
+        data = json.loads(_stats_path(csv_path).read_text())
+    except (OSError, ValueError):
+        return None
+    if tuple(data.get("version", ())) != tuple(version):
+        return None
+    return {name: ColumnStats.from_dict(d) for name, d in data["columns"].items()}
+
+
+def _save_cached(csv_path: Path, version, columns):
+    path = _stats_path(csv_path)
+    try:
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(json.dumps({
+            "version": list(version),
+            "columns": {name: col.to_dict() for name, col in columns.items()},
+        }))
+    except OSError:
+        pass  # read-only data folder: just don't persist
+
+
+def summarize_csv(csv_path, exact: bool = False, chunksize: int = DEFAULT_STATS_CHUNKSIZE,
+                  frame=None) -> pd.DataFrame:
+    """
+    Per-column summary of a CSV.
+
+    exact=False (default) streams the file once through mergeable sketches
+    (HyperLogLog distinct counts, Misra-Gries top values) and stores them
+    next to the file, keyed by its version, so reruns cost a JSON read.
+    exact=True runs pandas describe(include="all") on `frame` (or the file).
+    """
+    csv_path = Path(csv_path)
+    if exact:
+        df = frame if frame is not None else pd.read_csv(csv_path)
+        return df.describe(include="all").transpose()
+
+    version = file_version(csv_path)
+    columns = _load_cached(csv_path, version)
+    if columns is None:
+        columns = collect_stats(pd.read_csv(csv_path, chunksize=chunksize))
+        _save_cached(csv_path, version, columns)
+    return stats_frame(columns)
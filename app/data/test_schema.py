@@ -0,0 +1,43 @@
+# test_schema.py
+import sqlite3
+
+import pytest
+
+from app.data.schema import (
+    INDEXES, audit_query_plans, check_query_plans, create_cyber_incidents_table,
+    create_datasets_metadata_table, create_indexes, create_it_tickets_table, create_users_table,
+    is_full_scan,
+)
+
+
+def test_indexes_follow_tables_created_later():
+    conn = sqlite3.connect(":memory:")
+    create_users_table(conn)
+    assert create_indexes(conn) == []
+    create_it_tickets_table(conn)
+    assert set(create_indexes(conn)) == {n for n, t, _ in INDEXES if t == "it_tickets"}
+    create_cyber_incidents_table(conn)
+    create_datasets_metadata_table(conn)
+    create_indexes(conn)
+
+    check_query_plans(conn)
+    assert create_indexes(conn) == []
+
+
+def test_missing_index_fails_the_audit():
+    conn = sqlite3.connect(":memory:")
+    for create in (create_users_table, create_cyber_incidents_table,
+                   create_datasets_metadata_table, create_it_tickets_table):
+        create(conn)
+    create_indexes(conn)
+    conn.execute("DROP INDEX idx_it_tickets_created_date")
+
+    assert "tickets_by_created_range" in audit_query_plans(conn)
+    with pytest.raises(AssertionError):
+        check_query_plans(conn)
+
+
+def test_covering_index_scan_is_a_full_scan():
+    assert is_full_scan("SCAN it_tickets")
+    assert is_full_scan("SCAN it_tickets USING COVERING INDEX idx_it_tickets_created_date")
+    assert not is_full_scan("SEARCH it_tickets USING INDEX idx_it_tickets_priority_status (priority=?)")
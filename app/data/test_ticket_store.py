@@ -0,0 +1,46 @@
+# test_ticket_store.py
+import pandas as pd
+
+from app.data.pagination import csv_row_count, read_csv_page
+from app.data.ticket_store import TicketStore
+
+HEADER = "ticket_id,priority,description,status\n"
+
+
+def make_store(tmp_path, rows=20):
+    csv_path = tmp_path / "tickets.csv"
+    lines = [f"TCK{i:04d},Low,ticket {i},Open\n" for i in range(1, rows + 1)]
+    csv_path.write_text(HEADER + "".join(lines), encoding="utf-8")
+    return csv_path, TicketStore(csv_path)
+
+
+def test_pages_skip_tombstones(tmp_path):
+    csv_path, store = make_store(tmp_path)
+    for i in range(1, 8):
+        store.delete(f"TCK{i:04d}")
+
+    assert csv_row_count(csv_path) == len(pd.read_csv(csv_path)) == 13
+    seen = []
+    for offset in range(0, 15, 5):
+        seen += list(read_csv_page(csv_path, offset, 5)["ticket_id"])
+    assert seen == [f"TCK{i:04d}" for i in range(8, 21)]
+
+
+def test_quoted_newlines_stay_in_one_record(tmp_path):
+    csv_path, store = make_store(tmp_path, rows=3)
+    written = store.append({"priority": "High", "description": "first line\nsecond line", "status": "Open"})
+    assert written["ticket_id"] == "TCK0004"
+
+    store._rebuild_index()
+    assert store.live_rows() == 4
+    assert store.get("TCK0004")["description"] == "first line\nsecond line"
+    assert csv_row_count(csv_path) == 4
+    assert read_csv_page(csv_path, 3, 5)["description"].tolist() == ["first line\nsecond line"]
+
+    store.append({"priority": "Low", "description": "a\n\nb", "status": "Open"})
+    store.delete("TCK0004")
+    store.compact()
+    df = pd.read_csv(csv_path)
+    assert df["ticket_id"].tolist() == ["TCK0001", "TCK0002", "TCK0003", "TCK0005"]
+    assert df["description"].iloc[-1] == "a\n\nb"
+    assert store.live_rows() == 4
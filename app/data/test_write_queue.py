@@ -0,0 +1,30 @@
+# test_write_queue.py
+import json
+
+import pandas as pd
+
+from app.data.write_queue import WriteQueue
+
+
+def test_csv_replay_after_crash_appends_once(tmp_path, monkeypatch):
+    # ticket writes also update rollups in DATA/intelligence_platform.db
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "DATA").mkdir()
+    csv_path = tmp_path / "tickets.csv"
+    csv_path.write_text("ticket_id,priority,status\nTCK0001,Low,Open\n", encoding="utf-8")
+    journal = tmp_path / "queue.jsonl"
+
+    wq = WriteQueue(journal).start()
+    assert wq("add_ticket_csv", str(csv_path), {"priority": "High", "status": "Open"}, result_timeout=5) == "TCK0002"
+    wq.close()
+
+    # crash after the append but before the checkpoint: drop the "done" lines
+    with open(journal, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    with open(journal, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(r) + "\n" for r in records if "done" not in r)
+
+    wq = WriteQueue(journal).start()
+    wq.close()
+    assert wq.stats()["replayed"] == 1
+    assert pd.read_csv(csv_path)["ticket_id"].tolist() == ["TCK0001", "TCK0002"]
@@ -0,0 +1,194 @@
+import sqlite3
+from collections import Counter
+from pathlib import Path
+
+import pandas as pd
+
+from .frame_cache import file_version
+from .trend_rollups import TREND_SPECS, apply_trend_delta, has_trends, rebuild_trends, trend_rows
+
+# rollups of the it_tickets table itself (as opposed to a CSV export)
+DB_SOURCE = "it_tickets"
+
+# dimension -> columns it groups by (counts over time live in trend_rollups)
+DIMENSIONS = {
+    "priority": ("priority",),
+    "status_priority": ("status", "priority"),
+    "assigned_to": ("assigned_to",),
+}
+
+# columns needed to rebuild every dimension and the trends
+SOURCE_COLUMNS = ["priority", "status", "category", "created_date", "assigned_to"]
+TICKET_TREND = TREND_SPECS["it_tickets"]
+
+
+def create_ticket_rollup_tables(conn: sqlite3.Connection):
+    """Create the summary tables behind the Analytics ticket charts."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ticket_rollups (
+            source TEXT NOT NULL,
+            dimension TEXT NOT NULL,
+            key1 TEXT NOT NULL,
+            key2 TEXT NOT NULL DEFAULT '',
+            count INTEGER NOT NULL,
+            PRIMARY KEY (source, dimension, key1, key2)
+        );
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ticket_rollup_sources (
+            source TEXT PRIMARY KEY,
+            mtime_ns INTEGER,
+            size INTEGER
+        );
+    """)
+
+
+def _rollup_keys(tickets: pd.DataFrame):
+    """
+    Normalise ticket rows into the grouping keys used by every dimension.
+    Missing values get the same labels the charts always used.
+    """
+    keys = pd.DataFrame(index=tickets.index)
+    keys["priority"] = tickets.get("priority", pd.Series(index=tickets.index, dtype=object)).fillna("N/A").astype(str)
+    keys["status"] = tickets.get("status", pd.Series(index=tickets.index, dtype=object)).fillna("N/A").astype(str)
+    if "assigned_to" in tickets.columns:
+        keys["assigned_to"] = tickets["assigned_to"].fillna("Unassigned").astype(str)
+    return keys
+
+
+def _count_rows(tickets: pd.DataFrame, sign: int = 1):
+    """Group ticket rows into (dimension, key1, key2) -> signed count."""
+    keys = _rollup_keys(tickets)
+    counts = Counter()
+    for dimension, cols in DIMENSIONS.items():
+        if any(c not in keys.columns for c in cols):
+            continue
+        grouped = keys.dropna(subset=list(cols)).groupby(list(cols)).size()
+        for key, n in grouped.items():
+            key = key if isinstance(key, tuple) else (key,)
+            counts[(dimension, key[0], key[1] if len(key) > 1 else "")] += sign * int(n)
+    return counts
+
+
+def apply_ticket_delta(conn: sqlite3.Connection, source: str, tickets, sign: int = 1):
+    """
+    Add (sign=1) or remove (sign=-1) ticket rows from the rollups of source.
+    tickets may be a DataFrame, a dict or a list of dicts. Does not commit,
+    so it can share a transaction with the write that caused it.
+    """
+    if isinstance(tickets, dict):
+        tickets = [tickets]
+    if not isinstance(tickets, pd.DataFrame):
+        tickets = pd.DataFrame(list(tickets))
+    if tickets.empty:
+        return 0
+
+    create_ticket_rollup_tables(conn)
+    counts = _count_rows(tickets, sign)
+    conn.executemany("""
+        INSERT INTO ticket_rollups (source, dimension, key1, key2, count)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(source, dimension, key1, key2) DO UPDATE SET count = count + excluded.count
+    """, [(source, d, k1, k2, n) for (d, k1, k2), n in counts.items()])
+    conn.execute("DELETE FROM ticket_rollups WHERE source = ? AND count <= 0", (source,))
+    return len(counts)
+
+
+def rebuild_ticket_rollups(conn: sqlite3.Connection, source: str, tickets: pd.DataFrame):
+    """Replace all rollups of source with counts computed from tickets."""
+    create_ticket_rollup_tables(conn)
+    conn.execute("DELETE FROM ticket_rollups WHERE source = ?", (source,))
+    apply_ticket_delta(conn, source, tickets)
+
+
+def rebuild_db_rollups(conn: sqlite3.Connection):
+    """Recompute the it_tickets table rollups from scratch."""
+    tickets = pd.read_sql_query("SELECT priority, status, created_date FROM it_tickets", conn)
+    rebuild_ticket_rollups(conn, DB_SOURCE, tickets)
+    conn.commit()
+
+
+# CSV sources
+
+
+def csv_source(csv_path):
+    return f"csv:{Path(csv_path).resolve()}"
+
+
+def _recorded_version(conn: sqlite3.Connection, source: str):
+    row = conn.execute(
+        "SELECT mtime_ns, size FROM ticket_rollup_sources WHERE source = ?", (source,)
+    ).fetchone()
+    return tuple(row) if row else None
+
+
+def _record_version(conn: sqlite3.Connection, source: str, version):
+    conn.execute(
+        "INSERT OR REPLACE INTO ticket_rollup_sources (source, mtime_ns, size) VALUES (?, ?, ?)",
+        (source, version[0], version[1])
+    )
+
+
+def csv_rollups_current(conn: sqlite3.Connection, csv_path, version=None):
+    """True if the stored rollups describe csv_path at `version` (default: now)."""
+    create_ticket_rollup_tables(conn)
+    return _recorded_version(conn, csv_source(csv_path)) == (version or file_version(csv_path))
+
+
+def apply_csv_delta(conn: sqlite3.Connection, csv_path, before_version, tickets, sign: int = 1,
+                    after_version=None):
+    """
+    Fold a CSV write into its rollups. before_version/after_version are the
+    file versions around the write (after defaults to now); if the rollups
+    were already stale it does nothing and the next sync_csv_rollups()
+    rebuilds them instead.
+    """
+    if not csv_rollups_current(conn, csv_path, before_version):
+        return False
+    source = csv_source(csv_path)
+    apply_ticket_delta(conn, source, tickets, sign)
+    if isinstance(tickets, dict):
+        tickets = [tickets]
+    frame = tickets if isinstance(tickets, pd.DataFrame) else pd.DataFrame(list(tickets))
+    if not frame.empty:
+        apply_trend_delta(conn, source, trend_rows(frame, TICKET_TREND), sign)
+    _record_version(conn, source, after_version or file_version(csv_path))
+    conn.commit()
+    return True
+
+
+def sync_csv_rollups(conn: sqlite3.Connection, csv_path, loader=None):
+    """
+    Make sure the rollups for csv_path match the file on disk, rebuilding
+    them (one read of the needed columns) only when it changed outside
+    add_ticket_csv/delete_ticket_csv.
+    """
+    create_ticket_rollup_tables(conn)
+    source = csv_source(csv_path)
+    version = file_version(csv_path)
+    if _recorded_version(conn, source) == version and has_trends(conn, source):
+        return False
+
+    if loader is None:
+        tickets = pd.read_csv(csv_path, usecols=lambda c: c in SOURCE_COLUMNS)
+    else:
+        tickets = loader(csv_path, columns=SOURCE_COLUMNS)
+    rebuild_ticket_rollups(conn, source, tickets)
+    rebuild_trends(conn, source, trend_rows(tickets, TICKET_TREND))
+    _record_version(conn, source, version)
+    conn.commit()
+    return True
+
+
+def read_rollup(conn: sqlite3.Connection, source: str, dimension: str) -> pd.DataFrame:
+    """Return one dimension of the rollups as a DataFrame ending in a count column."""
+    cols = DIMENSIONS[dimension]
+    df = pd.read_sql_query(
+        "SELECT key1, key2, count FROM ticket_rollups WHERE source = ? AND dimension = ? ORDER BY key1, key2",
+        conn,
+        params=(source, dimension),
+    )
+    if len(cols) == 1:
+        df = df.drop(columns=["key2"])
+    df.columns = list(cols) + ["count"]
+    return df
@@ -0,0 +1,363 @@
+import csv
+import io
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from .frame_cache import file_version
+from .sidecar import SIDECAR_DIRNAME
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# compact once tombstones make up this share of the rows (and at least MIN_DEAD_ROWS)
+COMPACT_RATIO = 0.2
+MIN_DEAD_ROWS = 100
+
+
+class TicketStore:
+    """
+    Append-only storage engine for a tickets CSV.
+
+    - appends write one record at the end of the file: O(1) I/O
+    - a SQLite index next to the file maps ticket id -> (byte offset, length)
+      and remembers the next id, so nothing rescans the CSV
+    - deletes overwrite the row's bytes with newlines in place (a tombstone
+      every CSV reader already skips as blank lines; app.data.pagination
+      counts data rows, not lines, for the same reason)
+    - compaction rewrites the file without tombstones into a temp file and
+      swaps it in with an atomic rename, in a background thread
+    - every write holds an exclusive lock file so concurrent writers queue
+    """
+
+    def __init__(self, csv_path):
+        self.csv_path = Path(csv_path).resolve()
+        folder = self.csv_path.parent / SIDECAR_DIRNAME
+        folder.mkdir(exist_ok=True)
+        self.index_path = folder / f"{self.csv_path.stem}.index.db"
+        self.lock_path = folder / f"{self.csv_path.stem}.lock"
+
+        self._mutex = threading.RLock()
+        self._compacting = None
+        # callables(event, before_version, after_version, row) run under the
+        # write lock after "append", "delete" and "compact"
+        self.listeners = []
+        self._db = sqlite3.connect(str(self.index_path), check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS rows (
+                id TEXT PRIMARY KEY,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_rows_offset ON rows (offset);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+
+    # locking
+
+    @contextmanager
+    def locked(self):
+        """Exclusive lock across threads (RLock) and processes (flock)."""
+        with self._mutex:
+            with open(self.lock_path, "a") as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # metadata
+
+    def _meta(self, key, default=None):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, **values):
+        self._db.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [(k, str(v)) for k, v in values.items()]
+        )
+
+    def _record_version(self):
+        mtime, size = file_version(self.csv_path)
+        self._set_meta(mtime_ns=mtime, size=size)
+
+    def _applied(self, stamp):
+        """True if the write queue command stamp = (queue, seq) was already applied here."""
+        return stamp is not None and int(self._meta(f"applied:{stamp[0]}", 0)) >= stamp[1]
+
+    def _record_stamp(self, stamp):
+        if stamp is not None:
+            self._set_meta(**{f"applied:{stamp[0]}": stamp[1]})
+
+    def _notify(self, event, before, row=None):
+        after = file_version(self.csv_path)
+        for listener in self.listeners:
+            listener(event, before, after, row)
+
+    # file layout
+
+    def header(self):
+        with open(self.csv_path, newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if row:
+                    return [c.strip() for c in row]
+        return []
+
+    def id_column(self):
+        header = self.header()
+        for name in ("ticket_id", "id"):
+            if name in header:
+                return name
+        return None
+
+    def _scan(self):
+        """Yield (id, offset, length) for every live record in the file."""
+        header, id_pos = None, None
+        with open(self.csv_path, "rb") as f:
+            for offset, raw in iter_records(f):
+                if not raw.strip():
+                    continue
+                fields = parse_record(raw)
+                if header is None:
+                    header = [c.strip() for c in fields]
+                    id_pos = next((header.index(n) for n in ("ticket_id", "id") if n in header), None)
+                elif id_pos is not None and id_pos < len(fields):
+                    yield fields[id_pos].strip(), offset, len(raw)
+
+    def _rebuild_index(self):
+        """Re-read the CSV once to rebuild the offset index (file changed elsewhere)."""
+        ids = []
+        with self._db:
+            self._db.execute("DELETE FROM rows")
+            for ticket_id, offset, length in self._scan():
+                self._db.execute("INSERT OR REPLACE INTO rows (id, offset, length) VALUES (?, ?, ?)",
+                                 (ticket_id, offset, length))
+                ids.append(ticket_id)
+            prefix, width, seq = _id_pattern(ids)
+            self._set_meta(prefix=prefix, width=width, next_seq=seq, dead_rows=0)
+            self._record_version()
+
+    def sync(self):
+        """Rebuild the index only if the CSV was modified outside this store."""
+        version = file_version(self.csv_path)
+        recorded = (int(self._meta("mtime_ns", -1)), int(self._meta("size", -1)))
+        if recorded != version:
+            self._rebuild_index()
+
+    # operations
+
+    def next_id(self):
+        prefix = self._meta("prefix", "")
+        width = int(self._meta("width", 0))
+        seq = int(self._meta("next_seq", 1))
+        return f"{prefix}{seq:0{width}d}" if prefix else seq
+
+    def append(self, row: dict, stamp=None):
+        """
+        Append one ticket (dict keyed by CSV header). Assigns the next id if
+        the row has none. Returns the full row as written.
+
+        stamp = (queue name, seq) makes a replayed write queue command
+        idempotent: it is recorded with the row's index entry, and a command
+        already recorded is skipped (returns None).
+        """
+        with self.locked():
+            self.sync()
+            if self._applied(stamp):
+                return None
+            before = file_version(self.csv_path)
+            header = self.header()
+            id_col = self.id_column()
+            row = dict(row)
+            if id_col and not row.get(id_col):
+                row[id_col] = self.next_id()
+
+            buf = io.StringIO()
+            csv.writer(buf, lineterminator="\n").writerow([row.get(c, "") for c in header])
+            data = buf.getvalue().encode("utf-8")
+
+            with open(self.csv_path, "rb+") as f:
+                f.seek(0, os.SEEK_END)
+                end = f.tell()
+                if end:
+                    f.seek(end - 1)
+                    if f.read(1) not in (b"\n", b"\r"):
+                        f.write(b"\n")
+                        end += 1
+                f.write(data)
+
+            with self._db:
+                if id_col:
+                    ticket_id = str(row[id_col])
+                    self._db.execute("INSERT OR REPLACE INTO rows (id, offset, length) VALUES (?, ?, ?)",
+                                     (ticket_id, end, len(data)))
+                    digits = re.sub(r"\D", "", ticket_id)
+                    if digits and int(digits) >= int(self._meta("next_seq", 1)):
+                        self._set_meta(next_seq=int(digits) + 1)
+                self._record_stamp(stamp)
+                self._record_version()
+            written = {c: row.get(c, "") for c in header}
+            self._notify("append", before, written)
+            return written
+
+    def get(self, ticket_id):
+        """Read one ticket by id straight from its offset (None if absent)."""
+        with self._mutex:
+            self.sync()
+            hit = self._db.execute("SELECT offset, length FROM rows WHERE id = ?", (str(ticket_id),)).fetchone()
+            if not hit:
+                return None
+            with open(self.csv_path, "rb") as f:
+                f.seek(hit[0])
+                raw = f.read(hit[1])
+            return dict(zip(self.header(), parse_record(raw)))
+
+    def resolve_id(self, ticket_id):
+        """Map 5 / "5" / "TCK0005" to the id stored in the file."""
+        if self._db.execute("SELECT 1 FROM rows WHERE id = ?", (str(ticket_id),)).fetchone():
+            return str(ticket_id)
+        try:
+            seq = int(re.sub(r"\D", "", str(ticket_id)))
+        except ValueError:
+            return None
+        prefix = self._meta("prefix", "")
+        width = int(self._meta("width", 0))
+        candidate = f"{prefix}{seq:0{width}d}" if prefix else str(seq)
+        if self._db.execute("SELECT 1 FROM rows WHERE id = ?", (candidate,)).fetchone():
+            return candidate
+        return None
+
+    def delete(self, ticket_id, stamp=None):
+        """
+        Tombstone one ticket in place. Returns the deleted row (dict) or None.
+        Schedules a background compaction when enough rows are dead.
+        stamp works as in append().
+        """
+        with self.locked():
+            self.sync()
+            if self._applied(stamp):
+                return None
+            stored_id = self.resolve_id(ticket_id)
+            if stored_id is None:
+                return None
+            row = self.get(stored_id)
+            offset, length = self._db.execute(
+                "SELECT offset, length FROM rows WHERE id = ?", (stored_id,)).fetchone()
+
+            before = file_version(self.csv_path)
+            with open(self.csv_path, "rb+") as f:
+                f.seek(offset)
+                f.write(b"\n" * length)
+
+            with self._db:
+                self._db.execute("DELETE FROM rows WHERE id = ?", (stored_id,))
+                self._set_meta(dead_rows=int(self._meta("dead_rows", 0)) + 1)
+                self._record_stamp(stamp)
+                self._record_version()
+            self._notify("delete", before, row)
+
+        self.maybe_compact()
+        return row
+
+    def live_rows(self):
+        return self._db.execute("SELECT COUNT(*) FROM rows").fetchone()[0]
+
+    # compaction
+
+    def needs_compaction(self):
+        dead = int(self._meta("dead_rows", 0))
+        return dead >= MIN_DEAD_ROWS and dead >= COMPACT_RATIO * max(self.live_rows(), 1)
+
+    def compact(self):
+        """Rewrite the CSV without tombstones and swap it in atomically."""
+        with self.locked():
+            self.sync()
+            before = file_version(self.csv_path)
+            tmp = self.csv_path.with_suffix(self.csv_path.suffix + ".compact")
+            with open(self.csv_path, "rb") as src, open(tmp, "wb") as dst:
+                for _, raw in iter_records(src):
+                    if raw.strip():
+                        dst.write(raw)
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.replace(tmp, self.csv_path)
+            self._rebuild_index()
+            self._notify("compact", before)
+
+    def maybe_compact(self, background: bool = True):
+        """Compact if needed, by default in a daemon thread."""
+        if not self.needs_compaction():
+            return None
+        if not background:
+            self.compact()
+            return None
+        if self._compacting is None or not self._compacting.is_alive():
+            self._compacting = threading.Thread(target=self.compact, daemon=True)
+            self._compacting.start()
+        return self._compacting
+
+
+def iter_records(f):
+    """
+    Yield (byte offset, raw bytes) for each CSV record in a binary file.
+
+    A record ends at a newline outside quotes, so a quoted field holding
+    newlines stays in one record. Tombstones and blank lines come out as
+    whitespace-only records; callers skip them.
+    """
+    offset, start, quotes, parts = 0, 0, 0, []
+    for line in f:
+        if not parts:
+            start = offset
+        parts.append(line)
+        quotes += line.count(b'"')
+        offset += len(line)
+        if quotes % 2 == 0:
+            yield start, b"".join(parts)
+            quotes, parts = 0, []
+    if parts:
+        yield start, b"".join(parts)
+
+
+def parse_record(raw: bytes):
+    """Fields of one raw CSV record (as read by iter_records)."""
+    return next(csv.reader(io.StringIO(raw.decode("utf-8"), newline="")), [])
+
+
+def _id_pattern(ids):
+    """(prefix, digit width, next sequence number) inferred from existing ids."""
+    best, best_seq = None, 0
+    for ticket_id in ids:
+        match = re.match(r"^(.*?)(\d+)$", ticket_id)
+        if match and int(match.group(2)) >= best_seq:
+            best, best_seq = match, int(match.group(2))
+    if best is None:
+        return "", 0, 1
+    prefix, digits = best.groups()
+    return prefix, len(digits) if prefix else 0, best_seq + 1
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_ticket_store(csv_path) -> TicketStore:
+    """Shared TicketStore per CSV file."""
+    key = str(Path(csv_path).resolve())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = TicketStore(csv_path)
+            _stores[key] = store
+        return store
@@ -1,6 +1,16 @@
 import pandas as pd
-from .db import connect_database  # Assuming .db contains connect_database
+from .db import get_connection
 import sqlite3
+import csv
+from datetime import date
+from pathlib import Path
+
+from .batch import unit_of_work, chunked, DEFAULT_CHUNK_SIZE
+from .ingest import ingest_csv, DEFAULT_CSV_CHUNKSIZE
+from .ticket_aggregates import DB_SOURCE, apply_ticket_delta, apply_csv_delta
+from .ticket_store import get_ticket_store
+from .retrieval import apply_csv_change
+from .write_queue import get_write_queue, write_operation
 
 # FIX 1 & 2: Defines the missing function, using correct table name 'it_tickets'
 def get_all_tickets(conn: sqlite3.Connection):
@@ -28,24 +38,35 @@ def get_all_tickets(conn: sqlite3.Connection):
         print(f"Error fetching all tickets: {e}") 
         return []
 
+# CSV headers that map onto it_tickets columns
+TICKET_RENAME_MAP = {
+    "subject": "title",
+}
+
+
 # FIX 3: Defines the missing bulk loading function
-def load_it_tickets_csv(conn: sqlite3.Connection, file_path="DATA/it_tickets.csv"):
+def load_it_tickets_csv(conn: sqlite3.Connection, file_path="DATA/it_tickets.csv",
+                        chunksize: int = DEFAULT_CSV_CHUNKSIZE):
     """
-    Loads IT tickets data from a CSV file into the 'it_tickets' table.
+    Streams IT tickets data from a CSV file into the 'it_tickets' table.
     
     :param conn: The database connection object.
     :param file_path: Path to the IT tickets CSV file.
+    :param chunksize: Rows read and committed per chunk.
     :return: The number of rows loaded.
     """
     try:
-        # 1. Read the CSV file into a pandas DataFrame
-        df = pd.read_csv(file_path)
-        
-        # 2. Use the pandas to_sql method to write data to the SQLite table
-        # if_exists='append' adds new rows, index=False skips writing the DataFrame index
-        df.to_sql('it_tickets', conn, if_exists='append', index=False)
-        
-        return len(df)
+        # Only CSV columns that exist in it_tickets are loaded, one chunk per transaction
+        return ingest_csv(
+            conn,
+            file_path,
+            "it_tickets",
+            rename_map=TICKET_RENAME_MAP,
+            dtypes={"title": "str", "priority": "str", "status": "str", "created_date": "str"},
+            required=["title", "priority", "created_date"],
+            chunksize=chunksize,
+            on_chunk=lambda c, chunk: apply_ticket_delta(c, DB_SOURCE, chunk),
+        )
     except FileNotFoundError:
         print(f"Error: CSV file not found at {file_path}")
         return 0
@@ -56,16 +77,166 @@ def load_it_tickets_csv(conn: sqlite3.Connection, file_path="DATA/it_tickets.csv
 
 def update_ticket_priority(ticket_id: int, new_priority: str):
     """
-    Updates the priority of an IT ticket. 
-    Note: This function uses connect_database() internally, which may be inconsistent
-    with other functions that take `conn` as an argument.
+    Updates the priority of an IT ticket and its Analytics rollups.
+    Note: This function borrows a pooled connection via get_connection(),
+    unlike other functions that take `conn` as an argument.
     """
-    conn = connect_database() 
-    cursor = conn.cursor()
-    cursor.execute("""
-        UPDATE it_tickets SET priority = ? WHERE id = ?""",
-        (new_priority, ticket_id))
-    rows_affected = cursor.rowcount
-    conn.commit()
-    conn.close()
-    return rows_affected > 0
\ No newline at end of file
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        old = _rollup_rows(conn, [ticket_id])
+        cursor.execute("""
+            UPDATE it_tickets SET priority = ? WHERE id = ?""",
+            (new_priority, ticket_id))
+        rows_affected = cursor.rowcount
+        if rows_affected:
+            apply_ticket_delta(conn, DB_SOURCE, old, sign=-1)
+            apply_ticket_delta(conn, DB_SOURCE, old.assign(priority=new_priority))
+    return rows_affected > 0
+
+
+def _rollup_rows(conn: sqlite3.Connection, ticket_ids):
+    """Current priority/status/created_date of the given tickets, for rollup deltas."""
+    ids = [int(i) for i in ticket_ids]
+    if not ids:
+        return pd.DataFrame(columns=["id", "priority", "status", "created_date"])
+    marks = ", ".join("?" for _ in ids)
+    return pd.read_sql_query(
+        f"SELECT id, priority, status, created_date FROM it_tickets WHERE id IN ({marks})",
+        conn,
+        params=ids,
+    )
+
+
+TICKET_COLUMNS = ("id", "title", "priority", "status", "created_date")
+
+
+def upsert_tickets_many(conn: sqlite3.Connection, tickets, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Insert or update many tickets in one transaction.
+
+    :param tickets: iterable of dicts (keys from TICKET_COLUMNS) or tuples in that order.
+                    Rows whose id already exists are updated in place.
+    :return: The number of rows written.
+    """
+    sql = """
+        INSERT INTO it_tickets (id, title, priority, status, created_date)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            title = excluded.title,
+            priority = excluded.priority,
+            status = excluded.status,
+            created_date = excluded.created_date
+    """
+    rows = (
+        tuple(t.get(c) for c in TICKET_COLUMNS) if isinstance(t, dict) else tuple(t)
+        for t in tickets
+    )
+    written = 0
+    with unit_of_work(conn):
+        for chunk in chunked(rows, chunk_size):
+            # swap the old version of each ticket for the new one in the rollups
+            old = _rollup_rows(conn, [r[0] for r in chunk if r[0] is not None])
+            conn.executemany(sql, chunk)
+            apply_ticket_delta(conn, DB_SOURCE, old, sign=-1)
+            apply_ticket_delta(conn, DB_SOURCE, pd.DataFrame(chunk, columns=TICKET_COLUMNS))
+            written += len(chunk)
+    return written
+
+
+def delete_tickets_many(conn: sqlite3.Connection, ticket_ids, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Delete many tickets by id in one transaction. Returns number of deleted rows."""
+    removed = 0
+    with unit_of_work(conn):
+        for chunk in chunked((int(i) for i in ticket_ids), chunk_size):
+            old = _rollup_rows(conn, chunk)
+            cursor = conn.executemany("DELETE FROM it_tickets WHERE id = ?", [(i,) for i in chunk])
+            removed += cursor.rowcount
+            apply_ticket_delta(conn, DB_SOURCE, old, sign=-1)
+    return removed
+
+
+# CSV TICKETS (used by Pages/crud.py)
+
+# form field -> CSV column, used when the CSV has no column of that name
+CSV_FIELD_ALIASES = {
+    "title": "subject",
+    "severity": "priority",
+}
+
+
+def _clean_row(row):
+    return {c: v if v != "" else None for c, v in row.items()}
+
+
+def _ticket_store(csv_path):
+    """Shared store for csv_path, wired to keep its rollups and search docs in step."""
+    store = get_ticket_store(csv_path)
+    if not any(getattr(l, "keeps_rollups", False) for l in store.listeners):
+        def on_write(event, before, after, row):
+            # runs under the store's write lock, so versions can't interleave
+            with get_connection() as conn:
+                apply_csv_change(conn, csv_path, before, after, row, removed=event == "delete")
+                if event == "compact":
+                    apply_csv_delta(conn, csv_path, before, [], after_version=after)
+                else:
+                    sign = -1 if event == "delete" else 1
+                    apply_csv_delta(conn, csv_path, before, _clean_row(row), sign, after)
+        on_write.keeps_rollups = True
+        store.listeners.append(on_write)
+    return store
+
+
+def add_ticket_csv(csv_path, ticket: dict, wait: bool = True):
+    """
+    Append one ticket to the tickets CSV and update its rollups
+    (applied by the write queue, like the other CRUD page writes).
+
+    :param csv_path: Path to the tickets CSV (created if missing).
+    :param ticket: Field values; form names are mapped via CSV_FIELD_ALIASES.
+    :param wait: Block for the result; if False a Future is returned.
+    :return: The id given to the new ticket.
+    """
+    return get_write_queue()("add_ticket_csv", csv_path, dict(ticket), wait=wait)
+
+
+@write_operation("add_ticket_csv", kind="file")
+def _append_ticket_csv(csv_path, ticket: dict, stamp=None):
+    csv_path = Path(csv_path)
+    ticket = dict(ticket)
+
+    if not csv_path.exists():
+        header = ["id"] + [k for k in ticket if k != "id"]
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerow(header)
+
+    store = _ticket_store(csv_path)
+    header = store.header()
+    for field, column in CSV_FIELD_ALIASES.items():
+        if field in ticket and field not in header and column in header:
+            ticket.setdefault(column, ticket.pop(field))
+    if "created_date" in header:
+        ticket.setdefault("created_date", date.today().isoformat())
+
+    written = store.append(ticket, stamp=stamp)
+    if written is None:
+        return None  # replayed after a crash; appended the first time round
+    id_col = store.id_column()
+    return written.get(id_col) if id_col else None
+
+
+def delete_ticket_csv(csv_path, ticket_id, wait: bool = True):
+    """
+    Remove the ticket with the given id (e.g. 5 or "TCK0005") from the CSV.
+    :return: The number of rows removed (a Future of it if wait is False).
+    """
+    return get_write_queue()("delete_ticket_csv", csv_path, ticket_id, wait=wait)
+
+
+@write_operation("delete_ticket_csv", kind="file")
+def _delete_ticket_csv(csv_path, ticket_id, stamp=None):
+    csv_path = Path(csv_path)
+    if not csv_path.exists():
+        return 0
+
+    removed = _ticket_store(csv_path).delete(ticket_id, stamp=stamp)
+    return 0 if removed is None else 1
@@ -0,0 +1,287 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+# Where each source keeps the columns trends are counted by:
+# level (severity or priority), status, category and the date the row is bucketed on.
+# Columns a table doesn't have (cyber_incidents has no category) count as 'N/A'.
+TREND_SPECS = {
+    "cyber_incidents": {"level": "severity", "status": "status", "category": "category", "date": "date"},
+    "it_tickets": {"level": "priority", "status": "status", "category": "category", "date": "created_date"},
+}
+LABEL_COLUMNS = ("level", "status", "category")
+MISSING_LABEL = "N/A"
+
+# Stored grains. Every row is counted once per grain; buckets are integers:
+#   day   = days since 1970-01-01
+#   week  = (day + 3) // 7, weeks starting on Monday
+#   month = year * 12 + month - 1
+DAY, WEEK, MONTH = 0, 1, 2
+# requested grain -> (stored grain it is read from, buckets merged per period)
+GRAINS = {
+    "day": (DAY, 1),
+    "week": (WEEK, 1),
+    "month": (MONTH, 1),
+    "quarter": (MONTH, 3),
+    "year": (MONTH, 12),
+}
+EPOCH_MONTH = 1970 * 12
+
+
+def create_trend_tables(conn: sqlite3.Connection):
+    """Create the integer-keyed tables behind the trend charts."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS trend_sources (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS trend_labels (
+            id INTEGER PRIMARY KEY,
+            label TEXT NOT NULL UNIQUE
+        );
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS trend_counts (
+            source INTEGER NOT NULL,
+            grain INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            level INTEGER NOT NULL,
+            status INTEGER NOT NULL,
+            category INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (source, grain, bucket, level, status, category)
+        ) WITHOUT ROWID;
+    """)
+
+
+def _source_id(conn: sqlite3.Connection, name: str, create: bool = True):
+    if create:
+        conn.execute("INSERT OR IGNORE INTO trend_sources (name) VALUES (?)", (name,))
+    row = conn.execute("SELECT id FROM trend_sources WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def _label_ids(conn: sqlite3.Connection, labels) -> dict:
+    labels = list(labels)
+    conn.executemany("INSERT OR IGNORE INTO trend_labels (label) VALUES (?)", [(l,) for l in labels])
+    ids = {}
+    for i in range(0, len(labels), 500):  # stay under SQLite's bound-parameter limit
+        chunk = labels[i:i + 500]
+        ids.update({label: id_ for id_, label in conn.execute(
+            f"SELECT id, label FROM trend_labels WHERE label IN ({', '.join('?' * len(chunk))})", chunk)})
+    return ids
+
+
+def day_numbers(dates) -> np.ndarray:
+    """Days since 1970-01-01 of ISO dates (strings or datetimes); -1 marks unparseable ones."""
+    parsed = pd.to_datetime(pd.Series(dates), errors="coerce", format="ISO8601")
+    days = parsed.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+    out = days.astype(np.int64)
+    out[np.isnat(days)] = -1
+    return out
+
+
+def _buckets(days: np.ndarray):
+    """(day, week, month) bucket arrays for day numbers, matching the SQL in the triggers."""
+    week = (days + 3) // 7
+    month = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64) + EPOCH_MONTH
+    return days, week, month
+
+
+# INCREMENTAL UPDATES
+
+
+def apply_trend_delta(conn: sqlite3.Connection, source: str, rows: pd.DataFrame, sign: int = 1):
+    """
+    Add (sign=1) or remove (sign=-1) rows from the trend counts of source.
+    rows has the LABEL_COLUMNS plus "day" (from day_numbers; -1 rows are
+    skipped). Does not commit.
+    """
+    rows = rows[rows["day"] >= 0]
+    if rows.empty:
+        return 0
+    create_trend_tables(conn)
+    source_id = _source_id(conn, source)
+
+    labels = {
+        c: rows[c].astype(object).where(rows[c].notna(), MISSING_LABEL).astype(str)
+        for c in LABEL_COLUMNS
+    }
+    ids = _label_ids(conn, pd.unique(pd.concat(labels.values(), ignore_index=True)))
+    keys = pd.DataFrame({c: labels[c].map(ids).to_numpy() for c in LABEL_COLUMNS})
+
+    written = 0
+    for grain, bucket in enumerate(_buckets(rows["day"].to_numpy(dtype=np.int64))):
+        keys["bucket"] = bucket
+        grouped = keys.groupby(["bucket", *LABEL_COLUMNS]).size()
+        conn.executemany("""
+            INSERT INTO trend_counts (source, grain, bucket, level, status, category, count)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(source, grain, bucket, level, status, category)
+            DO UPDATE SET count = count + excluded.count
+        """, [(source_id, grain, *map(int, key), sign * int(n)) for key, n in grouped.items()])
+        written += len(grouped)
+    return written
+
+
+def has_trends(conn: sqlite3.Connection, source: str) -> bool:
+    """True once source has been counted (even if it had no rows)."""
+    create_trend_tables(conn)
+    return _source_id(conn, source, create=False) is not None
+
+
+def rebuild_trends(conn: sqlite3.Connection, source: str, rows: pd.DataFrame):
+    """Replace all trend counts of source with counts computed from rows."""
+    create_trend_tables(conn)
+    conn.execute("DELETE FROM trend_counts WHERE source = ?", (_source_id(conn, source),))
+    apply_trend_delta(conn, source, rows)
+
+
+def trend_rows(frame: pd.DataFrame, spec: dict) -> pd.DataFrame:
+    """Map a frame with a source's own columns (see TREND_SPECS) onto LABEL_COLUMNS + day."""
+    rows = pd.DataFrame(index=frame.index)
+    for col in LABEL_COLUMNS:
+        name = spec[col]
+        rows[col] = frame[name] if name in frame.columns else None
+    rows["day"] = day_numbers(frame[spec["date"]]) if spec["date"] in frame.columns else -1
+    return rows
+
+
+# TABLE SOURCES (kept up to date by triggers)
+
+
+def _trigger_sql(table: str, spec: dict, columns, source_id: int):
+    """CREATE TRIGGER statements keeping source_id's counts in step with table."""
+    def label(ref, col):
+        name = spec[col]
+        if name not in columns:
+            return f"'{MISSING_LABEL}'"
+        return f"COALESCE(CAST({ref}.{name} AS TEXT), '{MISSING_LABEL}')"
+
+    def change(ref, sign):
+        date = f"{ref}.{spec['date']}"
+        day = f"CAST(julianday({date}) - 2440587.5 AS INTEGER)"
+        month = f"CAST(strftime('%Y', {date}) AS INTEGER) * 12 + CAST(strftime('%m', {date}) AS INTEGER) - 1"
+        labels = [label(ref, c) for c in LABEL_COLUMNS]
+        return f"""
+            INSERT OR IGNORE INTO trend_labels (label) VALUES ({'), ('.join(labels)});
+            INSERT INTO trend_counts (source, grain, bucket, level, status, category, count)
+            SELECT {source_id}, g.grain, g.bucket,
+                   (SELECT id FROM trend_labels WHERE label = {labels[0]}),
+                   (SELECT id FROM trend_labels WHERE label = {labels[1]}),
+                   (SELECT id FROM trend_labels WHERE label = {labels[2]}),
+                   {sign}
+            FROM (SELECT {DAY} AS grain, {day} AS bucket
+                  UNION ALL SELECT {WEEK}, ({day} + 3) / 7
+                  UNION ALL SELECT {MONTH}, {month}) AS g
+            WHERE julianday({date}) IS NOT NULL
+            ON CONFLICT(source, grain, bucket, level, status, category)
+            DO UPDATE SET count = count + excluded.count;"""
+
+    watched = ", ".join(spec[c] for c in ("level", "status", "category", "date") if spec[c] in columns)
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS trend_{table}_ai AFTER INSERT ON {table} BEGIN {change('NEW', 1)} END",
+        f"CREATE TRIGGER IF NOT EXISTS trend_{table}_ad AFTER DELETE ON {table} BEGIN {change('OLD', -1)} END",
+        f"CREATE TRIGGER IF NOT EXISTS trend_{table}_au AFTER UPDATE OF {watched} ON {table} "
+        f"BEGIN {change('OLD', -1)} {change('NEW', 1)} END",
+    ]
+
+
+def install_trend_rollups(conn: sqlite3.Connection, table: str) -> bool:
+    """
+    Start keeping trends for a table: add its triggers and count the rows
+    already there. Does nothing (returns False) if they are installed or
+    the table doesn't exist. Commits.
+    """
+    exists = {name for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE name IN (?, ?)", (table, f"trend_{table}_ai"))}
+    if table not in exists or f"trend_{table}_ai" in exists:
+        return False
+
+    spec = TREND_SPECS[table]
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")  # no writes between the backfill and the triggers
+    create_trend_tables(conn)
+    source_id = _source_id(conn, table)
+    for sql in _trigger_sql(table, spec, columns, source_id):
+        conn.execute(sql)
+
+    # same day arithmetic as the triggers, so later deletes undo exactly these counts
+    selects = [f"{spec[c]} AS {c}" if spec[c] in columns else f"NULL AS {c}" for c in LABEL_COLUMNS]
+    rows = pd.read_sql_query(
+        f"SELECT {', '.join(selects)}, CAST(julianday({spec['date']}) - 2440587.5 AS INTEGER) AS day "
+        f"FROM {table} WHERE julianday({spec['date']}) IS NOT NULL",
+        conn,
+    )
+    rebuild_trends(conn, table, rows)
+    conn.commit()
+    return True
+
+
+# READING
+
+
+def bucket_starts(grain: str, buckets) -> pd.DatetimeIndex:
+    """First day of each bucket number at the given grain (see GRAINS)."""
+    stored, factor = GRAINS[grain]
+    buckets = np.asarray(buckets, dtype=np.int64)
+    if stored == DAY:
+        days = buckets
+    elif stored == WEEK:
+        days = buckets * 7 - 3
+    else:
+        months = (buckets * factor - EPOCH_MONTH).astype("datetime64[M]")
+        return pd.DatetimeIndex(months.astype("datetime64[D]"))
+    return pd.DatetimeIndex(days.astype("datetime64[D]"))
+
+
+def read_trend(conn: sqlite3.Connection, source: str, grain: str = "month", by: str = None,
+               start=None, end=None, **filters) -> pd.DataFrame:
+    """
+    Counts of source per period at grain ("day", "week", "month", "quarter"
+    or "year"), optionally split by one of LABEL_COLUMNS. Coarser grains are
+    summed from the stored buckets, never from raw rows.
+
+    :param start, end: only count stored buckets (day/week/month) from start to end
+    :param filters: label filters, e.g. status="Open"
+    :return: DataFrame of period (first day), [by], count
+    """
+    stored, factor = GRAINS[grain]
+    columns = ["period"] + ([by] if by else []) + ["count"]
+    create_trend_tables(conn)
+    source_id = _source_id(conn, source, create=False)
+    if source_id is None:
+        return pd.DataFrame(columns=columns)
+
+    where = ["t.source = ?", "t.grain = ?"]
+    params = [source_id, stored]
+    for bound, op in ((start, ">="), (end, "<=")):
+        if bound is not None:
+            where.append(f"t.bucket {op} ?")
+            params.append(int(_buckets(day_numbers([bound]))[stored][0]))
+    for col, value in filters.items():
+        if col not in LABEL_COLUMNS:
+            raise ValueError(f"Unknown trend filter: {col}")
+        where.append(f"t.{col} = (SELECT id FROM trend_labels WHERE label = ?)")
+        params.append(str(value))
+
+    if by is not None and by not in LABEL_COLUMNS:
+        raise ValueError(f"Unknown trend dimension: {by}")
+    df = pd.read_sql_query(
+        f"""
+        SELECT t.bucket / {factor} AS b{', l.label AS ' + by if by else ''}, SUM(t.count) AS count
+        FROM trend_counts t {'JOIN trend_labels l ON l.id = t.' + by if by else ''}
+        WHERE {' AND '.join(where)}
+        GROUP BY b{', l.label' if by else ''}
+        HAVING SUM(t.count) > 0
+        ORDER BY b{', l.label' if by else ''}
+        """,
+        conn,
+        params=params,
+    )
+    df.insert(0, "period", bucket_starts(grain, df.pop("b")))
+    return df[columns]
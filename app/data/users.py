@@ -1,24 +1,57 @@
-from app.data.db import connect_database
+from app.data.db import get_connection
 
 def get_user_by_username(username):
     """Retrieve user by username."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT * FROM users WHERE username = ?",
-        (username,)
-    )
-    user = cursor.fetchone()
-    conn.close()
-    return user
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT * FROM users WHERE username = ?",
+            (username,)
+        )
+        return cursor.fetchone()
 
 def insert_user(username, password_hash, role='user'):
-    """Insert new user."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-        (username, password_hash, role)
-    )
-    conn.commit()
-    conn.close()
\ No newline at end of file
+    """Insert new user. Raises sqlite3.IntegrityError if the username is taken."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+            (username, password_hash, role)
+        )
+        return cursor.lastrowid
+
+def update_password_hash(username, password_hash):
+    """Replace a user's password hash (e.g. after a cost change)."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE users SET password_hash = ? WHERE username = ?",
+            (password_hash, username)
+        )
+        return cursor.rowcount
+
+def get_existing_usernames(usernames):
+    """Subset of usernames already in the users table (one query per 500 names)."""
+    usernames = list(usernames)
+    found = set()
+    with get_connection() as conn:
+        for i in range(0, len(usernames), 500):
+            chunk = usernames[i:i + 500]
+            marks = ", ".join("?" * len(chunk))
+            found.update(r[0] for r in conn.execute(
+                f"SELECT username FROM users WHERE username IN ({marks})", chunk
+            ))
+    return found
+
+def insert_users(rows):
+    """
+    Bulk insert (username, password_hash, role) rows with executemany,
+    skipping usernames that already exist. Returns the number inserted.
+    """
+    with get_connection() as conn:
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+            rows
+        )
+        return conn.total_changes - before
@@ -0,0 +1,345 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from pathlib import Path
+
+from .batch import unit_of_work
+from .db import get_connection
+
+JOURNAL_PATH = Path("DATA") / ".write_queue.jsonl"
+MAX_PENDING = 1000      # commands accepted but not yet applied; submit() blocks beyond this
+MAX_BATCH = 256         # commands applied per group commit
+SUBMIT_TIMEOUT = 10.0   # seconds submit() waits for room before raising queue.Full
+RESULT_TIMEOUT = 60.0   # seconds a waiting call waits for its command to be applied
+COMPACT_LINES = 1000    # journal lines before an idle queue truncates it
+
+# name -> (function, kind, prepare)
+#   kind "db":   function(conn, *args), grouped per database into one transaction
+#   kind "file": function(target, *args, stamp=(queue name, seq)), applied on its
+#                own (CSV stores); it records stamp with the write and skips a
+#                stamp it has seen, so a replay applies it once
+# prepare(conn) runs once per group before the transaction (e.g. CREATE TABLE,
+# which commits on its own and so can't run inside one)
+OPERATIONS = {}
+
+
+def write_operation(name: str, kind: str = "db", prepare=None):
+    """Register a function the queue can apply (and replay) under name."""
+    def register(fn):
+        OPERATIONS[name] = (fn, kind, prepare)
+        return fn
+    return register
+
+
+def _load_operations():
+    # the modules register their operations on import; needed before a replay
+    from . import incidents, tickets  # noqa: F401
+
+
+class WriteQueue:
+    """
+    Single background writer for the CRUD page.
+
+    submit() records a command in an append-only journal, queues it and
+    returns a Future. The worker takes everything waiting (up to
+    max_batch), applies the commands for each database in one transaction
+    (each inside its own SAVEPOINT, so a failing command only fails its own
+    Future) and commits once per database. CSV commands run one at a time.
+
+    Only max_pending commands may be outstanding; submit() blocks for room
+    and raises queue.Full after timeout.
+
+    On start, commands journaled but never applied (the process died) are
+    replayed. Database commands are applied exactly once: each database
+    records the last sequence number it committed in write_queue_applied,
+    in the same transaction. CSV commands get (queue name, seq) as stamp,
+    which the ticket store records next to the row's index entry.
+    """
+
+    def __init__(self, journal_path=JOURNAL_PATH, max_pending: int = MAX_PENDING,
+                 max_batch: int = MAX_BATCH, fsync: bool = False):
+        self.journal_path = Path(journal_path)
+        self.name = None  # "<journal stem>:<epoch>", fixed when the journal is opened
+        self.max_batch = max_batch
+        self.fsync = fsync
+
+        self._queue = queue.Queue()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()       # journal file + sequence numbers
+        self._journal = None
+        self._journal_lines = 0
+        self._seq = 0
+        self._done = 0
+        self._thread = None
+        self._prepared = set()  # targets (and (target, prepare) pairs) already set up
+        self._stats = {"submitted": 0, "applied": 0, "failed": 0, "replayed": 0,
+                       "batches": 0, "commits": 0, "apply_time": 0.0}
+
+    # journal
+
+    def _write(self, record: dict):
+        self._journal.write(json.dumps(record) + "\n")
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+        self._journal_lines += 1
+
+    def _read_journal(self):
+        """(epoch, last checkpoint, commands after it) from an existing journal."""
+        epoch, done, commands = None, 0, []
+        if self.journal_path.exists():
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # torn last line: that command was never acknowledged
+                    if "epoch" in record:
+                        epoch = record["epoch"]
+                    elif "done" in record:
+                        done = max(done, record["done"])
+                    else:
+                        commands.append(record)
+        return epoch, done, [c for c in commands if isinstance(c.get("seq"), int) and c["seq"] > done]
+
+    def _checkpoint(self, seq: int):
+        with self._lock:
+            self._done = max(self._done, seq)
+            try:
+                if self._done == self._seq and self._journal_lines >= COMPACT_LINES:
+                    # everything journaled has been applied: start a fresh file
+                    self._journal.seek(0)
+                    self._journal.truncate()
+                    self._journal_lines = 0
+                    self._write({"epoch": self.name.split(":", 1)[1]})
+                self._write({"done": self._done})
+            except OSError as e:
+                # the commands are applied; a lost checkpoint only means more replay
+                print(f"write queue checkpoint of {self.name} failed: {e}")
+
+    # lifecycle
+
+    def start(self):
+        """Open the journal, queue any commands left from a previous run and start the worker."""
+        if self._thread is not None:
+            return self
+        _load_operations()
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        epoch, self._done, pending = self._read_journal()
+        self._seq = max([self._done] + [c["seq"] for c in pending])
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        if epoch is None:
+            # a new journal numbers from 1 again, so it must not match what
+            # databases recorded for an older one
+            epoch = uuid.uuid4().hex
+            self._write({"epoch": epoch})
+        self.name = f"{self.journal_path.stem}:{epoch}"
+
+        self._thread = threading.Thread(target=self._run, name=f"write-queue-{self.name}", daemon=True)
+        self._thread.start()
+        for record in pending:
+            self._slots.acquire()  # the worker is running, so a long replay just waits for room
+            self._queue.put((record, Future()))
+            self._stats["replayed"] += 1
+        return self
+
+    def close(self, timeout: float = None):
+        """Apply everything already queued, then stop the worker."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+        with self._lock:
+            self._journal.close()
+
+    # submitting
+
+    def submit(self, op: str, target, *args, timeout: float = SUBMIT_TIMEOUT) -> Future:
+        """
+        Queue op(target, *args) and return its Future (result or exception).
+        Blocks while max_pending commands are outstanding; raises queue.Full
+        if no room frees up within timeout (None waits forever).
+        """
+        if op not in OPERATIONS:
+            raise KeyError(f"Unknown write operation: {op}")
+        if self._thread is None:
+            raise RuntimeError("Write queue is not running")
+        if not self._slots.acquire(timeout=-1 if timeout is None else timeout):
+            raise queue.Full(f"Write queue full ({self._stats['submitted'] - self._stats['applied'] - self._stats['failed']} pending)")
+
+        future = Future()
+        with self._lock:
+            self._seq += 1
+            record = {"seq": self._seq, "op": op, "target": str(target), "args": list(args)}
+            try:
+                self._write(record)
+            except Exception:
+                self._seq -= 1
+                self._slots.release()
+                raise
+            self._queue.put((record, future))
+            self._stats["submitted"] += 1
+        return future
+
+    def __call__(self, op: str, target, *args, wait: bool = True, timeout: float = SUBMIT_TIMEOUT,
+                 result_timeout: float = RESULT_TIMEOUT):
+        """
+        submit() and, if wait, block for the result (re-raising the command's
+        error). Raises TimeoutError if it isn't applied within result_timeout.
+        """
+        future = self.submit(op, target, *args, timeout=timeout)
+        return future.result(timeout=result_timeout) if wait else future
+
+    # worker
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            stop = item is None
+            batch = [] if stop else [item]
+            while len(batch) < self.max_batch and not stop:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+            if batch:
+                try:
+                    self._apply(batch)
+                except Exception as e:
+                    # the worker must survive: fail whatever the batch didn't get to
+                    print(f"write queue {self.name} batch failed: {e!r}")
+                    for _, future in batch:
+                        if not future.done():
+                            self._resolve(future, None, e)
+            if stop:
+                return
+
+    def _resolve(self, future, result, error):
+        self._slots.release()
+        if error is None:
+            self._stats["applied"] += 1
+            future.set_result(result)
+        else:
+            self._stats["failed"] += 1
+            future.set_exception(error)
+
+    @staticmethod
+    def _check(record):
+        """Why a (possibly replayed) record can't be applied, or None."""
+        if record.get("op") not in OPERATIONS:
+            return KeyError(f"Unknown write operation: {record.get('op')}")
+        if not isinstance(record.get("target"), str) or not isinstance(record.get("args"), list):
+            return ValueError(f"Malformed write queue record: {record!r}")
+        return None
+
+    def _apply(self, batch):
+        t = time.perf_counter()
+        groups = {}
+        for record, future in batch:
+            error = self._check(record)
+            if error is not None:
+                self._resolve(future, None, error)
+                continue
+            kind = OPERATIONS[record["op"]][1]
+            key = (kind, record["target"]) if kind == "db" else ("file", record["seq"])
+            groups.setdefault(key, []).append((record, future))
+
+        for (kind, _), items in groups.items():
+            if kind == "db":
+                outcomes = self._apply_db(items[0][0]["target"], items)
+            else:
+                record, _ = items[0]
+                fn = OPERATIONS[record["op"]][0]
+                try:
+                    outcomes = [(fn(record["target"], *record["args"], stamp=(self.name, record["seq"])), None)]
+                except Exception as e:
+                    outcomes = [(None, e)]
+                self._checkpoint(record["seq"])
+
+            for (record, future), (result, error) in zip(items, outcomes):
+                self._resolve(future, result, error)
+
+        if batch[-1][0]["seq"] > self._done:
+            self._checkpoint(batch[-1][0]["seq"])
+        self._stats["batches"] += 1
+        self._stats["apply_time"] += time.perf_counter() - t
+
+    def _apply_db(self, target, items):
+        """Apply one database's commands in a single transaction; returns [(result, error)]."""
+        try:
+            with get_connection(target) as conn:
+                # schema setup commits on its own, so it runs once per database and op
+                for prepare in {OPERATIONS[r["op"]][2] for r, _ in items} - {None}:
+                    if (target, prepare) not in self._prepared:
+                        prepare(conn)
+                        self._prepared.add((target, prepare))
+                if target not in self._prepared:
+                    conn.execute("""
+                        CREATE TABLE IF NOT EXISTS write_queue_applied (
+                            queue TEXT PRIMARY KEY,
+                            seq INTEGER NOT NULL
+                        )
+                    """)
+                    conn.commit()
+                    self._prepared.add(target)
+
+                with unit_of_work(conn):
+                    row = conn.execute("SELECT seq FROM write_queue_applied WHERE queue = ?", (self.name,)).fetchone()
+                    applied = row[0] if row else 0
+                    outcomes = []
+                    for record, _ in items:
+                        if record["seq"] <= applied:
+                            outcomes.append((None, None))  # committed before a crash, replayed
+                            continue
+                        conn.execute("SAVEPOINT command")
+                        try:
+                            result = OPERATIONS[record["op"]][0](conn, *record["args"])
+                            conn.execute("RELEASE command")
+                            outcomes.append((result, None))
+                        except Exception as e:
+                            conn.execute("ROLLBACK TO command")
+                            conn.execute("RELEASE command")
+                            outcomes.append((None, e))
+                    conn.execute(
+                        "INSERT INTO write_queue_applied (queue, seq) VALUES (?, ?) "
+                        "ON CONFLICT(queue) DO UPDATE SET seq = excluded.seq",
+                        (self.name, items[-1][0]["seq"])
+                    )
+            self._stats["commits"] += 1
+            return outcomes
+        except Exception as e:
+            return [(None, e)] * len(items)
+
+    def stats(self) -> dict:
+        snapshot = dict(self._stats)
+        snapshot["pending"] = self._queue.qsize()
+        batches = snapshot["batches"]
+        snapshot["avg_batch"] = (snapshot["applied"] + snapshot["failed"]) / batches if batches else 0.0
+        return snapshot
+
+
+_write_queue = None
+_write_queue_lock = threading.Lock()
+
+
+def get_write_queue() -> WriteQueue:
+    """The shared write queue (started, and drained at exit), created on first use."""
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is None:
+            _write_queue = WriteQueue(
+                os.environ.get("APP_WRITE_QUEUE", str(JOURNAL_PATH)),
+                fsync=os.environ.get("APP_WRITE_QUEUE_FSYNC", "0") == "1",
+            ).start()
+            atexit.register(_write_queue.close)
+        return _write_queue
@@ -0,0 +1,265 @@
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+DEFAULT_ROUNDS = int(os.environ.get("APP_BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.environ.get("APP_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_TIMEOUT = 30.0          # seconds to wait for a hash/verify from the pool
+
+CACHE_TTL = 15 * 60          # a verified password is trusted this long without bcrypt
+CACHE_MAX_ENTRIES = 10_000
+SESSION_TTL = 8 * 3600       # idle lifetime of a server-side session
+
+
+# KDF POLICY
+
+
+class BcryptPolicy:
+    """
+    How passwords are hashed. hash() uses the current cost; needs_rehash()
+    tells whether a stored hash was made with a different one, so logins
+    can upgrade it transparently.
+    """
+
+    name = "bcrypt"
+
+    def __init__(self, rounds: int = DEFAULT_ROUNDS):
+        self.rounds = rounds
+
+    def hash(self, password: str) -> str:
+        return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(self.rounds)).decode("utf-8")
+
+    def verify(self, password: str, stored_hash: str) -> bool:
+        try:
+            return bcrypt.checkpw(password.encode("utf-8"), stored_hash.encode("utf-8"))
+        except ValueError:
+            return False  # not a bcrypt hash
+
+    @staticmethod
+    def cost(stored_hash: str):
+        """Work factor of a "$2b$12$..." hash (None if unreadable)."""
+        parts = stored_hash.split("$")
+        try:
+            return int(parts[2])
+        except (IndexError, ValueError):
+            return None
+
+    def needs_rehash(self, stored_hash: str) -> bool:
+        return self.cost(stored_hash) != self.rounds
+
+
+_policy = BcryptPolicy()
+
+
+def get_policy():
+    return _policy
+
+
+def set_policy(policy):
+    """Swap the KDF policy (e.g. BcryptPolicy(rounds=13)); old hashes upgrade on next login."""
+    global _policy
+    _policy = policy
+    credential_cache.clear()
+
+
+# THREAD POOL
+# Caps how many bcrypt computations run at once (each one holds a core for
+# its whole cost). hash_password() and verify_password() still wait for
+# their result; only callers of the *_async functions can carry on meanwhile.
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="kdf")
+        return _executor
+
+
+def hash_password_async(password: str):
+    """Future for policy.hash(password), computed off the calling thread."""
+    return _pool().submit(get_policy().hash, password)
+
+
+def verify_password_async(password: str, stored_hash: str):
+    """Future for policy.verify(password, stored_hash), computed off the calling thread."""
+    return _pool().submit(get_policy().verify, password, stored_hash)
+
+
+def hash_password(password: str) -> str:
+    """policy.hash(password) on the pool; blocks until it is done."""
+    return hash_password_async(password).result(HASH_TIMEOUT)
+
+
+# CREDENTIAL CACHE
+
+
+class CredentialCache:
+    """
+    Remembers recently verified (username, password) pairs so logging in
+    again within CACHE_TTL skips bcrypt.
+
+    Entries are keyed by HMAC(process secret, username + password): the
+    plaintext is never stored and the keys are useless outside this
+    process. Each entry also pins the stored hash it was verified against,
+    so a password change invalidates it. Bounded by max_entries (LRU).
+    """
+
+    def __init__(self, ttl: float = CACHE_TTL, max_entries: int = CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._secret = secrets.token_bytes(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, username: str, password: str) -> bytes:
+        message = username.encode("utf-8") + b"\0" + password.encode("utf-8")
+        return hmac.new(self._secret, message, hashlib.sha256).digest()
+
+    def check(self, username: str, password: str, stored_hash: str) -> bool:
+        key = self._key(username, password)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic() or not hmac.compare_digest(entry[1], stored_hash):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True
+
+    def remember(self, username: str, password: str, stored_hash: str):
+        key = self._key(username, password)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, stored_hash)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+credential_cache = CredentialCache()
+
+
+def verify_password(username: str, password: str, stored_hash: str) -> bool:
+    """Check a password against its stored hash, using the cache before bcrypt."""
+    if credential_cache.check(username, password, stored_hash):
+        return True
+    if verify_password_async(password, stored_hash).result(HASH_TIMEOUT):
+        credential_cache.remember(username, password, stored_hash)
+        return True
+    return False
+
+
+# LOGIN
+
+
+def authenticate(username: str, password: str, lookup, update_hash=None):
+    """
+    Verify a login.
+
+    :param lookup: username -> stored hash (or None if there is no such user)
+    :param update_hash: (username, new_hash) callback used to upgrade hashes
+                        made with another cost; skipped if None
+    :return: (success: bool, message: str)
+    """
+    if not username or not password:
+        return False, "Username and password are required."
+
+    stored_hash = lookup(username)
+    if not stored_hash:
+        return False, "User not found."
+    if not verify_password(username, password, stored_hash):
+        return False, "Incorrect password."
+
+    if update_hash is not None and get_policy().needs_rehash(stored_hash):
+        new_hash = hash_password(password)
+        update_hash(username, new_hash)
+        credential_cache.remember(username, password, new_hash)
+    return True, "Login successful!"
+
+
+# SESSION STORE
+
+
+class SessionStore:
+    """
+    Server-side sessions: opaque token -> (username, role, expiry).
+
+    The browser (st.session_state) only keeps the token, so a rerun checks
+    a dict instead of re-reading credentials. Each successful get() slides
+    the expiry forward; expired sessions are dropped lazily and by purge().
+    """
+
+    def __init__(self, ttl: float = SESSION_TTL):
+        self.ttl = ttl
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def create(self, username: str, role: str = "user") -> str:
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            self._sessions[token] = (username, role, time.monotonic() + self.ttl)
+        return token
+
+    def get(self, token: str):
+        """(username, role) for a live session, else None."""
+        if not token:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(token)
+            if entry is None:
+                return None
+            username, role, expiry = entry
+            if expiry <= now:
+                del self._sessions[token]
+                return None
+            self._sessions[token] = (username, role, now + self.ttl)
+            return username, role
+
+    def revoke(self, token: str):
+        with self._lock:
+            self._sessions.pop(token, None)
+
+    def revoke_user(self, username: str):
+        """End every session of username (e.g. after a password change)."""
+        with self._lock:
+            for token in [t for t, e in self._sessions.items() if e[0] == username]:
+                del self._sessions[token]
+
+    def purge(self) -> int:
+        """Drop expired sessions; returns how many were removed."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [t for t, e in self._sessions.items() if e[2] <= now]
+            for token in expired:
+                del self._sessions[token]
+        return len(expired)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+
+sessions = SessionStore()
@@ -0,0 +1,299 @@
+import hashlib
+import json
+import queue
+import re
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from pathlib import Path
+
+# Relative imports
+from ..data.frame_cache import file_version
+
+DEFAULT_MODEL = "gpt-4o-mini"
+CACHE_TTL = 15 * 60         # seconds a cached answer stays valid
+CACHE_MAX_ENTRIES = 256     # least recently used answers are evicted past this
+
+_DONE = object()            # end-of-stream marker put on the token queue
+
+
+# CHUNK PARSING
+
+
+def chunk_text(chunk):
+    """
+    Text carried by one streamed chunk, for the v1 SDK objects, the legacy
+    SDK and plain dicts (raw server-sent events). None if it has no text.
+    """
+    choices = getattr(chunk, "choices", None)
+    if choices:
+        ch0 = choices[0]
+        delta = getattr(ch0, "delta", None)
+        if delta is not None and getattr(delta, "content", None) is not None:
+            return delta.content
+        if getattr(ch0, "text", None) is not None:
+            return ch0.text
+    if isinstance(chunk, dict):
+        choices = chunk.get("choices") or []
+        if choices:
+            delta = choices[0].get("delta") or {}
+            return delta.get("content") or choices[0].get("text")
+    return None
+
+
+# CLIENTS
+
+
+class _Completions:
+    def __init__(self, client):
+        self._client = client
+
+    def create(self, model, messages, temperature=0.2, stream=True, **extra):
+        return self._client.stream(model, messages, temperature, **extra)
+
+
+class _Chat:
+    def __init__(self, client):
+        self.completions = _Completions(client)
+
+
+class HTTPChatClient:
+    """
+    Minimal chat-completions client speaking the streaming (SSE) protocol
+    over urllib, for when the openai package isn't installed or a local
+    server is used. Exposes client.chat.completions.create(..., stream=True)
+    like the SDK, yielding dict chunks.
+    """
+
+    def __init__(self, base_url="https://api.openai.com/v1", api_key=None, timeout=60.0):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.chat = _Chat(self)
+
+    def stream(self, model, messages, temperature=0.2, **extra):
+        body = json.dumps({"model": model, "messages": messages, "temperature": temperature,
+                           "stream": True, **extra}).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Accept": "text/event-stream"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        request = urllib.request.Request(f"{self.base_url}/chat/completions", data=body, headers=headers)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            for raw in response:
+                line = raw.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    return
+                yield json.loads(data)
+
+
+def make_client(api_key, base_url=None):
+    """
+    Best available client: the openai v1 SDK, else the legacy module,
+    else HTTPChatClient. None without an API key (unless base_url is a
+    local server that needs none).
+    """
+    if not api_key and not base_url:
+        return None
+    try:
+        import openai
+    except ImportError:
+        openai = None
+
+    if openai is not None and getattr(openai, "OpenAI", None) is not None:
+        kwargs = {"api_key": api_key or "none"}
+        if base_url:
+            kwargs["base_url"] = base_url
+        return openai.OpenAI(**kwargs)
+    if openai is not None and not base_url:
+        # legacy SDK: configured on the module, used as the client
+        openai.api_key = api_key
+        return openai
+    return HTTPChatClient(base_url or "https://api.openai.com/v1", api_key)
+
+
+def open_stream(client, messages, model=DEFAULT_MODEL, temperature=0.2):
+    """Start a streaming completion with whichever API the client has."""
+    if hasattr(client, "chat") and hasattr(client.chat, "completions"):
+        return client.chat.completions.create(model=model, messages=messages,
+                                              temperature=temperature, stream=True)
+    return client.ChatCompletion.create(model=model, messages=messages,
+                                        temperature=temperature, stream=True)
+
+
+# RESPONSE CACHE
+
+
+def dataset_fingerprint(path):
+    """Identifies a dataset file at its current version ("" for no dataset)."""
+    if not path:
+        return ""
+    path = Path(path).resolve()
+    try:
+        mtime, size = file_version(path)
+    except OSError:
+        return ""
+    return hashlib.sha1(f"{path}|{mtime}|{size}".encode("utf-8")).hexdigest()
+
+
+def normalize_prompt(text: str) -> str:
+    """Case, whitespace and trailing punctuation don't change the question."""
+    text = re.sub(r"\s+", " ", text.strip().lower())
+    return text.rstrip(" ?!.")
+
+
+class ResponseCache:
+    """
+    Answers keyed by (dataset fingerprint, normalised prompt, context),
+    evicted by TTL and by LRU once max_entries is reached. Thread-safe.
+    context is anything else the answer depends on (see context_digest).
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(fingerprint, prompt, context=""):
+        return fingerprint, normalize_prompt(prompt), context
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, answer: str):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+response_cache = ResponseCache()
+
+
+def context_digest(messages, model=DEFAULT_MODEL) -> str:
+    """
+    Short digest of everything sent before the question: system prompt,
+    dataset digest, retrieved records and earlier turns. Any change to the
+    context (new rows, another budget, a different conversation) misses.
+    """
+    payload = json.dumps([model] + [(m["role"], normalize_prompt(m["content"])) for m in messages[:-1]])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+# BACKGROUND STREAMING
+
+
+class ChatStream:
+    """
+    Runs one streaming completion in a daemon thread and hands tokens to
+    the UI through a queue, so the Streamlit script can finish its run
+    (and the page stay interactive) while the answer arrives.
+
+    The UI calls drain() on each rerun to collect whatever has arrived;
+    done/error/text describe the final state. A cached answer is served
+    as an already finished stream.
+    """
+
+    def __init__(self, client, messages, model=DEFAULT_MODEL, temperature=0.2,
+                 cache=None, cache_key=None):
+        self.text = ""
+        self.error = None
+        self.done = False
+        self.cached = False
+        self._queue = queue.Queue()
+        self._cancel = threading.Event()
+        self._cache = cache
+        self._cache_key = cache_key
+
+        hit = cache.get(cache_key) if cache is not None and cache_key is not None else None
+        if hit is not None:
+            self.cached = True
+            self._queue.put(hit)
+            self._queue.put(_DONE)
+            self._thread = None
+            return
+
+        self._thread = threading.Thread(target=self._run, args=(client, messages, model, temperature),
+                                        daemon=True)
+        self._thread.start()
+
+    def _run(self, client, messages, model, temperature):
+        parts = []
+        try:
+            for chunk in open_stream(client, messages, model, temperature):
+                if self._cancel.is_set():
+                    break
+                piece = chunk_text(chunk)
+                if piece:
+                    parts.append(piece)
+                    self._queue.put(piece)
+            else:
+                if self._cache is not None and self._cache_key is not None:
+                    self._cache.put(self._cache_key, "".join(parts))
+        except Exception as e:
+            self._queue.put(e)
+        finally:
+            self._queue.put(_DONE)
+
+    def drain(self, timeout: float = 0.0):
+        """
+        Move every queued token into self.text, waiting up to timeout for
+        the first one. Returns the text added by this call.
+        """
+        added = []
+        block = timeout > 0
+        while True:
+            try:
+                item = self._queue.get(block=block, timeout=timeout if block else None)
+            except queue.Empty:
+                break
+            block = False
+            if item is _DONE:
+                self.done = True
+                break
+            if isinstance(item, Exception):
+                self.error = item
+                continue
+            added.append(item)
+        piece = "".join(added)
+        self.text += piece
+        return piece
+
+    def tokens(self, poll: float = 0.1):
+        """Blocking generator over the tokens, for scripts and st.write_stream."""
+        while not self.done:
+            piece = self.drain(timeout=poll)
+            if piece:
+                yield piece
+        if self.error is not None:
+            raise self.error
+
+    def cancel(self):
+        """Stop reading the stream; the partial answer is not cached."""
+        self._cancel.set()
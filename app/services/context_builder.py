@@ -0,0 +1,203 @@
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+# Relative imports
+from ..data.frame_cache import file_version
+from ..data.stats import summarize_csv
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # optional: fall back to a character estimate
+    _ENCODING = None
+
+DEFAULT_TOKEN_BUDGET = 1500   # tokens for system prompt + digest + history + question
+HISTORY_WINDOW = 6            # most recent messages kept word for word
+SAMPLE_ROWS = 3
+
+# dataset choice on the AI Chat page -> file name patterns, in order of preference
+DATASET_PATTERNS = {
+    "Cyber Incidents": ["cyber_incidents*.csv"],
+    "IT tickets": ["it_tickets*.csv"],
+    "Datasets metadata": ["*metadata*.csv", "*meta*.csv", "*.csv"],
+}
+
+_digests = {}
+_digests_lock = threading.Lock()
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in text (tiktoken when installed, else ~4 characters per token)."""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return len(text) // 4 + 1
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """Cut text down to at most budget tokens, marking the cut."""
+    if count_tokens(text) <= budget:
+        return text
+    if budget <= 0:
+        return ""
+    if _ENCODING is not None:
+        return _ENCODING.decode(_ENCODING.encode(text)[:max(budget - 2, 0)]) + " …"
+    return text[:max(budget - 2, 0) * 4] + " …"
+
+
+# DATASET DIGESTS
+
+
+def find_dataset(choice: str, *folders):
+    """First CSV matching the choice's patterns in the given folders (None if none)."""
+    for pattern in DATASET_PATTERNS.get(choice, ["*.csv"]):
+        for folder in folders:
+            matches = sorted(Path(folder).glob(pattern))
+            if matches:
+                return matches[0]
+    return None
+
+
+def _date_ranges(csv_path: Path, columns):
+    """min/max of the date-like columns, reading only those columns."""
+    date_cols = [c for c in columns if "date" in c.lower() or "time" in c.lower()]
+    if not date_cols:
+        return {}
+    df = pd.read_csv(csv_path, usecols=date_cols)
+    ranges = {}
+    for col in date_cols:
+        parsed = pd.to_datetime(df[col], errors="coerce", format="mixed")
+        if parsed.notna().any():
+            ranges[col] = (parsed.min().date().isoformat(), parsed.max().date().isoformat())
+    return ranges
+
+
+def build_digest(csv_path) -> str:
+    """
+    Compact plain-text description of a CSV: row count, columns with
+    types, top categories, numeric ranges, date ranges and a few rows.
+    """
+    csv_path = Path(csv_path)
+    stats = summarize_csv(csv_path)
+    sample = pd.read_csv(csv_path, nrows=SAMPLE_ROWS)
+    dates = _date_ranges(csv_path, list(stats.index))
+    rows = int(stats["count"].max()) if len(stats) else 0
+
+    lines = [f"Dataset {csv_path.name}: {rows} rows, {len(stats)} columns."]
+    for col, s in stats.iterrows():
+        if not s["count"]:
+            lines.append(f"- {col}: empty")
+        elif col in dates:
+            lines.append(f"- {col} (date): {dates[col][0]} to {dates[col][1]}")
+        elif pd.notna(s["mean"]):
+            lines.append(f"- {col} (number): min {s['min']:g}, max {s['max']:g}, mean {s['mean']:.4g}")
+        else:
+            desc = f"- {col} (text)"
+            if pd.notna(s["unique"]):
+                desc += f": ~{int(s['unique'])} distinct"
+            if pd.notna(s["top"]) and s["freq"] > 1:
+                desc += f", most common {s['top']!r} ({s['freq']})"
+            lines.append(desc)
+    lines.append("Sample rows:")
+    lines.append(sample.to_csv(index=False).strip())
+    return "\n".join(lines)
+
+
+def get_digest(csv_path, max_tokens: int = None) -> str:
+    """build_digest() cached per process and file version."""
+    csv_path = Path(csv_path).resolve()
+    key = (str(csv_path), file_version(csv_path))
+    with _digests_lock:
+        digest = _digests.get(key)
+    if digest is None:
+        digest = build_digest(csv_path)
+        with _digests_lock:
+            # drop digests of older versions of this file
+            for old in [k for k in _digests if k[0] == key[0]]:
+                del _digests[old]
+            _digests[key] = digest
+    return truncate_to_tokens(digest, max_tokens) if max_tokens else digest
+
+
+# PROMPT ASSEMBLY
+
+
+def summarise_history(messages, max_tokens: int) -> str:
+    """
+    Extractive summary of older turns: the first line of each question and
+    answer, newest kept first when space runs out.
+    """
+    lines = []
+    for msg in messages:
+        first = msg["content"].strip().splitlines()[0] if msg["content"].strip() else ""
+        who = "User" if msg["role"] == "user" else "Assistant"
+        lines.append(f"{who}: {truncate_to_tokens(first, 30)}")
+
+    kept, used = [], count_tokens("Earlier in this conversation:")
+    for line in reversed(lines):
+        cost = count_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    if not kept:
+        return ""
+    return "Earlier in this conversation:\n" + "\n".join(reversed(kept))
+
+
+def format_hits(hits) -> str:
+    """Retrieved records (app.data.retrieval.search results) as prompt text."""
+    if not hits:
+        return ""
+    return "Records matching the question:\n" + "\n".join(f"- {h['display']}" for h in hits)
+
+
+def build_messages(system_prompt: str, history, user_input: str, digest: str = None,
+                   budget: int = DEFAULT_TOKEN_BUDGET, window: int = HISTORY_WINDOW,
+                   retrieved: str = None):
+    """
+    Chat messages fitting in budget tokens:
+    system prompt + dataset digest + retrieved records, a summary of turns
+    older than the window, the most recent turns (as many as fit) and the
+    new question. The question and system prompt are always sent; the
+    retrieved records get up to a third of what is left, the digest up to
+    half of the rest, history whatever remains.
+    """
+    question = {"role": "user", "content": user_input}
+    remaining = budget - count_tokens(system_prompt) - count_tokens(user_input) - 8
+
+    system = system_prompt
+    if retrieved:
+        retrieved = truncate_to_tokens(retrieved, max(remaining // 3, 0))
+        if retrieved:
+            system += "\n\n" + retrieved
+            remaining -= count_tokens(retrieved)
+    if digest:
+        digest = truncate_to_tokens(digest, max(remaining // 2, 0))
+        if digest:
+            system += "\n\n" + digest
+            remaining -= count_tokens(digest)
+
+    recent = []
+    older = list(history[:-window]) if window and len(history) > window else []
+    for msg in reversed(history[-window:] if window else history):
+        cost = count_tokens(msg["content"]) + 4
+        if cost > remaining:
+            older = list(history[:len(history) - len(recent)])
+            break
+        recent.insert(0, msg)
+        remaining -= cost
+
+    if older and remaining > 20:
+        summary = summarise_history(older, remaining)
+        if summary:
+            system += "\n\n" + summary
+
+    return [{"role": "system", "content": system}] + recent + [question]
+
+
+def message_tokens(messages) -> int:
+    return sum(count_tokens(m["content"]) + 4 for m in messages)
@@ -0,0 +1,143 @@
+import threading
+import time
+
+# Relative imports
+from ..data.db import DB_PATH, get_connection, read_connection
+
+OPEN_STATUSES = ("open", "Open", "in progress", "In Progress")
+CLOSED_STATUSES = ("closed", "Closed", "resolved", "Resolved")
+
+# Each KPI is a COUNT over one table with a WHERE clause. They are all
+# evaluated together as scalar subqueries of a single SELECT.
+KPIS = [
+    {
+        "name": "current_threats",
+        "label": "Current Threats",
+        "table": "cyber_incidents",
+        "where": "status IN (?, ?, ?, ?)",
+        "params": OPEN_STATUSES,
+    },
+    {
+        "name": "incidents_closed",
+        "label": "Incidents Closed",
+        "table": "cyber_incidents",
+        "where": "status IN (?, ?, ?, ?)",
+        "params": CLOSED_STATUSES,
+    },
+    {
+        "name": "pending_tickets",
+        "label": "Pending Tickets",
+        "table": "it_tickets",
+        "where": "status IN (?, ?, ?, ?)",
+        "params": OPEN_STATUSES,
+    },
+]
+
+CACHE_TTL = 30              # seconds a computed set of KPIs is reused
+SNAPSHOT_INTERVAL = 3600    # at most one stored snapshot per KPI per hour
+DELTA_WINDOW = 24 * 3600    # delta is measured against the value one day ago
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def create_kpi_snapshots_table(conn):
+    """Create the table holding periodic KPI values used for deltas."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS kpi_snapshots (
+            name TEXT NOT NULL,
+            taken_at INTEGER NOT NULL,
+            value INTEGER NOT NULL,
+            PRIMARY KEY (name, taken_at)
+        );
+    """)
+
+
+def build_kpi_query(kpis, existing_tables):
+    """
+    One SELECT returning every KPI as a column. KPIs over tables that
+    don't exist yet evaluate to 0.
+    """
+    parts, params = [], []
+    for kpi in kpis:
+        if kpi["table"] in existing_tables:
+            parts.append(f"(SELECT COUNT(*) FROM {kpi['table']} WHERE {kpi['where']}) AS {kpi['name']}")
+            params.extend(kpi["params"])
+        else:
+            parts.append(f"0 AS {kpi['name']}")
+    return "SELECT " + ", ".join(parts), params
+
+
+def _previous_values(conn, now):
+    """Latest snapshot per KPI taken at least DELTA_WINDOW ago."""
+    rows = conn.execute("""
+        SELECT s.name, s.value FROM kpi_snapshots s
+        JOIN (
+            SELECT name, MAX(taken_at) AS taken_at FROM kpi_snapshots
+            WHERE taken_at <= ? GROUP BY name
+        ) latest ON latest.name = s.name AND latest.taken_at = s.taken_at
+    """, (now - DELTA_WINDOW,)).fetchall()
+    return dict(rows)
+
+
+def _record_snapshot(conn, values, now):
+    """Store the current values unless a snapshot was taken this interval."""
+    last = conn.execute("SELECT MAX(taken_at) FROM kpi_snapshots").fetchone()[0]
+    if last is not None and now - last < SNAPSHOT_INTERVAL:
+        return
+    conn.executemany(
+        "INSERT OR REPLACE INTO kpi_snapshots (name, taken_at, value) VALUES (?, ?, ?)",
+        [(name, now, value) for name, value in values.items()]
+    )
+
+
+def compute_kpis(db_path=DB_PATH, kpis=None):
+    """
+    Evaluate the KPIs in one round-trip and attach deltas from snapshots.
+    Returns a list of dicts: name, label, value, delta (None if no history).
+    """
+    kpis = kpis or KPIS
+    now = int(time.time())
+    with read_connection(db_path) as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        query, params = build_kpi_query(kpis, tables)
+        row = conn.execute(query, params).fetchone()
+        values = {kpi["name"]: row[i] for i, kpi in enumerate(kpis)}
+        has_snapshots = "kpi_snapshots" in tables
+        previous = _previous_values(conn, now) if has_snapshots else {}
+        last = conn.execute("SELECT MAX(taken_at) FROM kpi_snapshots").fetchone()[0] if has_snapshots else None
+
+    # the write connection is only needed once per SNAPSHOT_INTERVAL
+    if last is None or now - last >= SNAPSHOT_INTERVAL:
+        with get_connection(db_path) as conn:
+            create_kpi_snapshots_table(conn)
+            _record_snapshot(conn, values, now)
+
+    return [
+        {
+            "name": kpi["name"],
+            "label": kpi["label"],
+            "value": values[kpi["name"]],
+            "delta": values[kpi["name"]] - previous[kpi["name"]] if kpi["name"] in previous else None,
+        }
+        for kpi in kpis
+    ]
+
+
+def get_kpis(db_path=DB_PATH, ttl: float = CACHE_TTL):
+    """compute_kpis() with a short per-process TTL cache shared by all sessions."""
+    key = str(db_path)
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit and hit[0] > time.monotonic():
+            return hit[1]
+
+    results = compute_kpis(db_path)
+    with _cache_lock:
+        _cache[key] = (time.monotonic() + ttl, results)
+    return results
+
+
+def clear_kpi_cache():
+    with _cache_lock:
+        _cache.clear()
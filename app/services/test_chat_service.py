@@ -0,0 +1,82 @@
+# test_chat_service.py
+import time
+
+import pytest
+
+from app.services.chat_service import ChatStream, HTTPChatClient, ResponseCache
+from chat_stub_server import StubHandler, start_stub
+
+QUESTION = "how many open tickets are there"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(StubHandler, "calls", 0)
+    server = start_stub()
+    yield HTTPChatClient(f"http://127.0.0.1:{server.server_port}/v1")
+    server.shutdown()
+    server.server_close()
+
+
+def ask(prompt):
+    return [{"role": "user", "content": prompt}]
+
+
+def test_stream_does_not_block_the_caller(client):
+    stream = ChatStream(client, ask(QUESTION))
+    polls = 0
+    while not stream.done:
+        stream.drain()
+        polls += 1
+        time.sleep(0.005)
+
+    assert stream.error is None
+    assert stream.text == f"echo: {QUESTION}"
+    assert polls > 1
+
+
+def test_cancelled_stream_stops_and_is_not_cached(client):
+    cache = ResponseCache()
+    key = cache.key("fp", "long")
+    prompt = " ".join(f"word{i}" for i in range(200))
+    stream = ChatStream(client, ask(prompt), cache=cache, cache_key=key)
+    stream.drain(timeout=5)
+    stream.cancel()
+    text = "".join(stream.tokens())
+
+    assert stream.error is None
+    assert len(stream.text.split()) < 200
+    assert stream.text.startswith("echo:") and text in stream.text
+    assert cache.get(key) is None
+
+
+def test_cache_hit_skips_the_server(client):
+    cache = ResponseCache(max_entries=2, ttl=60)
+    first = ChatStream(client, ask(QUESTION), cache=cache, cache_key=cache.key("fp", QUESTION))
+    answer = "".join(first.tokens())
+
+    # the same question, differently typed, is served from the cache
+    again = ChatStream(client, ask(QUESTION), cache=cache,
+                       cache_key=cache.key("fp", "  How many OPEN tickets are there? "))
+    assert again.cached and "".join(again.tokens()) == answer
+    assert StubHandler.calls == 1
+
+    # a new dataset version is a different key
+    other = ChatStream(client, ask(QUESTION), cache=cache, cache_key=cache.key("fp2", QUESTION))
+    list(other.tokens())
+    assert not other.cached and StubHandler.calls == 2
+    assert cache.stats() == {"entries": 2, "hits": 1, "misses": 2}
+
+
+def test_cache_entries_expire(client):
+    cache = ResponseCache(ttl=0.5)
+    key = cache.key("fp", QUESTION)
+    list(ChatStream(client, ask(QUESTION), cache=cache, cache_key=key).tokens())
+    assert ChatStream(client, ask(QUESTION), cache=cache, cache_key=key).cached
+
+    time.sleep(0.6)
+    expired = ChatStream(client, ask(QUESTION), cache=cache, cache_key=key)
+    assert not expired.cached
+    list(expired.tokens())
+    assert StubHandler.calls == 2
+    assert cache.stats()["entries"] == 1
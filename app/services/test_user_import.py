@@ -0,0 +1,22 @@
+# test_user_import.py
+import json
+import sqlite3
+
+from app.services.user_import import import_users
+
+
+def test_sources_without_roles_keep_existing_roles(tmp_path):
+    db = tmp_path / "users.db"
+    first = tmp_path / "first.txt"
+    first.write_text("username,password,role\nalice,pw1,admin\nbob,pw2\n", encoding="utf-8")
+    import_users(first, db_path=db, rounds=4, workers=1)
+
+    week7 = tmp_path / "users.txt"
+    week7.write_text("alice,pw3\nbob,pw4,analyst\ncarol,pw5\n", encoding="utf-8")
+    import_users(week7, db_path=db, rounds=4, workers=1)
+    legacy = tmp_path / "users.json"
+    legacy.write_text(json.dumps({"alice": "pw6", "dave": "pw7"}), encoding="utf-8")
+    import_users(legacy, db_path=db, rounds=4, workers=1)
+
+    roles = dict(sqlite3.connect(db).execute("SELECT username, role FROM users"))
+    assert roles == {"alice": "admin", "bob": "analyst", "carol": "user", "dave": "user"}
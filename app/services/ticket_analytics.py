@@ -0,0 +1,205 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Relative imports
+from ..data.frame_cache import frame_cache
+from ..data.sidecar import read_table
+from .kpi_service import CLOSED_STATUSES, OPEN_STATUSES
+
+TICKETS_CSV = Path("DATA") / "it_tickets.csv"
+TICKET_COLUMNS = ("ticket_id", "priority", "status", "category", "created_date", "resolved_date", "assigned_to")
+GROUP_COLUMNS = ("priority", "status", "category", "assigned_to")
+
+PERCENTILES = (0.5, 0.9, 0.95)
+# upper edges (days) of the backlog age buckets; the last bucket is open ended
+AGE_EDGES = (1, 3, 7, 14, 30, 90)
+
+# days allowed to resolve a ticket, by priority (case-insensitive)
+DEFAULT_SLA_DAYS = {"critical": 1, "high": 3, "medium": 7, "low": 14}
+DEFAULT_SLA_FALLBACK = 14  # priorities the policy doesn't list
+
+
+class SlaPolicy:
+    """Resolution target in days for each priority."""
+
+    def __init__(self, targets=None, default_days: float = DEFAULT_SLA_FALLBACK):
+        self.targets = {k.lower(): float(v) for k, v in (targets or DEFAULT_SLA_DAYS).items()}
+        self.default_days = float(default_days)
+
+    def target_days(self, priority: pd.Series) -> np.ndarray:
+        """Target for every row of a categorical priority column (one lookup per category)."""
+        cat = priority.cat
+        per_category = np.array(
+            [self.targets.get(str(c).lower(), self.default_days) for c in cat.categories] + [self.default_days]
+        )
+        # code -1 (missing priority) indexes the trailing default
+        return per_category[cat.codes.to_numpy()]
+
+
+# TYPED FRAME
+
+
+def prepare_tickets(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Typed ticket frame for the metrics below: label columns as categoricals,
+    dates as datetime64, plus is_open / is_closed flags and resolution_days
+    (NaN while unresolved). Missing columns become empty. Rows whose dates
+    don't parse (stray lines in the CSV) get NaT and drop out of date maths.
+    """
+    out = pd.DataFrame(index=pd.RangeIndex(len(df)))
+    for col in GROUP_COLUMNS:
+        values = df[col] if col in df.columns else pd.Series(pd.NA, index=df.index, dtype="string")
+        out[col] = values.reset_index(drop=True).astype("category")
+    for col in ("created_date", "resolved_date"):
+        values = df[col] if col in df.columns else pd.Series(pd.NaT, index=df.index)
+        if not pd.api.types.is_datetime64_any_dtype(values):
+            values = pd.to_datetime(values, errors="coerce", format="ISO8601")
+        out[col] = values.reset_index(drop=True)
+
+    # status flags per category, then spread over the rows by code
+    status = out["status"].cat
+    lowered = [str(c).lower() for c in status.categories]
+    codes = status.codes.to_numpy()
+    open_codes = np.flatnonzero(np.isin(lowered, [s.lower() for s in OPEN_STATUSES]))
+    closed_codes = np.flatnonzero(np.isin(lowered, [s.lower() for s in CLOSED_STATUSES]))
+    out["is_open"] = np.isin(codes, open_codes)
+    out["is_closed"] = np.isin(codes, closed_codes)
+
+    days = _days_between(out["resolved_date"].to_numpy(), out["created_date"].to_numpy())
+    days[~out["is_closed"].to_numpy() | (days < 0)] = np.nan
+    out["resolution_days"] = days
+    return out
+
+
+def _read_prepared(path, columns=None):
+    return prepare_tickets(read_table(path, columns=columns))
+
+
+def load_tickets(csv_path=TICKETS_CSV) -> pd.DataFrame:
+    """Typed ticket frame for csv_path through the shared frame cache. Do not mutate the result."""
+    return frame_cache.get(csv_path, _read_prepared, columns=list(TICKET_COLUMNS))
+
+
+def _group_codes(frame: pd.DataFrame, by: str):
+    """(int64 group code per row, group labels); missing labels form an "Unknown" group."""
+    cat = frame[by].cat
+    labels = [str(c) for c in cat.categories]
+    codes = cat.codes.to_numpy().astype(np.int64)
+    if (codes < 0).any():
+        codes[codes < 0] = len(labels)
+        labels.append("Unknown")
+    return codes, labels
+
+
+def _days_between(later, earlier) -> np.ndarray:
+    """later - earlier in (fractional) days as float64, NaN where either is NaT."""
+    delta = (later - earlier).astype("timedelta64[s]")
+    days = delta.astype(np.int64) / 86400.0
+    days[np.isnat(delta)] = np.nan
+    return days
+
+
+def _age_days(frame: pd.DataFrame, now) -> np.ndarray:
+    now = pd.Timestamp.now().normalize() if now is None else pd.Timestamp(now)
+    return _days_between(np.datetime64(now.to_datetime64(), "s"), frame["created_date"].to_numpy())
+
+
+# METRICS
+
+
+def resolution_stats(frame: pd.DataFrame, by: str = "priority", percentiles=PERCENTILES) -> pd.DataFrame:
+    """
+    Resolution time (days) of closed tickets per group: count, mean and the
+    given percentiles (linear interpolation, like numpy/pandas quantile).
+
+    Rows are grouped with a stable sort on the integer group codes (a
+    radix sort), then each group's percentiles come from one np.quantile
+    (a partition, not a full sort) over its contiguous slice.
+    """
+    codes, labels = _group_codes(frame, by)
+    days = frame["resolution_days"].to_numpy()
+    keep = ~np.isnan(days)
+    codes, days = codes[keep], days[keep]
+
+    counts = np.bincount(codes, minlength=len(labels))
+    sums = np.bincount(codes, weights=days, minlength=len(labels))
+    ends = np.cumsum(counts)
+    present = counts > 0
+    days = days[np.argsort(codes, kind="stable")]
+
+    result = pd.DataFrame(index=pd.Index(labels, name=by))
+    result["count"] = counts
+    result["mean"] = np.divide(sums, counts, out=np.full(len(labels), np.nan), where=present)
+    quantiles = np.full((len(labels), len(percentiles)), np.nan)
+    for g in np.flatnonzero(present):
+        quantiles[g] = np.quantile(days[ends[g] - counts[g]:ends[g]], percentiles)
+    for i, p in enumerate(percentiles):
+        result[f"p{round(p * 100):g}"] = quantiles[:, i]
+    return result[present]
+
+
+def backlog_aging(frame: pd.DataFrame, by: str = "priority", now=None, edges=AGE_EDGES) -> pd.DataFrame:
+    """Open tickets per group and age bucket (days since created_date)."""
+    codes, labels = _group_codes(frame, by)
+    age = _age_days(frame, now)
+    keep = frame["is_open"].to_numpy() & ~np.isnan(age)
+    buckets = np.searchsorted(np.asarray(edges, dtype="float64"), age[keep], side="right")
+
+    columns = [f"<{edges[0]}d"] + [f"{a}-{b}d" for a, b in zip(edges, edges[1:])] + [f">{edges[-1]}d"]
+    counts = np.bincount(codes[keep] * len(columns) + buckets, minlength=len(labels) * len(columns))
+    result = pd.DataFrame(counts.reshape(len(labels), len(columns)),
+                          index=pd.Index(labels, name=by), columns=columns)
+    result["total"] = result.sum(axis=1)
+    return result[result["total"] > 0]
+
+
+def sla_breaches(frame: pd.DataFrame, policy: SlaPolicy = None, by: str = "priority", now=None) -> pd.DataFrame:
+    """
+    SLA breaches per group against policy (targets by priority):
+    a closed ticket breached if it took longer than its target, an open
+    one if it is already older than its target.
+    """
+    policy = policy or SlaPolicy()
+    codes, labels = _group_codes(frame, by)
+    target = policy.target_days(frame["priority"])
+    days = frame["resolution_days"].to_numpy()
+    age = _age_days(frame, now)
+    is_open = frame["is_open"].to_numpy()
+    is_closed = frame["is_closed"].to_numpy()
+
+    n = len(labels)
+    resolved = ~np.isnan(days)
+    late = resolved & (days > target)
+    overdue = is_open & (age > target)  # NaN ages compare False
+
+    def count(mask):
+        return np.bincount(codes[mask], minlength=n)
+
+    result = pd.DataFrame(index=pd.Index(labels, name=by))
+    result["tickets"] = np.bincount(codes, minlength=n)
+    result["resolved"] = count(resolved)
+    result["open"] = count(is_open)
+    result["breached_resolved"] = count(late)
+    result["breached_open"] = count(overdue)
+    breached = result["breached_resolved"] + result["breached_open"]
+    tracked = result["resolved"] + result["open"]
+    result["breach_rate"] = breached / tracked.where(tracked > 0)
+    result["within_sla_rate"] = 1 - result["breached_resolved"] / result["resolved"].where(result["resolved"] > 0)
+    result.attrs["unresolved_closed"] = int((is_closed & ~resolved).sum())
+    return result[result["tickets"] > 0]
+
+
+def ticket_report(csv_path=TICKETS_CSV, policy: SlaPolicy = None, now=None) -> dict:
+    """All ticket metrics for csv_path, keyed by name (one DataFrame each)."""
+    frame = load_tickets(csv_path)
+    return {
+        "resolution_by_priority": resolution_stats(frame, "priority"),
+        "resolution_by_category": resolution_stats(frame, "category"),
+        "resolution_by_assignee": resolution_stats(frame, "assigned_to"),
+        "backlog_aging": backlog_aging(frame, "priority", now),
+        "sla_by_priority": sla_breaches(frame, policy, "priority", now),
+        "sla_by_category": sla_breaches(frame, policy, "category", now),
+        "sla_by_assignee": sla_breaches(frame, policy, "assigned_to", now),
+    }
@@ -0,0 +1,206 @@
+import csv
+import json
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import bcrypt
+
+# Relative imports
+from ..data.db import DB_PATH, get_connection
+from ..data.schema import create_users_table
+from .auth_service import get_policy
+
+BATCH_SIZE = 2000   # rows per transaction
+HASH_CHUNK = 16     # plaintext passwords handed to a worker at a time
+
+BCRYPT_HASH = re.compile(r"^\$2[aby]\$\d{2}\$[./A-Za-z0-9]{53}$")
+USERNAME = re.compile(r"^[^\s,]{1,64}$")
+
+# a NULL role (the source has none) makes new users "user" and leaves the
+# role of existing users alone, so re-importing a users.txt can't demote admins
+UPSERT_SQL = """
+    INSERT INTO users (username, password_hash, role) VALUES (?1, ?2, COALESCE(?3, 'user'))
+    ON CONFLICT(username) DO UPDATE SET
+        password_hash = excluded.password_hash,
+        role = COALESCE(?3, users.role)
+"""
+SKIP_SQL = """
+    INSERT INTO users (username, password_hash, role) VALUES (?1, ?2, COALESCE(?3, 'user'))
+    ON CONFLICT(username) DO NOTHING
+"""
+
+
+def _hash(args):
+    """bcrypt in a worker process (module level so it pickles)."""
+    password, rounds = args
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+# SOURCE READERS
+
+
+def read_source(path):
+    """
+    Stream (line_no, username, secret, role) from an account file:
+      - .json: {"username": "password", ...} (the old Home.py users.json)
+      - anything else: lines of username,password_or_hash[,role] (users.txt),
+        a header line starting with "username" is skipped
+    secret is either a plaintext password or an existing bcrypt hash; role
+    is None when the source doesn't give one.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".json":
+        with path.open("r", encoding="utf-8") as f:
+            for n, (username, secret) in enumerate(json.load(f).items(), 1):
+                yield n, username, secret, None
+        return
+
+    with path.open("r", encoding="utf-8", newline="") as f:
+        for n, row in enumerate(csv.reader(f), 1):
+            if not row or not any(c.strip() for c in row):
+                continue
+            if n == 1 and row[0].strip().lower() == "username":
+                continue
+            row = [c.strip() for c in row]
+            yield n, row[0], row[1] if len(row) > 1 else "", row[2] if len(row) > 2 and row[2] else None
+
+
+def _check(username, secret):
+    """Reason a row can't be imported, or None."""
+    if not USERNAME.match(username or ""):
+        return "invalid username"
+    if not secret:
+        return "missing password"
+    if secret.startswith("$2"):
+        return None if BCRYPT_HASH.match(secret) else "malformed bcrypt hash"
+    if len(secret.encode("utf-8")) > 72:
+        return "password longer than 72 bytes"
+    return None
+
+
+# IMPORT
+
+
+class ImportStats:
+    """Counters and timings of one import run."""
+
+    def __init__(self):
+        self.read = self.inserted = self.updated = self.skipped = self.rejected = self.hashed = 0
+        self.hash_seconds = self.write_seconds = 0.0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def summary(self) -> str:
+        rate = self.read / self.elapsed if self.elapsed else 0.0
+        hash_rate = self.hashed / self.hash_seconds if self.hash_seconds else 0.0
+        return (
+            f"{self.read:,} rows in {self.elapsed:.1f}s ({rate:,.0f} rows/s): "
+            f"{self.inserted:,} inserted, {self.updated:,} updated, {self.skipped:,} skipped, "
+            f"{self.rejected:,} rejected\n"
+            f"hashing {self.hashed:,} passwords: {self.hash_seconds:.1f}s ({hash_rate:,.0f}/s), "
+            f"writes: {self.write_seconds:.2f}s"
+        )
+
+
+def import_users(source, rejects_path=None, update_existing=True, batch_size=BATCH_SIZE,
+                 workers=None, rounds=None, db_path=DB_PATH, progress=None):
+    """
+    Bulk import accounts from source (see read_source) into the users table.
+
+    Rows are streamed in batches of batch_size: plaintext passwords are
+    hashed in a process pool, then each batch is written in one transaction
+    with INSERT ... ON CONFLICT, updating the hash of existing users, and
+    their role when the source gives one (or leaving them alone when
+    update_existing is False).
+
+    Every row that is not imported is written to rejects_path as CSV
+    (line, username, reason): bad usernames, missing or over-long passwords,
+    malformed hashes and repeats of a username earlier in the file.
+
+    :param rounds: bcrypt cost for plaintext passwords (default: current policy)
+    :param progress: optional callback(ImportStats) after each batch
+    :return: ImportStats
+    """
+    rounds = rounds or get_policy().rounds
+    sql = UPSERT_SQL if update_existing else SKIP_SQL
+    stats = ImportStats()
+    seen = {}
+
+    with get_connection(db_path) as conn:
+        create_users_table(conn)
+
+    reject_file = open(rejects_path, "w", encoding="utf-8", newline="") if rejects_path else None
+    rejects = csv.writer(reject_file) if reject_file else None
+    if rejects:
+        rejects.writerow(["line", "username", "reason"])
+
+    def reject(line_no, username, reason):
+        stats.rejected += 1
+        if rejects:
+            rejects.writerow([line_no, username, reason])
+
+    def existing_users(names):
+        found = set()
+        with get_connection(db_path) as conn:
+            for i in range(0, len(names), 500):  # stay under SQLite's bound-parameter limit
+                chunk = names[i:i + 500]
+                found.update(r[0] for r in conn.execute(
+                    f"SELECT username FROM users WHERE username IN ({', '.join('?' * len(chunk))})", chunk
+                ))
+        return found
+
+    def flush(batch, pool):
+        existing = existing_users([row[1] for row in batch])
+        if not update_existing:
+            # skipped users are never hashed
+            stats.skipped += len(existing)
+            batch = [row for row in batch if row[1] not in existing]
+
+        plain = [i for i, (_, _, secret, _) in enumerate(batch) if not secret.startswith("$2")]
+        hashes = {}
+        if plain:
+            t = time.perf_counter()
+            args = [(batch[i][2], rounds) for i in plain]
+            for i, hashed in zip(plain, pool.map(_hash, args, chunksize=HASH_CHUNK)):
+                hashes[i] = hashed
+            stats.hash_seconds += time.perf_counter() - t
+            stats.hashed += len(plain)
+
+        rows = [(u, hashes.get(i, secret), role) for i, (_, u, secret, role) in enumerate(batch)]
+        t = time.perf_counter()
+        with get_connection(db_path) as conn:
+            conn.executemany(sql, rows)
+        stats.write_seconds += time.perf_counter() - t
+        updated = sum(1 for r in rows if r[0] in existing)
+        stats.inserted += len(rows) - updated
+        stats.updated += updated
+        if progress:
+            stats.elapsed = time.perf_counter() - stats.started
+            progress(stats)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            batch = []
+            for line_no, username, secret, role in read_source(source):
+                stats.read += 1
+                reason = _check(username, secret)
+                if reason is None and username in seen:
+                    reason = f"duplicate of line {seen[username]}"
+                if reason:
+                    reject(line_no, username, reason)
+                    continue
+                seen[username] = line_no
+                batch.append((line_no, username, secret, role))
+                if len(batch) >= batch_size:
+                    flush(batch, pool)
+                    batch = []
+            if batch:
+                flush(batch, pool)
+    finally:
+        if reject_file:
+            reject_file.close()
+
+    stats.elapsed = time.perf_counter() - stats.started
+    return stats
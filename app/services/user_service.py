@@ -1,10 +1,87 @@
-import bcrypt
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 
 # Relative imports
-from ..data.users import get_user_by_username, insert_user
+from ..data.users import (get_user_by_username, insert_user, insert_users,
+                          get_existing_usernames, update_password_hash)
 from ..data.schema import create_users_table
-from ..data.db import connect_database
+from ..data.db import get_connection
+from .user_import import import_users
+from .auth_service import authenticate, hash_password, hash_password_async, HASH_TIMEOUT, sessions
+
+LOOKUP_TTL = 60  # seconds a users row is served from memory
+LOOKUP_MAX_ENTRIES = 10_000
+
+
+# CACHED LOOKUP
+
+
+class UserLookupCache:
+    """
+    username -> users row, kept for LOOKUP_TTL seconds (missing users too,
+    so repeated bad usernames don't hit the DB). Writes made through this
+    module invalidate the entry straight away. Bounded by max_entries
+    (LRU), so a flood of random usernames can't grow it without limit.
+    """
+
+    def __init__(self, ttl: float = LOOKUP_TTL, max_entries: int = LOOKUP_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, username: str):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._rows.get(username)
+            if entry is not None:
+                if entry[0] > now:
+                    self._rows.move_to_end(username)
+                    return entry[1]
+                del self._rows[username]
+        row = get_user_by_username(username)
+        with self._lock:
+            self._rows[username] = (now + self.ttl, row)
+            self._rows.move_to_end(username)
+            while len(self._rows) > self.max_entries:
+                self._rows.popitem(last=False)
+        return row
+
+    def __len__(self):
+        with self._lock:
+            return len(self._rows)
+
+    def invalidate(self, username: str = None):
+        with self._lock:
+            if username is None:
+                self._rows.clear()
+            else:
+                self._rows.pop(username, None)
+
+
+user_lookup = UserLookupCache()
+
+
+def get_password_hash(username: str):
+    row = user_lookup.get(username)
+    return row[2] if row else None  # (id, username, password_hash, role)
+
+
+def get_role(username: str):
+    row = user_lookup.get(username)
+    return row[3] if row else None
+
+
+def _update_password_hash(username: str, password_hash: str):
+    update_password_hash(username, password_hash)
+    user_lookup.invalidate(username)
+
+
+# REGISTRATION / LOGIN
 
 
 def register_user(username: str, password: str, role: str = "user"):
@@ -16,48 +93,69 @@ def register_user(username: str, password: str, role: str = "user"):
     if not username or not password:
         return False, "Username and password are required."
 
-    # check if user exists
-    existing = get_user_by_username(username)
-    if existing:
-        return False, f"User '{username}' already exists."
-
-    # hash password
-    password_hash = bcrypt.hashpw(
-        password.encode("utf-8"),
-        bcrypt.gensalt()
-    ).decode("utf-8")
+    # hash password (on the KDF pool, which caps concurrent bcrypt work)
+    password_hash = hash_password(password)
 
-    # insert into DB
-    insert_user(username, password_hash, role)
+    # insert into DB; the UNIQUE constraint catches existing users in the same round trip
+    try:
+        insert_user(username, password_hash, role)
+    except sqlite3.IntegrityError:
+        return False, f"User '{username}' already exists."
+    finally:
+        user_lookup.invalidate(username)
     return True, f"User '{username}' registered successfully."
 
 
 def login_user(username: str, password: str):
     """
-    Validate login.
+    Validate login. Recently verified passwords skip bcrypt, and hashes made
+    with an outdated cost are upgraded.
     Returns: (success: bool, message: str)
     """
-    if not username or not password:
-        return False, "Username and password are required."
+    return authenticate(username, password, get_password_hash, _update_password_hash)
+
+
+# SESSIONS
+
 
-    user = get_user_by_username(username)
-    if not user:
-        return False, "User not found."
+def start_session(username: str) -> str:
+    """Create a server-side session for a logged-in user; returns its token."""
+    return sessions.create(username, get_role(username) or "user")
 
-    stored_hash = user[2]  # (id, username, password_hash, role)
-    if bcrypt.checkpw(password.encode("utf-8"), stored_hash.encode("utf-8")):
-        return True, "Login successful!"
-    else:
-        return False, "Incorrect password."
 
+def current_user(token: str):
+    """(username, role) for a live session token, else None."""
+    return sessions.get(token)
 
-def migrate_users_from_file(filepath="DATA/users.txt"):
+
+def end_session(token: str):
+    sessions.revoke(token)
+
+
+# MIGRATION
+
+
+def _read_users_txt(path: Path):
+    """(username, password_hash, role) rows from a Week 7 users.txt."""
+    rows = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            parts = [p.strip() for p in line.strip().split(",")]
+            if len(parts) < 2 or not parts[0] or not parts[1]:
+                continue  # blank or bad row
+            rows.append((parts[0], parts[1], parts[2] if len(parts) > 2 else "user"))
+    return rows
+
+
+def migrate_users_from_file(filepath="DATA/users.txt", rejects_path=None):
     """
     Migrate users from Week 7 users.txt into DB.
 
     Expected format per line:
       username,password_hash,role(optional)
 
+    Existing users are left as they are; rows that can't be imported are
+    counted (and listed in rejects_path if given) instead of dropped silently.
     Returns: number of inserted users
     """
     path = Path(filepath)
@@ -66,37 +164,46 @@ def migrate_users_from_file(filepath="DATA/users.txt"):
         print(f"⚠️ {filepath} not found. Skipping migration.")
         return 0
 
-    conn = connect_database()
-    create_users_table(conn)
+    stats = import_users(path, rejects_path=rejects_path, update_existing=False)
+    user_lookup.invalidate()
 
-    migrated = 0
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-
-            parts = [p.strip() for p in line.split(",")]
-            username = parts[0]
-            password_hash = parts[1]
-            role = parts[2] if len(parts) > 2 else "user"
-
-            try:
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    INSERT INTO users (username, password_hash, role)
-                    VALUES (?, ?, ?)
-                    """,
-                    (username, password_hash, role)
-                )
-                migrated += 1
-            except Exception:
-                # ignore duplicates or bad rows
-                pass
-
-    conn.commit()
-    conn.close()
-
-    print(f"✅ Migrated {migrated} users from {filepath}")
-    return migrated
\ No newline at end of file
+    print(f"✅ Migrated {stats.inserted} users from {filepath} "
+          f"({stats.skipped} already present, {stats.rejected} rejected)")
+    return stats.inserted
+
+
+def migrate_legacy_users(json_path="users.json", txt_path="DATA/users.txt"):
+    """
+    One-shot import of the old login stores into the users table:
+    users.json ({username: plaintext password}, used by the first Home.py)
+    and DATA/users.txt (bcrypt hashes from Week 7).
+
+    Existing usernames are skipped before hashing, so running it again is
+    cheap; new plaintext passwords are hashed in the KDF pool and everything
+    goes in with a single executemany.
+    Returns: number of inserted users
+    """
+    rows = []
+    txt = Path(txt_path)
+    if txt.exists():
+        rows.extend(_read_users_txt(txt))
+
+    plain = {}
+    js = Path(json_path)
+    if js.exists():
+        with js.open("r", encoding="utf-8") as f:
+            plain = {u: p for u, p in json.load(f).items() if u and p}
+
+    with get_connection() as conn:
+        create_users_table(conn)
+    existing = get_existing_usernames({r[0] for r in rows} | set(plain))
+    rows = [r for r in rows if r[0] not in existing]
+    seen = {r[0] for r in rows}
+    pending = [(u, hash_password_async(p)) for u, p in plain.items() if u not in existing and u not in seen]
+    rows.extend((u, fut.result(HASH_TIMEOUT), "user") for u, fut in pending)
+
+    migrated = insert_users(rows) if rows else 0
+    user_lookup.invalidate()
+    if migrated:
+        print(f"✅ Migrated {migrated} users from {json_path} and {txt_path}")
+    return migrated
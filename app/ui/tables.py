@@ -0,0 +1,74 @@
+import sqlite3
+
+import streamlit as st
+
+from app.data.pagination import fetch_page, read_table_page
+
+
+def _pager_buttons(key, has_prev, has_next):
+    """Render Prev/Next buttons and return which one was pressed."""
+    prev_col, next_col, _ = st.columns([1, 1, 6])
+    with prev_col:
+        prev = st.button("◀ Prev", key=f"{key}_prev", disabled=not has_prev)
+    with next_col:
+        nxt = st.button("Next ▶", key=f"{key}_next", disabled=not has_next)
+    return prev, nxt
+
+
+def paginated_csv_table(csv_path, key: str, page_size: int = 10, columns=None):
+    """
+    Show a CSV one page at a time, reading only that page from disk
+    (or from the Parquet sidecar when enabled).
+    """
+    state = f"{key}_offset"
+    offset = st.session_state.get(state, 0)
+
+    df, total = read_table_page(csv_path, offset, page_size, columns)
+    if offset and df.empty:
+        # file shrank since the last rerun
+        offset = max(0, (total - 1) // page_size * page_size)
+        df, total = read_table_page(csv_path, offset, page_size, columns)
+
+    st.dataframe(df, use_container_width=True)
+    last = min(offset + page_size, total)
+    st.caption(f"Rows {offset + 1 if total else 0}–{last} of {total}")
+
+    prev, nxt = _pager_buttons(key, offset > 0, last < total)
+    if prev or nxt:
+        st.session_state[state] = max(0, offset - page_size) if prev else offset + page_size
+        st.rerun()
+    st.session_state[state] = offset
+    return df, total
+
+
+def paginated_sqlite_table(conn: sqlite3.Connection, table: str, key: str, columns=("*",),
+                           page_size: int = 10, filters=None, sort_by: str = "id",
+                           descending: bool = True, as_table: bool = False):
+    """
+    Show a SQLite table one page at a time using keyset pagination.
+    Filters and sort are pushed into the query; the session keeps a stack
+    of cursors so Prev goes back without OFFSET scans.
+    """
+    state = f"{key}_cursors"
+    signature = (table, tuple(sorted((filters or {}).items())), sort_by, descending)
+    if st.session_state.get(f"{key}_sig") != signature:
+        # filters or sort changed: start from the first page again
+        st.session_state[f"{key}_sig"] = signature
+        st.session_state[state] = [None]
+    cursors = st.session_state.setdefault(state, [None])
+
+    df, next_cursor = fetch_page(conn, table, columns, page_size, cursors[-1], filters, sort_by, descending)
+    if as_table:
+        st.table(df)
+    else:
+        st.dataframe(df, use_container_width=True)
+    st.caption(f"Page {len(cursors)}")
+
+    prev, nxt = _pager_buttons(key, len(cursors) > 1, next_cursor is not None)
+    if prev:
+        cursors.pop()
+        st.rerun()
+    if nxt:
+        cursors.append(next_cursor)
+        st.rerun()
+    return df
@@ -0,0 +1,60 @@
+"""Benchmark: row-at-a-time incident inserts vs the batched write API.
+
+Inserts N incidents into a throwaway database twice, once with
+`insert_incident` (one commit per row) and once with
+`insert_incidents_many` (executemany in one transaction), and prints
+rows/sec for each.
+
+Usage: python bench_batch_writes.py [rows] [chunk_size]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from app.data.db import connect_database
+from app.data.schema import create_cyber_incidents_table
+from app.data.incidents import insert_incident, insert_incidents_many
+
+
+def make_rows(n):
+    severities = ["low", "medium", "high"]
+    return [(f"Incident {i}", severities[i % 3], "open", "2024-01-01") for i in range(n)]
+
+
+def fresh_db(folder, name):
+    path = os.path.join(folder, name)
+    conn = connect_database(path)
+    create_cyber_incidents_table(conn)
+    return conn
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    rows = make_rows(n)
+
+    with tempfile.TemporaryDirectory() as folder:
+        conn = fresh_db(folder, "before.db")
+        start = time.perf_counter()
+        for title, severity, status, date in rows:
+            insert_incident(conn, title, severity, status, date)
+        before = time.perf_counter() - start
+        conn.close()
+
+        conn = fresh_db(folder, "after.db")
+        start = time.perf_counter()
+        insert_incidents_many(conn, rows, chunk_size=chunk_size)
+        after = time.perf_counter() - start
+        count = conn.execute("SELECT COUNT(*) FROM cyber_incidents").fetchone()[0]
+        conn.close()
+
+    print(f"\nRows: {n}  (sqlite {sqlite3.sqlite_version})")
+    print(f"before  insert_incident loop : {before:8.2f}s  {n / before:12,.0f} rows/sec")
+    print(f"after   insert_incidents_many: {after:8.2f}s  {n / after:12,.0f} rows/sec")
+    print(f"speed-up: {before / after:.1f}x  (verified {count} rows)")
+
+
+if __name__ == "__main__":
+    main()
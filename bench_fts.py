@@ -0,0 +1,95 @@
+"""Benchmark full-text search (app.data.fts.search) on a large it_tickets table.
+
+Fills a throwaway database with synthetic tickets, builds the FTS5 index
+and reports query latency for rare words, common words, prefixes and
+deeper pages, ranking every match and only the newest RANK_WINDOW.
+
+    python bench_fts.py [rows] [queries]     # defaults: 2000000 200
+"""
+import contextlib
+import io
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.data.fts import RANK_WINDOW, search
+from app.data.pool import apply_pragmas
+from app.data.schema import create_fts_tables, create_it_tickets_table
+
+SUBJECTS = ["password reset", "slow performance", "system crash", "access request", "printer issue",
+            "vpn outage", "malware detected", "phishing email", "ransomware demand", "disk full",
+            "unauthorized access", "database timeout", "email bounce", "license expired"]
+WORDS = ("server laptop network payroll finance portal firewall account backup cluster router "
+         "invoice desktop switch proxy token certificate gateway storage mailbox").split()
+
+
+def fill(conn, rows):
+    rnd = random.Random(3)
+    batch = []
+    for i in range(1, rows + 1):
+        title = f"{rnd.choice(SUBJECTS)} on {rnd.choice(WORDS)} {rnd.choice(WORDS)} ref{rnd.randrange(rows)}"
+        batch.append((i, title, rnd.choice(["Low", "Medium", "High"]), "open", "2024-01-01"))
+        if len(batch) == 100_000:
+            conn.executemany("INSERT INTO it_tickets VALUES (?, ?, ?, ?, ?)", batch)
+            batch = []
+    conn.executemany("INSERT INTO it_tickets VALUES (?, ?, ?, ?, ?)", batch)
+    conn.commit()
+
+
+def timed(conn, queries, **kw):
+    timings = []
+    for q in queries:
+        t = time.perf_counter()
+        search(q, "it_tickets", conn, **kw)
+        timings.append((time.perf_counter() - t) * 1000)
+    return np.percentile(timings, 50), np.percentile(timings, 95)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rnd = random.Random(5)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(str(Path(tmp) / "bench.db"))
+        apply_pragmas(conn)
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_it_tickets_table(conn)
+            t = time.perf_counter()
+            fill(conn, rows)
+            loaded = time.perf_counter() - t
+            t = time.perf_counter()
+            create_fts_tables(conn)
+            conn.commit()
+        print(f"{rows:,} tickets: insert {loaded:.1f}s, FTS5 build {time.perf_counter() - t:.1f}s")
+
+        cases = {
+            "rare word (ref id)": [f"ref{rnd.randrange(rows)}" for _ in range(n)],
+            "two common words": [f"{rnd.choice(WORDS)} {rnd.choice(WORDS)}" for _ in range(n)],
+            "phrase + word": [f"{rnd.choice(SUBJECTS)} {rnd.choice(WORDS)}" for _ in range(n)],
+            "prefix (3 chars)": [rnd.choice(SUBJECTS)[:3] for _ in range(n)],
+        }
+        for mode, kw in (("all matches", {}), (f"newest {RANK_WINDOW:,}", {"window": RANK_WINDOW})):
+            print(f"-- ranking {mode}")
+            for name, queries in cases.items():
+                p50, p95 = timed(conn, queries, **kw)
+                print(f"{name:20s} p50 {p50:7.2f} ms   p95 {p95:7.2f} ms")
+            p50, p95 = timed(conn, cases["phrase + word"], offset=50, **kw)
+            print(f"{'page 6 (offset 50)':20s} p50 {p50:7.2f} ms   p95 {p95:7.2f} ms")
+
+        t = time.perf_counter()
+        for i in range(1000):
+            conn.execute("INSERT INTO it_tickets (title, priority, status, created_date) VALUES (?, 'Low', 'open', '2024-01-01')",
+                         (f"printer jam {i}",))
+        conn.commit()
+        print(f"insert with FTS trigger: {(time.perf_counter() - t) * 1000 / 1000:.3f} ms/row")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
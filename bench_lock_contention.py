@@ -0,0 +1,131 @@
+"""Benchmark: one CRUD writer against N dashboard readers.
+
+Seeds a throwaway incidents database, then for each mode runs a writer
+thread inserting one incident per transaction while N reader threads
+repeat a dashboard-sized aggregate query:
+
+  rollback  journal_mode=DELETE, plain connections (the old setup)
+  wal       WAL, readers on read_connection() (mode=ro, one snapshot)
+  replica   WAL, readers on a backup replica refreshed every second
+
+Prints commits/sec, commit latency percentiles and "database is locked"
+errors for the writer, and queries/sec for the readers.
+
+Usage: python bench_lock_contention.py [readers] [seconds] [rows] [busy_ms]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from app.data.db import connect_database, read_connection
+from app.data.pool import apply_pragmas, get_pool
+from app.data.replica import get_replica
+from app.data.schema import create_cyber_incidents_table
+from app.data.incidents import insert_incidents_many
+
+READ_SQL = """
+    SELECT severity, status, COUNT(*), MAX(date)
+    FROM cyber_incidents
+    GROUP BY severity, status
+"""
+INSERT_SQL = "INSERT INTO cyber_incidents (title, severity, status, date) VALUES (?, ?, ?, ?)"
+
+
+def seed(path, rows):
+    conn = connect_database(path)
+    create_cyber_incidents_table(conn)
+    severities = ["low", "medium", "high", "critical"]
+    statuses = ["open", "in progress", "resolved", "closed"]
+    insert_incidents_many(conn, [
+        (f"Incident {i}", severities[i % 4], statuses[i % 7 % 4], f"2024-{i % 12 + 1:02d}-01")
+        for i in range(rows)
+    ])
+    conn.close()
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def run(mode, path, readers, seconds, busy_ms):
+    stop = threading.Event()
+    latencies, reads = [], [0] * readers
+    errors = {"writer": 0, "readers": 0}
+
+    def writer():
+        conn = sqlite3.connect(path, timeout=busy_ms / 1000)
+        if mode != "rollback":
+            apply_pragmas(conn)
+        i = 0
+        while not stop.is_set():
+            t = time.perf_counter()
+            try:
+                conn.execute(INSERT_SQL, (f"Contention {i}", "high", "open", "2024-06-01"))
+                conn.commit()
+                latencies.append(time.perf_counter() - t)
+            except sqlite3.OperationalError:  # database is locked
+                errors["writer"] += 1
+                conn.rollback()
+            i += 1
+        conn.close()
+
+    def reader(n):
+        plain = sqlite3.connect(path, timeout=busy_ms / 1000) if mode == "rollback" else None
+        while not stop.is_set():
+            try:
+                if plain is not None:
+                    plain.execute(READ_SQL).fetchall()
+                else:
+                    with read_connection(path, max_age=1.0 if mode == "replica" else 0) as conn:
+                        conn.execute(READ_SQL).fetchall()
+                reads[n] += 1
+            except sqlite3.OperationalError:
+                errors["readers"] += 1
+        if plain is not None:
+            plain.close()
+
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA journal_mode = {'DELETE' if mode == 'rollback' else 'WAL'}")
+    conn.close()
+    if mode == "replica":
+        get_replica(path).refresh()
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    get_pool(path, readonly=True).close_all()
+    print(
+        f"{mode:<9} writer {len(latencies) / seconds:>8,.0f} commits/s  "
+        f"p50 {percentile(latencies, 0.5) * 1000:6.2f} ms  p99 {percentile(latencies, 0.99) * 1000:7.2f} ms  "
+        f"max {max(latencies, default=0) * 1000:7.1f} ms  locked {errors['writer']:>4} | "
+        f"readers {sum(reads) / seconds:>7,.0f} queries/s  locked {errors['readers']}"
+    )
+
+
+def main():
+    readers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    rows = int(sys.argv[3]) if len(sys.argv) > 3 else 200_000
+    busy_ms = int(sys.argv[4]) if len(sys.argv) > 4 else 1000
+
+    print(f"1 writer vs {readers} readers, {seconds:g}s per mode, {rows:,} seeded rows, busy timeout {busy_ms} ms")
+    with tempfile.TemporaryDirectory() as folder:
+        for mode in ("rollback", "wal", "replica"):
+            path = os.path.join(folder, f"{mode}.db")
+            seed(path, rows)
+            run(mode, path, readers, seconds, busy_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark memory and construction time of the ticket model variants.
+
+Builds N tickets as ITTicket, CompactITTicket, FrozenITTicket and an
+ITTicketBatch (row by row and column-wise), from the same pre-generated
+strings, and reports construction time, memory per ticket (tracemalloc,
+excluding the shared input strings) and a status-count pass over each.
+
+    python bench_models.py [tickets]     # default: 1000000
+"""
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from models.batch import ITTicketBatch
+from models.it_ticket import CompactITTicket, FrozenITTicket, ITTicket
+
+STATUSES = ["open", "in_progress", "resolved", "closed"]
+PEOPLE = [None, "Ayesha", "Fatima", "John", "Omar", "Sara", "Mike"]
+
+
+def inputs(n):
+    rnd = random.Random(4)
+    start = datetime(2024, 1, 1)
+    return {
+        "ticket_id": [f"TCK{i:07d}" for i in range(n)],
+        "title": [f"ticket {i}" for i in range(n)],
+        "description": [f"description {i}" for i in range(n)],
+        "status": [rnd.choice(STATUSES) for _ in range(n)],
+        "created_at": [start + timedelta(minutes=i) for i in range(n)],
+        "reporter": [rnd.choice(PEOPLE) for _ in range(n)],
+        "assigned_to": [rnd.choice(PEOPLE) for _ in range(n)],
+    }
+
+
+def build_objects(cls, cols):
+    return [cls(*row) for row in zip(*cols.values())]
+
+
+def build_batch_rows(cols):
+    batch = ITTicketBatch()
+    for row in zip(*cols.values()):
+        batch.append(*row)
+    return batch
+
+
+def build_batch_columns(cols):
+    batch = ITTicketBatch()
+    batch.extend_columns(cols)
+    return batch
+
+
+def count_open(records):
+    if isinstance(records, ITTicketBatch):
+        return records.status_counts().get("open", 0)
+    return sum(1 for r in records if r.get_status() == "open")
+
+
+def measure(build, cols):
+    gc.collect()
+    t = time.perf_counter()
+    result = build(cols)
+    elapsed = time.perf_counter() - t
+    del result
+    gc.collect()
+
+    tracemalloc.start()
+    result = build(cols)
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    t = time.perf_counter()
+    count_open(result)
+    scan = time.perf_counter() - t
+    return elapsed, used, scan
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    cols = inputs(n)
+    print(f"{n:,} tickets (input strings shared, not counted)\n")
+    print(f"{'variant':26s} {'build':>8s} {'memory':>10s} {'bytes/row':>10s} {'count open':>11s}")
+
+    variants = [
+        ("ITTicket", lambda c: build_objects(ITTicket, c)),
+        ("CompactITTicket", lambda c: build_objects(CompactITTicket, c)),
+        ("FrozenITTicket", lambda c: build_objects(FrozenITTicket, c)),
+        ("ITTicketBatch.append", build_batch_rows),
+        ("ITTicketBatch.extend", build_batch_columns),
+    ]
+    for name, build in variants:
+        elapsed, used, scan = measure(build, cols)
+        print(f"{name:26s} {elapsed:7.2f}s {used / 1e6:8.1f}MB {used / n:10.0f} {scan * 1000:9.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
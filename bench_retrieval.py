@@ -0,0 +1,82 @@
+"""Benchmark the BM25 retrieval index (app.data.retrieval.SearchIndex).
+
+Builds an index over synthetic incident/ticket titles, then reports build
+time, query latency percentiles, incremental add cost and snapshot
+save/load time. Nothing touches the real database.
+
+    python bench_retrieval.py [docs] [queries]     # defaults: 1000000 1000
+"""
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.data.retrieval import SearchIndex
+
+SUBJECTS = ["password reset", "slow performance", "system crash", "access request", "printer issue",
+            "vpn outage", "malware detected", "phishing email", "ransomware demand", "disk full",
+            "unauthorized access", "database timeout", "email bounce", "license expired"]
+WORDS = ("server laptop network payroll finance portal firewall account backup cluster router "
+         "invoice desktop switch proxy token certificate gateway storage mailbox").split()
+
+
+def synthetic_docs(n, start=1, seed=7):
+    rnd = random.Random(seed + start)
+    for i in range(start, start + n):
+        text = (f"TCK{i:07d} {rnd.choice(SUBJECTS)} on {rnd.choice(WORDS)} {rnd.choice(WORDS)} "
+                f"reported by user {rnd.randrange(5000)}")
+        yield i, "bench", text
+
+
+def percentile(samples, q):
+    return float(np.percentile(np.asarray(samples) * 1000, q))
+
+
+def main():
+    docs = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    print(f"Building index over {docs:,} documents...")
+
+    index = SearchIndex()
+    t0 = time.perf_counter()
+    index.add_documents(synthetic_docs(docs))
+    index.flush_pending()
+    build = time.perf_counter() - t0
+    print(f"build: {build:.1f}s ({docs / build:,.0f} docs/sec), {len(index.vocab):,} terms")
+
+    rnd = random.Random(1)
+    texts = [f"{rnd.choice(SUBJECTS)} {rnd.choice(WORDS)}" for _ in range(queries)]
+    texts += [f"TCK{rnd.randrange(1, docs):07d}" for _ in range(queries // 10)]
+    timings = []
+    for text in texts:
+        t = time.perf_counter()
+        index.search(text, k=5)
+        timings.append(time.perf_counter() - t)
+    print(f"query: p50 {percentile(timings, 50):.2f} ms, p95 {percentile(timings, 95):.2f} ms, "
+          f"max {max(timings) * 1000:.2f} ms over {len(texts):,} queries")
+
+    t = time.perf_counter()
+    for doc in synthetic_docs(1000, start=docs + 1):
+        index.add_documents([doc])
+    print(f"incremental add: {(time.perf_counter() - t) / 1000 * 1000:.3f} ms/doc")
+    t = time.perf_counter()
+    index.remove_documents(range(1, 1001))
+    print(f"remove 1,000 docs: {(time.perf_counter() - t) * 1000:.2f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.search.npz"
+        t = time.perf_counter()
+        index.save(path)
+        saved = time.perf_counter() - t
+        t = time.perf_counter()
+        loaded = SearchIndex.load(path)
+        print(f"snapshot: save {saved:.2f}s, load {time.perf_counter() - t:.2f}s, "
+              f"{path.stat().st_size / 1e6:.0f} MB")
+        assert loaded.search("vpn outage router", 5) == index.search("vpn outage router", 5)
+
+
+if __name__ == "__main__":
+    main()
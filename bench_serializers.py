@@ -0,0 +1,97 @@
+"""Benchmark the bulk serializers of models.batch.
+
+Times to_jsonl / to_csv / write_arrow / from_cursor against the per-object
+approach on N tickets. That their output matches to_dict() is checked by
+models/test_batch.py.
+
+    python bench_serializers.py [tickets]     # default: 1000000
+"""
+import csv
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from models.batch import ITTicketBatch
+from models.it_ticket import ITTicket
+
+STATUSES = ["open", "in_progress", "resolved", "closed"]
+PEOPLE = [None, "Ayesha", "Fatima", "Jöhn \"JJ\"", "Omar, O.", "Sara"]
+
+
+def make_batch(n, seed=2):
+    rnd = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    batch = ITTicketBatch()
+    batch.extend_columns({
+        "ticket_id": [f"TCK{i:07d}" for i in range(n)],
+        "title": [f"ticket {i}" for i in range(n)],
+        "description": [None if i % 7 == 0 else f"line one\nline \"two\" {i}" for i in range(n)],
+        "status": [rnd.choice(STATUSES) for _ in range(n)],
+        "created_at": [start + timedelta(seconds=i, microseconds=(i % 3) * 250) for i in range(n)],
+        "reporter": [rnd.choice(PEOPLE) for _ in range(n)],
+        "assigned_to": [rnd.choice(PEOPLE) for _ in range(n)],
+    })
+    return batch
+
+
+def timed(label, fn, n):
+    t = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t
+    print(f"{label:38s} {elapsed:6.2f}s  ({n / elapsed:,.0f} rows/s)")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    batch = make_batch(n)
+    objects = [ITTicket(t.get_id(), t.get_title(), t.get_description(), t.get_status(), t.get_created_at(),
+                        t.get_reporter(), t.get_assigned_to()) for t in batch]
+    print(f"\n{n:,} tickets")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        def per_object_jsonl():
+            with open(tmp / "a.jsonl", "w", encoding="utf-8") as f:
+                for t in objects:
+                    f.write(json.dumps(t.to_dict()) + "\n")
+
+        def per_object_csv():
+            with open(tmp / "a.csv", "w", encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=list(objects[0].to_dict()))
+                writer.writeheader()
+                for t in objects:
+                    writer.writerow(t.to_dict())
+
+        def bulk(method, name):
+            with open(tmp / name, "w", encoding="utf-8", newline="") as f:
+                getattr(batch, method)(f)
+
+        timed("JSON lines, to_dict() per object", per_object_jsonl, n)
+        timed("JSON lines, ITTicketBatch.to_jsonl", lambda: bulk("to_jsonl", "b.jsonl"), n)
+        timed("CSV, DictWriter per object", per_object_csv, n)
+        timed("CSV, ITTicketBatch.to_csv", lambda: bulk("to_csv", "b.csv"), n)
+        timed("Arrow, ITTicketBatch.write_arrow", lambda: batch.write_arrow(tmp / "b.arrow"), n)
+
+        conn = sqlite3.connect(str(tmp / "bench.db"))
+        conn.execute("CREATE TABLE t (ticket_id, title, description, status, created_at, reporter, assigned_to)")
+        conn.executemany("INSERT INTO t VALUES (?, ?, ?, ?, ?, ?, ?)", batch.to_records())
+        conn.commit()
+
+        def per_object_load():
+            [ITTicket(r[0], r[1], r[2], r[3], datetime.fromisoformat(r[4]), r[5], r[6])
+             for r in conn.execute("SELECT * FROM t")]
+
+        timed("SQLite -> ITTicket objects", per_object_load, n)
+        timed("SQLite -> ITTicketBatch.from_cursor",
+              lambda: ITTicketBatch.from_cursor(conn.execute("SELECT * FROM t")), n)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
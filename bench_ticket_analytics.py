@@ -0,0 +1,124 @@
+"""Benchmark: vectorized ticket SLA / resolution-time metrics.
+
+Builds a synthetic typed ticket frame (default 10M rows, the shape
+prepare_tickets produces) and times resolution_stats, backlog_aging and
+sla_breaches per priority, category and assignee. Also times
+prepare_tickets on raw CSV-style strings.
+
+Before timing, the results on a smaller frame are checked against pandas
+groupby quantiles and a plain row-by-row Python loop (which is timed too).
+
+Usage: python bench_ticket_analytics.py [rows] [check_rows]
+"""
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from app.services.ticket_analytics import (
+    SlaPolicy, backlog_aging, prepare_tickets, resolution_stats, sla_breaches,
+)
+
+PRIORITIES = ["Critical", "High", "Medium", "Low"]
+STATUSES = ["Open", "In Progress", "Resolved", "Closed"]
+CATEGORIES = ["Access", "Database", "Hardware", "Network", "Security", "Software"]
+ASSIGNEES = [f"Analyst {i}" for i in range(200)]
+NOW = pd.Timestamp("2025-01-01")
+
+
+def synthetic_frame(n, seed=7):
+    """Typed ticket frame with n rows (categoricals + datetime64), built without Python strings."""
+    rng = np.random.default_rng(seed)
+    status = rng.integers(0, len(STATUSES), n)
+    created = np.datetime64("2023-01-01") + rng.integers(0, 730, n).astype("timedelta64[D]")
+    resolved = created + rng.gamma(2.0, 3.0, n).astype("timedelta64[D]")
+    resolved[status < 2] = np.datetime64("NaT")
+    raw = pd.DataFrame({
+        "priority": pd.Categorical.from_codes(rng.integers(0, len(PRIORITIES), n), PRIORITIES),
+        "status": pd.Categorical.from_codes(status, STATUSES),
+        "category": pd.Categorical.from_codes(rng.integers(0, len(CATEGORIES), n), CATEGORIES),
+        "assigned_to": pd.Categorical.from_codes(rng.integers(0, len(ASSIGNEES), n), ASSIGNEES),
+        "created_date": created,
+        "resolved_date": resolved,
+    })
+    return prepare_tickets(raw)
+
+
+def timed(label, fn, rows):
+    t = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t
+    print(f"  {label:<34} {elapsed:7.3f}s  ({rows / elapsed / 1e6:6.1f}M rows/s)")
+    return result
+
+
+def row_loop(frame, policy):
+    """The row-at-a-time version: per-priority resolution times and SLA breaches."""
+    times = defaultdict(list)
+    breaches = defaultdict(int)
+    for priority, status, created, resolved in zip(
+        frame["priority"].astype(str), frame["status"].astype(str),
+        frame["created_date"], frame["resolved_date"],
+    ):
+        target = policy.targets.get(priority.lower(), policy.default_days)
+        if status.lower() in ("resolved", "closed") and not pd.isna(resolved):
+            days = (resolved - created).days
+            times[priority].append(days)
+            breaches[priority] += days > target
+        elif status.lower() in ("open", "in progress"):
+            breaches[priority] += (NOW - created).days > target
+    return {p: float(np.percentile(v, 90)) for p, v in times.items()}, dict(breaches)
+
+
+def check(frame, policy):
+    for by in ("priority", "category", "assigned_to"):
+        ours = resolution_stats(frame, by)
+        closed = frame[frame["resolution_days"].notna()]
+        expected = closed.groupby(by, observed=True)["resolution_days"].quantile([0.5, 0.9, 0.95]).unstack()
+        assert np.allclose(ours[["p50", "p90", "p95"]].to_numpy(), expected.loc[ours.index].to_numpy())
+
+    aging = backlog_aging(frame, "category", NOW)
+    assert aging["total"].sum() == frame["is_open"].sum()
+
+    t = time.perf_counter()
+    p90, breaches = row_loop(frame, policy)
+    loop = time.perf_counter() - t
+    t = time.perf_counter()
+    stats = resolution_stats(frame, "priority")
+    sla = sla_breaches(frame, policy, "priority", NOW)
+    vectorized = time.perf_counter() - t
+    for priority, value in p90.items():
+        assert np.isclose(stats.loc[priority, "p90"], value)
+        assert sla.loc[priority, "breached_resolved"] + sla.loc[priority, "breached_open"] == breaches[priority]
+    print(f"checks passed on {len(frame):,} rows: row loop {loop:.2f}s, vectorized {vectorized:.3f}s "
+          f"({loop / vectorized:,.0f}x)")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    check_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    policy = SlaPolicy()
+
+    check(synthetic_frame(check_rows, seed=1), policy)
+
+    sample = synthetic_frame(min(rows, 1_000_000), seed=2)
+    as_text = pd.DataFrame({c: sample[c].astype(str) for c in ("priority", "status", "category", "assigned_to")})
+    for col in ("created_date", "resolved_date"):
+        as_text[col] = sample[col].dt.strftime("%Y-%m-%d")
+    print(f"\nprepare_tickets from CSV strings, {len(as_text):,} rows")
+    timed("prepare_tickets", lambda: prepare_tickets(as_text), len(as_text))
+
+    t = time.perf_counter()
+    frame = synthetic_frame(rows)
+    print(f"\n{rows:,} typed rows built in {time.perf_counter() - t:.1f}s "
+          f"({frame.memory_usage(deep=True).sum() / 1e6:,.0f} MB)")
+    for by in ("priority", "category", "assigned_to"):
+        timed(f"resolution_stats by {by}", lambda: resolution_stats(frame, by), rows)
+        timed(f"backlog_aging by {by}", lambda: backlog_aging(frame, by, NOW), rows)
+        timed(f"sla_breaches by {by}", lambda: sla_breaches(frame, policy, by, NOW), rows)
+
+
+if __name__ == "__main__":
+    main()
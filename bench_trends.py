@@ -0,0 +1,125 @@
+"""Benchmark: trend rollups vs grouping raw rows per chart.
+
+1. A synthetic tickets export (default 1M rows) is counted per month the
+   way the Analytics page used to (to_period("M").astype(str) + groupby
+   over every row), then read back from the trend rollups at month,
+   quarter and week grain. The results are checked against each other.
+2. Incidents are inserted into a throwaway cyber_incidents table with and
+   without the trend triggers, then updated and deleted at random; the
+   trigger-maintained counts must equal a rebuild from the raw rows.
+
+Usage: python bench_trends.py [rows] [table_rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.data.db import connect_database
+from app.data.schema import create_cyber_incidents_table
+from app.data.trend_rollups import (
+    TREND_SPECS, install_trend_rollups, read_trend, rebuild_trends, trend_rows,
+)
+
+PRIORITIES = ["Critical", "High", "Medium", "Low"]
+STATUSES = ["Open", "In Progress", "Resolved", "Closed"]
+CATEGORIES = ["Access", "Database", "Hardware", "Network", "Security", "Software"]
+
+
+def synthetic_tickets(n, seed=3):
+    rng = np.random.default_rng(seed)
+    created = np.datetime64("2020-01-01") + rng.integers(0, 5 * 365, n).astype("timedelta64[D]")
+    return pd.DataFrame({
+        "priority": np.array(PRIORITIES, dtype=object)[rng.integers(0, 4, n)],
+        "status": np.array(STATUSES, dtype=object)[rng.integers(0, 4, n)],
+        "category": np.array(CATEGORIES, dtype=object)[rng.integers(0, 6, n)],
+        "created_date": pd.Series(created).dt.strftime("%Y-%m-%d"),
+    })
+
+
+def timed(label, fn):
+    t = time.perf_counter()
+    result = fn()
+    print(f"  {label:<40} {time.perf_counter() - t:8.3f}s")
+    return result
+
+
+def export_trends(folder, n):
+    tickets = synthetic_tickets(n)
+    conn = connect_database(os.path.join(folder, "trends.db"))
+    print(f"{n:,} ticket rows")
+
+    def per_month_from_rows():
+        months = pd.to_datetime(tickets["created_date"]).dt.to_period("M").astype(str)
+        return months.groupby(months).size()
+
+    old = timed("raw rows: to_period + string groupby", per_month_from_rows)
+    timed("build rollups (once)", lambda: rebuild_trends(conn, "bench", trend_rows(tickets, TREND_SPECS["it_tickets"])))
+    conn.commit()
+    month = timed("rollups: month", lambda: read_trend(conn, "bench", "month"))
+    quarter = timed("rollups: quarter (re-bucketed months)", lambda: read_trend(conn, "bench", "quarter"))
+    week = timed("rollups: week by priority", lambda: read_trend(conn, "bench", "week", by="level"))
+    timed("rollups: day, status=Open", lambda: read_trend(conn, "bench", "day", status="Open"))
+
+    assert (month["period"].dt.strftime("%Y-%m").to_numpy() == old.index.to_numpy()).all()
+    assert (month["count"].to_numpy() == old.to_numpy()).all()
+    quarters = pd.to_datetime(tickets["created_date"]).dt.to_period("Q").value_counts().sort_index()
+    assert (quarter["count"].to_numpy() == quarters.to_numpy()).all()
+    assert week["count"].sum() == n
+    conn.close()
+    print("checks passed: month/quarter/week rollups match the raw rows")
+
+
+def trigger_upkeep(folder, n):
+    rng = np.random.default_rng(5)
+    days = np.datetime64("2023-01-01") + rng.integers(0, 700, n).astype("timedelta64[D]")
+    rows = list(zip(
+        (f"Incident {i}" for i in range(n)),
+        np.array(PRIORITIES, dtype=object)[rng.integers(0, 4, n)],
+        np.array(STATUSES, dtype=object)[rng.integers(0, 4, n)],
+        pd.Series(days).dt.strftime("%Y-%m-%d"),
+    ))
+    sql = "INSERT INTO cyber_incidents (title, severity, status, date) VALUES (?, ?, ?, ?)"
+    print(f"\n{n:,} incident inserts")
+
+    timings = {}
+    for triggers in (False, True):
+        conn = connect_database(os.path.join(folder, f"incidents_{triggers}.db"))
+        create_cyber_incidents_table(conn)
+        if triggers:
+            install_trend_rollups(conn, "cyber_incidents")
+        t = time.perf_counter()
+        conn.executemany(sql, rows)
+        conn.commit()
+        timings[triggers] = time.perf_counter() - t
+        print(f"  {'with' if triggers else 'without'} trend triggers {'':<21} {timings[triggers]:8.3f}s")
+
+    ids = rng.choice(np.arange(1, n + 1), size=n // 10, replace=False)
+    conn.executemany("UPDATE cyber_incidents SET severity = 'Critical', date = '2024-12-31' WHERE id = ?",
+                     [(int(i),) for i in ids[: len(ids) // 2]])
+    conn.executemany("DELETE FROM cyber_incidents WHERE id = ?", [(int(i),) for i in ids[len(ids) // 2:]])
+    conn.commit()
+
+    live = read_trend(conn, "cyber_incidents", "week", by="level")
+    raw = pd.read_sql_query("SELECT severity, status, date FROM cyber_incidents", conn)
+    rebuild_trends(conn, "check", trend_rows(raw, TREND_SPECS["cyber_incidents"]))
+    expected = read_trend(conn, "check", "week", by="level")
+    assert live.equals(expected), "trigger-maintained counts drifted from the raw rows"
+    conn.close()
+    print(f"checks passed: triggers match a rebuild after {len(ids):,} updates/deletes "
+          f"(insert overhead {timings[True] / timings[False]:.1f}x)")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    table_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    with tempfile.TemporaryDirectory() as folder:
+        export_trends(folder, rows)
+        trigger_upkeep(folder, table_rows)
+
+
+if __name__ == "__main__":
+    main()
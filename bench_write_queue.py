@@ -0,0 +1,127 @@
+"""Benchmark: synchronous CRUD writes vs the write-behind queue.
+
+T threads (one per "analyst") each add N incidents to a throwaway
+database, first with one transaction and commit per write on a pooled
+connection (the old add_incident_db), then through the write queue,
+which group-commits whatever is waiting. Prints writes/sec, commits and
+submit-to-result latency.
+
+Before timing it checks that a failing command only fails its own
+Future, that commands journaled before a "crash" are replayed on
+restart exactly once, and that a replayed unknown op only fails itself.
+
+Usage: python bench_write_queue.py [threads] [writes_per_thread]
+"""
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from app.data.db import get_connection
+from app.data.incidents import insert_incident
+from app.data.schema import create_cyber_incidents_table
+from app.data.write_queue import WriteQueue
+
+
+def count(path):
+    with get_connection(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM cyber_incidents").fetchone()[0]
+
+
+def check(folder):
+    db = os.path.join(folder, "check.db")
+    journal = os.path.join(folder, "check.jsonl")
+
+    wq = WriteQueue(journal).start()
+    ok = wq.submit("add_incident", db, "ok", "low", "open", "2024-01-01")
+    bad = wq.submit("add_incident", db, "no date", "low", "open", None)  # date is NOT NULL
+    assert isinstance(ok.result(), int)
+    try:
+        bad.result()
+        raise AssertionError("insert without a date should fail")
+    except sqlite3.IntegrityError:
+        pass
+    wq.close()
+    assert count(db) == 1
+
+    # crash after the commit but before the checkpoint: drop the "done" lines
+    # and add a command that was journaled but never applied
+    with open(journal, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    kept = [r for r in records if "done" not in r]
+    last = max(r["seq"] for r in kept if "seq" in r)
+    kept.append({"seq": last + 1, "op": "add_incident",
+                 "target": db, "args": ["after crash", "high", "open", "2024-01-02"]})
+    # an operation this version no longer has must not stop the worker
+    kept.append({"seq": last + 2, "op": "removed_op", "target": db, "args": []})
+    with open(journal, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(r) + "\n" for r in kept)
+
+    wq = WriteQueue(journal).start()
+    after = wq("add_incident", db, "after replay", "low", "open", "2024-01-03", result_timeout=5)
+    wq.close()
+    assert isinstance(after, int), "the worker must outlive a bad replayed record"
+    assert wq.stats()["replayed"] == 4
+    assert count(db) == 3, "replay must skip commands the database already committed"
+    print("checks passed: per-command failures, exactly-once replay, unknown ops")
+
+
+def run(label, threads, per_thread, write):
+    latencies = []
+    lock = threading.Lock()
+
+    def analyst(n):
+        mine = []
+        for i in range(per_thread):
+            t = time.perf_counter()
+            write(f"Incident {n}-{i}")
+            mine.append(time.perf_counter() - t)
+        with lock:
+            latencies.extend(mine)
+
+    workers = [threading.Thread(target=analyst, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    total = threads * per_thread
+    print(f"{label:<12} {total / elapsed:>9,.0f} writes/s  "
+          f"p50 {latencies[total // 2] * 1000:6.2f} ms  p99 {latencies[int(total * 0.99)] * 1000:7.2f} ms")
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    with tempfile.TemporaryDirectory() as folder:
+        check(folder)
+
+        sync_db = os.path.join(folder, "sync.db")
+        with get_connection(sync_db) as conn:
+            create_cyber_incidents_table(conn)
+
+        def sync_write(title):
+            with get_connection(sync_db) as conn:
+                insert_incident(conn, title, "high", "open", "2024-06-01")
+
+        run("synchronous", threads, per_thread, sync_write)
+
+        queued_db = os.path.join(folder, "queued.db")
+        wq = WriteQueue(os.path.join(folder, "bench.jsonl")).start()
+        run("write queue", threads, per_thread,
+            lambda title: wq("add_incident", queued_db, title, "high", "open", "2024-06-01"))
+        wq.close()
+        stats = wq.stats()
+        print(f"write queue: {stats['commits']:,} commits for {stats['applied']:,} writes "
+              f"(avg {stats['avg_batch']:.1f} per batch)")
+        assert count(sync_db) == count(queued_db) == threads * per_thread
+
+
+if __name__ == "__main__":
+    main()
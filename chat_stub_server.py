@@ -0,0 +1,112 @@
+"""Local stub of the chat-completions streaming API, plus a self-check.
+
+Serves POST /v1/chat/completions with stream=true as server-sent events,
+echoing the last user message back one word per chunk. Point the AI Chat
+page at it with OPENAI_BASE_URL=http://127.0.0.1:8765/v1, or run this file
+to check app.services.chat_service against it:
+
+    python chat_stub_server.py           # self-check
+    python chat_stub_server.py --serve   # just run the stub on port 8765
+
+app/services/test_chat_service.py runs the same checks under pytest.
+"""
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.services.chat_service import ChatStream, HTTPChatClient, ResponseCache
+
+TOKEN_DELAY = 0.01  # seconds between streamed chunks
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    calls = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        StubHandler.calls += 1
+        prompt = next((m["content"] for m in reversed(body["messages"]) if m["role"] == "user"), "")
+        words = f"echo: {prompt}".split(" ")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        try:
+            for i, word in enumerate(words):
+                chunk = {
+                    "id": "stub", "object": "chat.completion.chunk", "model": body["model"],
+                    "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word},
+                                 "finish_reason": None}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(TOKEN_DELAY)
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client cancelled mid-stream
+
+
+def start_stub(port=0):
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    server = start_stub()
+    client = HTTPChatClient(f"http://127.0.0.1:{server.server_port}/v1")
+    cache = ResponseCache(max_entries=2, ttl=60)
+    messages = [{"role": "user", "content": "how many open tickets are there"}]
+    key = cache.key("fp", messages[0]["content"])
+
+    # tokens arrive through the queue while the caller is free to do other work
+    stream = ChatStream(client, messages, cache=cache, cache_key=key)
+    polls = 0
+    while not stream.done:
+        stream.drain()
+        polls += 1
+        time.sleep(0.005)
+    assert stream.error is None, stream.error
+    assert stream.text == "echo: how many open tickets are there", stream.text
+    assert polls > 1, "stream should not have blocked the caller"
+    print(f"streamed {len(stream.text.split())} tokens over {polls} polls")
+
+    # the same question, differently typed, is served from the cache
+    again = ChatStream(client, messages, cache=cache,
+                       cache_key=cache.key("fp", "  How many OPEN tickets are there? "))
+    assert again.cached and "".join(again.tokens()) == stream.text
+    assert StubHandler.calls == 1
+
+    # a new dataset version is a different key
+    other = ChatStream(client, messages, cache=cache, cache_key=cache.key("fp2", messages[0]["content"]))
+    list(other.tokens())
+    assert not other.cached and StubHandler.calls == 2
+
+    # a cancelled answer is not cached
+    cancelled = ChatStream(client, messages, cache=cache, cache_key=cache.key("fp3", "x"))
+    cancelled.cancel()
+    list(cancelled.tokens())
+    assert cache.get(cache.key("fp3", "x")) is None
+
+    # size bound: the least recently used entry went first
+    assert cache.stats()["entries"] <= 2
+    print("cache:", cache.stats())
+    print("chat service OK")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    if "--serve" in sys.argv:
+        print("stub chat server on http://127.0.0.1:8765/v1")
+        start_stub(8765)
+        threading.Event().wait()
+    else:
+        main()
@@ -11,6 +11,7 @@ it's safe to run during development.
 from datetime import datetime
 from typing import List
 
+from models.batch import ITTicketBatch, IncidentBatch
 from models.dataset import Dataset
 from models.it_ticket import ITTicket
 from models.security_incident import SecurityIncident
@@ -78,19 +79,18 @@ def apply_to_db(db_path: str = "platform.db") -> None:
 				(d.get_id(), d.get_name(), d.get_description(), d.get_source()),
 			)
 
-		# it_tickets
-		for t in seeds["tickets"]:
-			cur.execute(
-				"INSERT OR REPLACE INTO it_tickets (ticket_id, title, description, status, created_at, reporter, assigned_to) VALUES (?, ?, ?, ?, ?, ?, ?)",
-				(t.get_id(), t.get_title(), t.get_description(), t.get_status(), t.get_created_at().isoformat(), t.get_reporter(), t.get_assigned_to()),
-			)
-
-		# incidents
-		for i in seeds["incidents"]:
-			cur.execute(
-				"INSERT OR REPLACE INTO security_incidents (incident_id, incident_type, severity, description, reported_at) VALUES (?, ?, ?, ?, ?)",
-				(i.get_id(), i.get_type(), i.get_severity(), i.get_description(), i.get_reported_at().isoformat()),
-			)
+		# it_tickets / incidents: one executemany per table from the columnar batches
+		tickets = ITTicketBatch.from_tickets(seeds["tickets"])
+		cur.executemany(
+			"INSERT OR REPLACE INTO it_tickets (ticket_id, title, description, status, created_at, reporter, assigned_to) VALUES (?, ?, ?, ?, ?, ?, ?)",
+			tickets.to_records(),
+		)
+
+		incidents = IncidentBatch.from_incidents(seeds["incidents"])
+		cur.executemany(
+			"INSERT OR REPLACE INTO security_incidents (incident_id, incident_type, severity, description, reported_at) VALUES (?, ?, ?, ?, ?)",
+			incidents.to_records(),
+		)
 
 		conn.commit()
 	finally:
@@ -0,0 +1,68 @@
+"""Bulk import user accounts into the users table.
+
+Reads users.txt-style lines (username,password_or_hash[,role]) or a
+users.json {username: password} file, hashes plaintext passwords in a
+process pool and upserts in batched transactions. Rows that can't be
+imported are listed in a reject report.
+
+    python import_users.py SOURCE [--rejects rejects.csv] [--skip-existing]
+                                  [--batch 2000] [--workers N] [--rounds 12] [--db PATH]
+    python import_users.py --generate 100000 accounts.txt   # synthetic test file
+"""
+import argparse
+import random
+import string
+import sys
+
+from app.data.db import DB_PATH
+from app.services.user_import import BATCH_SIZE, import_users
+
+
+def generate(n, path):
+    """Write n synthetic accounts (plaintext passwords) plus a few bad rows."""
+    rnd = random.Random(11)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("username,password,role\n")
+        for i in range(n):
+            password = "".join(rnd.choices(string.ascii_letters + string.digits, k=12))
+            f.write(f"user{i:07d},{password},{'admin' if i % 500 == 0 else 'user'}\n")
+        f.write("user0000001,again,user\n")   # duplicate
+        f.write("bad name,secret,user\n")     # invalid username
+        f.write("nopassword,,user\n")         # missing password
+    print(f"wrote {n:,} accounts to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", nargs="?")
+    parser.add_argument("--rejects", default="import_rejects.csv", help="reject report (CSV)")
+    parser.add_argument("--skip-existing", action="store_true", help="leave existing users unchanged")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="rows per transaction")
+    parser.add_argument("--workers", type=int, default=None, help="hashing processes (default: CPUs)")
+    parser.add_argument("--rounds", type=int, default=None, help="bcrypt cost for plaintext passwords")
+    parser.add_argument("--db", default=str(DB_PATH))
+    parser.add_argument("--generate", type=int, metavar="N", help="write N synthetic accounts to SOURCE and exit")
+    args = parser.parse_args()
+
+    if not args.source:
+        parser.error("SOURCE is required")
+    if args.generate:
+        generate(args.generate, args.source)
+        return 0
+
+    def progress(stats):
+        rate = stats.read / stats.elapsed if stats.elapsed else 0
+        print(f"\r{stats.read:,} rows, {rate:,.0f} rows/s", end="", file=sys.stderr, flush=True)
+
+    stats = import_users(args.source, rejects_path=args.rejects, update_existing=not args.skip_existing,
+                         batch_size=args.batch, workers=args.workers, rounds=args.rounds,
+                         db_path=args.db, progress=progress)
+    print(file=sys.stderr)
+    print(stats.summary())
+    if stats.rejected:
+        print(f"rejected rows listed in {args.rejects}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
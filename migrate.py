@@ -0,0 +1,43 @@
+"""Bring the canonical database (DATA/intelligence_platform.db) up to date.
+
+Applies pending migrations from app.data.migrations, recording each in the
+schema_version table with its duration. Migration 3 copies the legacy
+database files (platform.db, flatform.db, DATA/incidents.db,
+DATA/cyber_incidents.db) in; --reimport copies rows added to them since.
+
+    python migrate.py [--db PATH] [--target N] [--reimport] [--status]
+"""
+import argparse
+import time
+
+from app.data.db import DB_PATH, connect_database
+from app.data.migrations import MIGRATIONS, current_version, import_legacy, migrate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=str(DB_PATH))
+    parser.add_argument("--target", type=int, help="stop after this migration version")
+    parser.add_argument("--reimport", action="store_true", help="copy new rows from the legacy files again")
+    parser.add_argument("--status", action="store_true", help="only show the applied migrations")
+    args = parser.parse_args()
+
+    conn = connect_database(args.db)
+    try:
+        if not args.status:
+            t = time.perf_counter()
+            applied = migrate(target=args.target, conn=conn)
+            if args.reimport and current_version(conn) >= 3:
+                import_legacy(conn)
+            print(f"{len(applied)} migration(s) applied in {time.perf_counter() - t:.2f}s")
+
+        print(f"\n{args.db} is at version {current_version(conn)} of {MIGRATIONS[-1][0]}")
+        for version, name, applied_at, seconds in conn.execute(
+                "SELECT version, name, applied_at, seconds FROM schema_version ORDER BY version"):
+            print(f"  {version:3d}  {name:28s} {applied_at}  {seconds:.2f}s")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,627 @@
+"""Columnar containers for large numbers of tickets and incidents.
+
+`ITTicketBatch` and `IncidentBatch` keep one column per attribute instead
+of one object per record (struct-of-arrays):
+
+	- free text (ids, titles, descriptions) lives in plain lists,
+	- low-cardinality values (status, severity, type, people) are
+	  dictionary-encoded: a small integer code per row plus one copy of
+	  each distinct value,
+	- timestamps are int64 microseconds since the epoch (naive UTC, like
+	  `datetime.utcnow()` in the model classes).
+
+Indexing or iterating a batch yields lightweight row views with the same
+getters as `ITTicket` / `SecurityIncident`, so code written against the
+model classes keeps working while a million rows cost a fraction of the
+memory.
+
+Batches load straight from DataFrames, CSV files and SQLite cursors, and
+export whole columns at a time to tuples (`to_records`), JSON lines, CSV
+and Arrow without building a dict per row.
+"""
+
+import csv
+import json
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any
+
+import numpy as np
+import pandas as pd
+
+try:
+	import pyarrow as pa
+except ImportError:  # optional: only needed for to_arrow()/write_arrow()
+	pa = None
+
+_EPOCH = datetime(1970, 1, 1)
+_INITIAL_CAPACITY = 1024
+
+# model attribute -> CSV column, for the files in DATA/
+TICKET_CSV_COLUMNS = {
+	"ticket_id": "ticket_id",
+	"title": "subject",
+	"description": "description",
+	"status": "status",
+	"created_at": "created_date",
+	"assigned_to": "assigned_to",
+}
+INCIDENT_CSV_COLUMNS = {
+	"incident_id": "incident_id",
+	"incident_type": "title",
+	"severity": "severity",
+	"reported_at": "incident_date",
+}
+
+# model attribute -> column of the app's SQLite tables (app/data/schema.py)
+TICKET_DB_COLUMNS = {
+	"ticket_id": "id",
+	"title": "title",
+	"status": "status",
+	"created_at": "created_date",
+}
+INCIDENT_DB_COLUMNS = {
+	"incident_id": "id",
+	"incident_type": "title",
+	"severity": "severity",
+	"reported_at": "date",
+}
+
+FETCH_SIZE = 50_000        # cursor rows per fetchmany() in from_cursor()
+WRITE_CHUNK = 100_000      # rows serialized per write in to_jsonl()/to_csv()
+
+_dumps = json.JSONEncoder().encode
+_dump_str = json.encoder.encode_basestring_ascii  # C fast path for str values
+
+
+# COLUMNS
+
+
+class _ObjectColumn:
+	"""Arbitrary values (mostly strings) in a list."""
+
+	__slots__ = ("data",)
+
+	def __init__(self):
+		self.data = []
+
+	def reserve(self, n):
+		pass
+
+	def append(self, i, value):
+		if i < len(self.data):
+			self.data[i] = value
+		else:
+			self.data.append(value)
+
+	def extend(self, start, values):
+		self.data[start:] = values
+
+	def truncate(self, n):
+		del self.data[n:]
+
+	def get(self, i):
+		return self.data[i]
+
+	def set(self, i, value):
+		self.data[i] = value
+
+	def values(self, n):
+		return np.asarray(self.data[:n], dtype=object)
+
+	def series(self, n):
+		return pd.Series(self.data[:n], dtype=object)
+
+	# bulk serialization over rows [start, stop)
+	def json(self, start, stop):
+		return [_dump_str(v) if v.__class__ is str else _dumps(v) for v in self.data[start:stop]]
+
+	def text(self, start, stop):
+		return self.data[start:stop]
+
+	def arrow(self, n):
+		return pa.array(self.data[:n])
+
+
+class _NumpyColumn:
+	"""Base for columns kept in a growable numpy array."""
+
+	__slots__ = ("array",)
+	dtype = np.int64
+
+	def __init__(self):
+		self.array = np.zeros(_INITIAL_CAPACITY, dtype=self.dtype)
+
+	def reserve(self, n):
+		if n > len(self.array):
+			grown = np.zeros(max(n, 2 * len(self.array)), dtype=self.array.dtype)
+			grown[:len(self.array)] = self.array
+			self.array = grown
+
+	def truncate(self, n):
+		pass  # rows past n are overwritten by the next append/extend
+
+
+class _CodedColumn(_NumpyColumn):
+	"""Dictionary-encoded values: codes[i] indexes into self.categories."""
+
+	__slots__ = ("categories", "lookup")
+
+	def __init__(self, dtype=np.uint8):
+		self.array = np.zeros(_INITIAL_CAPACITY, dtype=dtype)
+		self.categories = []
+		self.lookup = {}
+
+	def code(self, value) -> int:
+		code = self.lookup.get(value)
+		if code is None:
+			code = len(self.categories)
+			if code > np.iinfo(self.array.dtype).max:
+				raise ValueError(f"more than {code} distinct values for a {self.array.dtype} coded column")
+			self.lookup[value] = code
+			self.categories.append(value)
+		return code
+
+	def append(self, i, value):
+		self.array[i] = self.code(value)
+
+	def extend(self, start, values):
+		codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+		remap = np.array([self.code(None if pd.isna(u) else u) for u in uniques], dtype=self.array.dtype)
+		self.array[start:start + len(codes)] = remap[codes]
+
+	def get(self, i):
+		return self.categories[self.array[i]]
+
+	def set(self, i, value):
+		self.array[i] = self.code(value)
+
+	def codes(self, n):
+		return self.array[:n]
+
+	def values(self, n):
+		return np.asarray(self.categories, dtype=object)[self.array[:n]]
+
+	def series(self, n):
+		# None has no place in a Categorical's categories: map it to code -1 (NaN)
+		codes = self.array[:n].astype(np.int32)
+		if None in self.lookup:
+			none = self.lookup[None]
+			codes[codes == none] = -1
+			codes[codes > none] -= 1
+		cats = [c for c in self.categories if c is not None]
+		return pd.Series(pd.Categorical.from_codes(codes, categories=cats))
+
+	def json(self, start, stop):
+		# each distinct value is encoded once
+		return np.asarray([_dumps(c) for c in self.categories], dtype=object)[self.array[start:stop]]
+
+	def text(self, start, stop):
+		return np.asarray(self.categories, dtype=object)[self.array[start:stop]]
+
+	def arrow(self, n):
+		codes = self.array[:n].astype(np.int32)
+		# None lives in the validity bitmap, not as a dictionary lookup
+		nulls = codes == self.lookup[None] if None in self.lookup else None
+		return pa.DictionaryArray.from_arrays(pa.array(codes, mask=nulls), pa.array(self.categories))
+
+
+class _TimeColumn(_NumpyColumn):
+	"""Timestamps as int64 microseconds since the epoch."""
+
+	__slots__ = ()
+	dtype = np.int64
+
+	@staticmethod
+	def to_micros(value) -> int:
+		if value is None:
+			value = datetime.utcnow()
+		elif isinstance(value, str):
+			value = datetime.fromisoformat(value)
+		return (value - _EPOCH) // timedelta(microseconds=1)
+
+	def append(self, i, value):
+		self.array[i] = self.to_micros(value)
+
+	def extend(self, start, values):
+		if not isinstance(values, pd.Series):
+			values = pd.Series(values, dtype=object)
+		parsed = pd.to_datetime(values, errors="coerce", format="ISO8601")
+		retry = parsed.isna() & values.notna()
+		if retry.any():  # not ISO 8601 (e.g. 11/20/2025): let pandas infer per value
+			parsed[retry] = pd.to_datetime(values[retry], errors="coerce", format="mixed")
+		micros = parsed.to_numpy(dtype="datetime64[us]").astype(np.int64)
+		micros[parsed.isna().to_numpy()] = self.to_micros(None)
+		self.array[start:start + len(values)] = micros
+
+	def get(self, i):
+		return _EPOCH + timedelta(microseconds=int(self.array[i]))
+
+	def set(self, i, value):
+		self.array[i] = self.to_micros(value)
+
+	def values(self, n):
+		return self.array[:n].astype("datetime64[us]")
+
+	def series(self, n):
+		return pd.Series(self.values(n))
+
+	def isoformat(self, start, stop):
+		"""datetime.isoformat() of every row, vectorized (no microseconds when they are 0)."""
+		micros = self.array[start:stop]
+		full = np.datetime_as_string(micros.astype("datetime64[us]"), unit="us")
+		whole = np.datetime_as_string(micros.astype("datetime64[us]"), unit="s")
+		return np.where(micros % 1_000_000 == 0, whole, full).astype(object)
+
+	def json(self, start, stop):
+		return '"' + self.isoformat(start, stop) + '"'
+
+	def text(self, start, stop):
+		return self.isoformat(start, stop)
+
+	def arrow(self, n):
+		return pa.array(self.array[:n], type=pa.int64()).cast(pa.timestamp("us"))
+
+
+# BATCHES
+
+
+class _RecordBatch:
+	"""Shared storage logic; subclasses define FIELDS and VIEW."""
+
+	FIELDS = ()          # (attribute name, column factory) in constructor order
+	VIEW = None
+
+	def __init__(self):
+		self._n = 0
+		self._capacity = _INITIAL_CAPACITY
+		self._columns = {name: factory() for name, factory in self.FIELDS}
+		self._column_list = list(self._columns.values())
+
+	def _reserve(self, n):
+		for col in self._column_list:
+			col.reserve(n)
+		self._capacity = max(self._capacity, n)
+
+	def _truncate(self):
+		for col in self._column_list:
+			col.truncate(self._n)
+
+	def __len__(self) -> int:
+		return self._n
+
+	def __getitem__(self, i: int):
+		if i < 0:
+			i += self._n
+		if not 0 <= i < self._n:
+			raise IndexError(f"{type(self).__name__} index out of range")
+		return self.VIEW(self, i)
+
+	def __iter__(self):
+		view = self.VIEW
+		for i in range(self._n):
+			yield view(self, i)
+
+	def _append(self, values) -> int:
+		i = self._n
+		if i >= self._capacity:
+			self._reserve(max(i + 1, 2 * self._capacity))
+		try:
+			for col, value in zip(self._column_list, values):
+				col.append(i, value)
+		except Exception:
+			self._truncate()
+			raise
+		self._n = i + 1
+		return i
+
+	def extend_columns(self, columns: Dict[str, Any]):
+		"""Append many rows given as {attribute: sequence}; missing attributes get their defaults."""
+		lengths = {len(v) for v in columns.values()}
+		if len(lengths) != 1:
+			raise ValueError("columns must all have the same length")
+		count = lengths.pop()
+		unknown = set(columns) - set(self._columns)
+		if unknown:
+			raise ValueError(f"unknown columns: {sorted(unknown)}")
+		start = self._n
+		self._reserve(start + count)
+		try:
+			for name, col in self._columns.items():
+				values = columns.get(name)
+				if values is None:
+					values = [self.DEFAULTS.get(name)] * count
+				col.extend(start, values)
+		except Exception:
+			# a later column failed (e.g. too many distinct values): drop
+			# what the earlier ones already took so every column has _n rows
+			self._truncate()
+			raise
+		self._n = start + count
+
+	def column(self, name: str):
+		"""Decoded values of one attribute as a numpy array."""
+		return self._columns[name].values(self._n)
+
+	def counts(self, name: str) -> Dict[Any, int]:
+		"""{value: rows} for a dictionary-encoded attribute."""
+		col = self._columns[name]
+		tally = np.bincount(col.codes(self._n), minlength=len(col.categories))
+		return {value: int(c) for value, c in zip(col.categories, tally) if c}
+
+	def where(self, name: str, value) -> np.ndarray:
+		"""Row indices whose dictionary-encoded attribute equals value."""
+		col = self._columns[name]
+		code = col.lookup.get(value)
+		if code is None:
+			return np.empty(0, dtype=np.int64)
+		return np.flatnonzero(col.codes(self._n) == code)
+
+	def to_frame(self) -> pd.DataFrame:
+		"""pandas DataFrame (coded attributes become Categoricals)."""
+		return pd.DataFrame({name: col.series(self._n) for name, col in self._columns.items()})
+
+	@classmethod
+	def from_frame(cls, df: pd.DataFrame, columns: Optional[Dict[str, str]] = None):
+		"""
+		Build a batch from a DataFrame.
+		:param columns: {attribute: DataFrame column}; default: attributes with the same name
+		"""
+		columns = columns or {name: name for name, _ in cls.FIELDS if name in df.columns}
+		batch = cls()
+		batch.extend_columns({
+			attr: df[col].astype(object).where(df[col].notna(), None).reset_index(drop=True)
+			if not isinstance(batch._columns[attr], _TimeColumn) else df[col].reset_index(drop=True)
+			for attr, col in columns.items()
+		})
+		return batch
+
+	@classmethod
+	def from_cursor(cls, cursor, columns: Optional[Dict[str, str]] = None, fetch_size: int = FETCH_SIZE):
+		"""
+		Build a batch from an executed sqlite3 cursor, fetch_size rows at a time.
+		:param columns: {attribute: result column}; default: attributes with the same name
+		"""
+		names = [d[0] for d in cursor.description]
+		columns = columns or {name: name for name, _ in cls.FIELDS if name in names}
+		positions = {attr: names.index(col) for attr, col in columns.items()}
+		batch = cls()
+		while True:
+			rows = cursor.fetchmany(fetch_size)
+			if not rows:
+				break
+			transposed = list(zip(*rows))
+			batch.extend_columns({attr: transposed[pos] for attr, pos in positions.items()})
+		return batch
+
+	# BULK SERIALIZATION
+	# Whole columns are encoded at once (distinct values of coded columns once,
+	# timestamps with numpy) and joined into rows, so no per-row dicts or
+	# isoformat() calls are made. Output matches to_dict() of the row views.
+
+	def _chunks(self, chunk):
+		for start in range(0, self._n, chunk):
+			yield start, min(start + chunk, self._n)
+
+	def to_records(self, names=None):
+		"""
+		Rows as tuples (timestamps as isoformat strings), e.g. for executemany().
+		:param names: attributes to include, in order (default: all)
+		"""
+		names = names or list(self._columns)
+		for start, stop in self._chunks(WRITE_CHUNK):
+			yield from zip(*(self._columns[name].text(start, stop) for name in names))
+
+	def to_jsonl(self, f, chunk: int = WRITE_CHUNK) -> int:
+		"""Write one JSON object per line (same keys as to_dict()) to a text file; returns rows."""
+		names = list(self._columns)
+		template = "{" + ", ".join(_dumps(name) + ": %s" for name in names) + "}"
+		for start, stop in self._chunks(chunk):
+			encoded = zip(*(self._columns[name].json(start, stop) for name in names))
+			f.write("\n".join(map(template.__mod__, encoded)) + "\n")
+		return self._n
+
+	def to_csv(self, f, chunk: int = WRITE_CHUNK) -> int:
+		"""Write a CSV with a header row (timestamps as isoformat, None as empty) to a text file; returns rows."""
+		names = list(self._columns)
+		writer = csv.writer(f, lineterminator="\n")
+		writer.writerow(names)
+		for start, stop in self._chunks(chunk):
+			writer.writerows(zip(*(self._columns[name].text(start, stop) for name in names)))
+		return self._n
+
+	def to_arrow(self):
+		"""pyarrow Table: coded attributes as dictionary arrays, timestamps as timestamp[us]."""
+		if pa is None:
+			raise ImportError("pyarrow is required for Arrow export (pip install pyarrow)")
+		return pa.table({name: col.arrow(self._n) for name, col in self._columns.items()})
+
+	def write_arrow(self, path) -> int:
+		"""Write the batch as an Arrow IPC (Feather v2) file; returns rows."""
+		table = self.to_arrow()
+		with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+			writer.write_table(table)
+		return self._n
+
+
+class _RowView:
+	"""One row of a batch; reads and writes go straight to the columns."""
+
+	__slots__ = ("_batch", "_i")
+
+	def __init__(self, batch, i):
+		self._batch = batch
+		self._i = i
+
+	def _get(self, name):
+		return self._batch._columns[name].get(self._i)
+
+	def _set(self, name, value):
+		self._batch._columns[name].set(self._i, value)
+
+
+class ITTicketView(_RowView):
+	"""Row of an ITTicketBatch with the ITTicket interface."""
+
+	__slots__ = ()
+
+	def get_id(self) -> str:
+		return self._get("ticket_id")
+
+	def get_title(self) -> str:
+		return self._get("title")
+
+	def get_description(self) -> str:
+		return self._get("description")
+
+	def get_status(self) -> str:
+		return self._get("status")
+
+	def get_created_at(self) -> datetime:
+		return self._get("created_at")
+
+	def get_reporter(self) -> Optional[str]:
+		return self._get("reporter")
+
+	def get_assigned_to(self) -> Optional[str]:
+		return self._get("assigned_to")
+
+	def set_status(self, new_status: str):
+		self._set("status", new_status)
+
+	def assign_to(self, assignee: str):
+		self._set("assigned_to", assignee)
+
+	def to_dict(self) -> Dict[str, Any]:
+		return {
+			"ticket_id": self.get_id(),
+			"title": self.get_title(),
+			"description": self.get_description(),
+			"status": self.get_status(),
+			"created_at": self.get_created_at().isoformat(),
+			"reporter": self.get_reporter(),
+			"assigned_to": self.get_assigned_to(),
+		}
+
+	def __str__(self) -> str:
+		return f"ITTicket(id={self.get_id()}, title={self.get_title()}, status={self.get_status()})"
+
+
+class IncidentView(_RowView):
+	"""Row of an IncidentBatch with the SecurityIncident interface."""
+
+	__slots__ = ()
+
+	def get_id(self) -> str:
+		return self._get("incident_id")
+
+	def get_type(self) -> str:
+		return self._get("incident_type")
+
+	def get_severity(self) -> str:
+		return self._get("severity")
+
+	def get_description(self) -> Optional[str]:
+		return self._get("description")
+
+	def get_reported_at(self) -> datetime:
+		return self._get("reported_at")
+
+	def to_dict(self) -> Dict[str, Any]:
+		return {
+			"incident_id": self.get_id(),
+			"incident_type": self.get_type(),
+			"severity": self.get_severity(),
+			"description": self.get_description(),
+			"reported_at": self.get_reported_at().isoformat(),
+		}
+
+	def __str__(self) -> str:
+		return f"SecurityIncident(id={self.get_id()}, type={self.get_type()}, severity={self.get_severity()})"
+
+
+class ITTicketBatch(_RecordBatch):
+	"""Many IT tickets in columns; rows are ITTicketView objects."""
+
+	FIELDS = (
+		("ticket_id", _ObjectColumn),
+		("title", _ObjectColumn),
+		("description", _ObjectColumn),
+		("status", _CodedColumn),
+		("created_at", _TimeColumn),
+		("reporter", lambda: _CodedColumn(np.int32)),
+		("assigned_to", lambda: _CodedColumn(np.int32)),
+	)
+	DEFAULTS = {"status": "open"}
+	VIEW = ITTicketView
+
+	def append(self, ticket_id: str, title: str, description: str,
+			   status: str = "open", created_at: Optional[datetime] = None,
+			   reporter: Optional[str] = None, assigned_to: Optional[str] = None) -> int:
+		"""Add one ticket (same arguments as ITTicket); returns its row index."""
+		return self._append((ticket_id, title, description, status, created_at, reporter, assigned_to))
+
+	@classmethod
+	def from_tickets(cls, tickets):
+		"""Batch holding copies of ITTicket-like objects."""
+		batch = cls()
+		for t in tickets:
+			batch.append(t.get_id(), t.get_title(), t.get_description(), t.get_status(),
+						 t.get_created_at(), t.get_reporter(), t.get_assigned_to())
+		return batch
+
+	@classmethod
+	def read_csv(cls, path, columns: Dict[str, str] = TICKET_CSV_COLUMNS):
+		"""Batch from an it_tickets CSV (see TICKET_CSV_COLUMNS)."""
+		df = pd.read_csv(path, usecols=list(columns.values()), skip_blank_lines=True)
+		return cls.from_frame(df, columns)
+
+	@classmethod
+	def read_db(cls, conn, columns: Dict[str, str] = TICKET_DB_COLUMNS):
+		"""Batch from the app's it_tickets table (see TICKET_DB_COLUMNS)."""
+		select = ", ".join(columns.values())
+		return cls.from_cursor(conn.execute(f"SELECT {select} FROM it_tickets ORDER BY id"), columns)
+
+	def status_counts(self) -> Dict[str, int]:
+		return self.counts("status")
+
+
+class IncidentBatch(_RecordBatch):
+	"""Many security incidents in columns; rows are IncidentView objects."""
+
+	FIELDS = (
+		("incident_id", _ObjectColumn),
+		("incident_type", lambda: _CodedColumn(np.int32)),
+		("severity", _CodedColumn),
+		("description", _ObjectColumn),
+		("reported_at", _TimeColumn),
+	)
+	DEFAULTS = {}
+	VIEW = IncidentView
+
+	def append(self, incident_id: str, incident_type: str, severity: str,
+			   description: Optional[str] = None, reported_at: Optional[datetime] = None) -> int:
+		"""Add one incident (same arguments as SecurityIncident); returns its row index."""
+		return self._append((incident_id, incident_type, severity, description, reported_at))
+
+	@classmethod
+	def from_incidents(cls, incidents):
+		"""Batch holding copies of SecurityIncident-like objects."""
+		batch = cls()
+		for s in incidents:
+			batch.append(s.get_id(), s.get_type(), s.get_severity(), s.get_description(), s.get_reported_at())
+		return batch
+
+	@classmethod
+	def read_csv(cls, path, columns: Dict[str, str] = INCIDENT_CSV_COLUMNS):
+		"""Batch from a cyber_incidents CSV (see INCIDENT_CSV_COLUMNS)."""
+		df = pd.read_csv(path, usecols=list(columns.values()))
+		return cls.from_frame(df, columns)
+
+	@classmethod
+	def read_db(cls, conn, columns: Dict[str, str] = INCIDENT_DB_COLUMNS):
+		"""Batch from the app's cyber_incidents table (see INCIDENT_DB_COLUMNS)."""
+		select = ", ".join(columns.values())
+		return cls.from_cursor(conn.execute(f"SELECT {select} FROM cyber_incidents ORDER BY id"), columns)
+
+	def severity_counts(self) -> Dict[str, int]:
+		return self.counts("severity")
@@ -3,29 +3,33 @@
 The class follows the pattern used in the Car/Vehicle example: private
 attributes, accessor methods (getters), a `to_dict` serializer and a
 user-friendly `__str__`.
+`CompactDataset` / `FrozenDataset` keep the same interface in `__slots__`.
 """
 
-from typing import Optional, Dict, Any
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Mapping
 
+from .frozen import FrozenMixin, private_slots
 
-class Dataset:
-	"""Represents a dataset in the system.
+_EMPTY = MappingProxyType({})
 
-	Attributes (private):
-		__dataset_id: unique identifier for the dataset
-		__name: human readable name
-		__description: optional description
-		__source: optional source (file, url, owner)
-		__metadata: optional metadata dictionary
+
+class _DatasetRecord:
+	"""Getters and serialization of Dataset and CompactDataset; subclasses choose the storage.
+
+	The metadata dict is only created when first asked for, so datasets
+	without metadata don't each carry an empty dict.
 	"""
 
+	__slots__ = ()
+
 	def __init__(self, dataset_id: str, name: str, description: Optional[str] = None,
 				 source: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None):
 		self.__dataset_id = dataset_id
 		self.__name = name
 		self.__description = description
 		self.__source = source
-		self.__metadata = metadata or {}
+		self.__metadata = metadata or None
 
 	# Accessors
 	def get_id(self) -> str:
@@ -41,6 +45,8 @@ class Dataset:
 		return self.__source
 
 	def get_metadata(self) -> Dict[str, Any]:
+		if self.__metadata is None:
+			self.__metadata = {}
 		return self.__metadata
 
 	# Utility
@@ -50,8 +56,42 @@ class Dataset:
 			"name": self.__name,
 			"description": self.__description,
 			"source": self.__source,
-			"metadata": self.__metadata,
+			"metadata": dict(self.__metadata) if self.__metadata else {},
 		}
 
 	def __str__(self) -> str:
 		return f"Dataset(id={self.__dataset_id}, name={self.__name})"
+
+
+class Dataset(_DatasetRecord):
+	"""Represents a dataset in the system.
+
+	Attributes (private):
+		__dataset_id: unique identifier for the dataset
+		__name: human readable name
+		__description: optional description
+		__source: optional source (file, url, owner)
+		__metadata: optional metadata dictionary
+	"""
+
+
+class CompactDataset(_DatasetRecord):
+	"""Same interface as Dataset, stored in ``__slots__``."""
+
+	__slots__ = private_slots(_DatasetRecord, "dataset_id", "name", "description", "source", "metadata")
+
+
+class FrozenDataset(FrozenMixin, CompactDataset):
+	"""Read-only CompactDataset; its metadata is a read-only mapping."""
+
+	__slots__ = ("_sealed",)
+
+	def __init__(self, dataset_id: str, name: str, description: Optional[str] = None,
+				 source: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None):
+		self._unseal()
+		super().__init__(dataset_id, name, description, source,
+						 MappingProxyType(dict(metadata)) if metadata else None)
+		self._seal()
+
+	def get_metadata(self) -> Mapping[str, Any]:
+		return self._DatasetRecord__metadata or _EMPTY
@@ -0,0 +1,39 @@
+"""Shared helpers for the compact and frozen model variants.
+
+Each model keeps its getters and serialization in a private base class
+with empty ``__slots__``; the public class adds a per-instance dict and
+the compact class declares ``private_slots(...)`` of that base.
+
+A frozen record is a slotted record whose attributes can't be changed once
+its constructor has run. Subclasses list ``_sealed`` in their own
+``__slots__``, call ``_unseal()`` first thing in ``__init__`` and
+``_seal()`` at the end.
+"""
+
+
+def private_slots(owner: type, *names: str) -> tuple:
+	"""Slot names for ``self.__name`` attributes assigned in owner's methods (name-mangled)."""
+	return tuple(f"_{owner.__name__.lstrip('_')}__{name}" for name in names)
+
+
+class FrozenMixin:
+	"""Blocks attribute assignment and deletion after ``_seal()``."""
+
+	__slots__ = ()
+
+	def _unseal(self):
+		# set before anything else so __setattr__ reads a slot instead of catching AttributeError
+		object.__setattr__(self, "_sealed", False)
+
+	def _seal(self):
+		object.__setattr__(self, "_sealed", True)
+
+	def __setattr__(self, name, value):
+		if self._sealed:
+			raise AttributeError(f"{type(self).__name__} is frozen")
+		object.__setattr__(self, name, value)
+
+	def __delattr__(self, name):
+		if self._sealed:
+			raise AttributeError(f"{type(self).__name__} is frozen")
+		object.__delattr__(self, name)
@@ -1,14 +1,20 @@
 """IT ticket model implemented as a class.
 
 Provides private attributes, getters, `to_dict`, and `__str__`.
+`CompactITTicket` / `FrozenITTicket` keep the same interface in `__slots__`
+for code that holds many tickets at once (see also `models.batch`).
 """
 
 from typing import Optional, Dict, Any
 from datetime import datetime
 
+from .frozen import FrozenMixin, private_slots
 
-class ITTicket:
-	"""Represents an IT support ticket."""
+
+class _ITTicketRecord:
+	"""Getters, setters and serialization of ITTicket and CompactITTicket; subclasses choose the storage."""
+
+	__slots__ = ()
 
 	def __init__(self, ticket_id: str, title: str, description: str,
 				 status: str = "open", created_at: Optional[datetime] = None,
@@ -65,3 +71,24 @@ class ITTicket:
 	def __str__(self) -> str:
 		return f"ITTicket(id={self.__ticket_id}, title={self.__title}, status={self.__status})"
 
+
+class ITTicket(_ITTicketRecord):
+	"""Represents an IT support ticket."""
+
+
+class CompactITTicket(_ITTicketRecord):
+	"""Same interface as ITTicket, stored in ``__slots__`` (no per-instance dict)."""
+
+	__slots__ = private_slots(_ITTicketRecord, "ticket_id", "title", "description", "status", "created_at",
+							  "reporter", "assigned_to")
+
+
+class FrozenITTicket(FrozenMixin, CompactITTicket):
+	"""Read-only CompactITTicket: set_status/assign_to raise AttributeError."""
+
+	__slots__ = ("_sealed",)
+
+	def __init__(self, *args, **kwargs):
+		self._unseal()
+		super().__init__(*args, **kwargs)
+		self._seal()
@@ -1,14 +1,20 @@
 """Security incident model implemented as a class.
 
 Includes private attributes, getters, a `to_dict` method and `__str__`.
+`CompactSecurityIncident` / `FrozenSecurityIncident` keep the same interface in
+`__slots__` (see also `models.batch.IncidentBatch`).
 """
 
 from typing import Optional, Dict, Any
 from datetime import datetime
 
+from .frozen import FrozenMixin, private_slots
 
-class SecurityIncident:
-	"""Represents a security/cyber incident."""
+
+class _SecurityIncidentRecord:
+	"""Getters and serialization of SecurityIncident and CompactSecurityIncident; subclasses choose the storage."""
+
+	__slots__ = ()
 
 	def __init__(self, incident_id: str, incident_type: str, severity: str,
 				 description: Optional[str] = None, reported_at: Optional[datetime] = None):
@@ -46,3 +52,24 @@ class SecurityIncident:
 	def __str__(self) -> str:
 		return f"SecurityIncident(id={self.__incident_id}, type={self.__incident_type}, severity={self.__severity})"
 
+
+class SecurityIncident(_SecurityIncidentRecord):
+	"""Represents a security/cyber incident."""
+
+
+class CompactSecurityIncident(_SecurityIncidentRecord):
+	"""Same interface as SecurityIncident, stored in ``__slots__``."""
+
+	__slots__ = private_slots(_SecurityIncidentRecord, "incident_id", "incident_type", "severity",
+							  "description", "reported_at")
+
+
+class FrozenSecurityIncident(FrozenMixin, CompactSecurityIncident):
+	"""Read-only CompactSecurityIncident."""
+
+	__slots__ = ("_sealed",)
+
+	def __init__(self, *args, **kwargs):
+		self._unseal()
+		super().__init__(*args, **kwargs)
+		self._seal()
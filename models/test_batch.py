@@ -0,0 +1,107 @@
+# test_batch.py
+import csv
+import io
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.batch import IncidentBatch, ITTicketBatch
+from models.it_ticket import ITTicket
+from models.security_incident import SecurityIncident
+
+STATUSES = ["open", "in_progress", "resolved", "closed"]
+PEOPLE = [None, "Ayesha", "Jöhn \"JJ\"", "Omar, O."]
+
+
+def ticket_rows(n=500):
+    # None values, quotes, commas, newlines, whole-second and fractional timestamps
+    start = datetime(2024, 1, 1)
+    return [(f"TCK{i:07d}", f"ticket {i}", None if i % 7 == 0 else f"line one\nline \"two\" {i}",
+             STATUSES[i % 4], start + timedelta(seconds=i, microseconds=(i % 3) * 250),
+             PEOPLE[i % 4], PEOPLE[(i + 1) % 4]) for i in range(n)]
+
+
+def incident_rows(n=300):
+    return [(f"CI{i}", ["phishing", "malware"][i % 2], ["low", "high", None][i % 3],
+             None if i % 4 else "desc", datetime(2025, 1, 1, 12, 30, 0, i)) for i in range(n)]
+
+
+@pytest.fixture
+def tickets():
+    rows = ticket_rows()
+    batch = ITTicketBatch()
+    for row in rows:
+        batch.append(*row)
+    return batch, [ITTicket(*row).to_dict() for row in rows]
+
+
+@pytest.fixture
+def incidents():
+    rows = incident_rows()
+    batch = IncidentBatch()
+    for row in rows:
+        batch.append(*row)
+    return batch, [SecurityIncident(*row).to_dict() for row in rows]
+
+
+def test_failed_extend_leaves_batch_usable():
+    b = ITTicketBatch()
+    b.append("a", "t", "d")
+    b.append("b", "t", "d")
+    # the 257th distinct status overflows the uint8 status column after
+    # ticket_id, title and description already took their values
+    with pytest.raises(ValueError):
+        b.extend_columns({
+            "ticket_id": [f"x{i}" for i in range(300)],
+            "title": ["t"] * 300,
+            "description": ["d"] * 300,
+            "status": [f"s{i}" for i in range(300)],
+        })
+
+    assert len(b) == 2
+    assert b.append("c", "t", "d") == 2
+    assert b[2].get_id() == "c"
+    assert b.column("ticket_id").tolist() == ["a", "b", "c"]
+
+
+def test_views_match_model_to_dict(tickets, incidents):
+    for batch, expected in (tickets, incidents):
+        assert [row.to_dict() for row in batch] == expected
+
+
+def test_jsonl_matches_to_dict(tickets, incidents):
+    for batch, expected in (tickets, incidents):
+        buf = io.StringIO()
+        assert batch.to_jsonl(buf, chunk=128) == len(expected)
+        assert [json.loads(line) for line in buf.getvalue().splitlines()] == expected
+
+
+def test_csv_matches_to_dict(tickets):
+    batch, expected = tickets
+    buf = io.StringIO()
+    batch.to_csv(buf, chunk=128)
+    rows = list(csv.DictReader(io.StringIO(buf.getvalue())))
+    assert rows == [{k: "" if v is None else str(v) for k, v in d.items()} for d in expected]
+
+
+def test_records_and_from_cursor_round_trip(tickets):
+    batch, expected = tickets
+    assert [dict(zip(expected[0], r)) for r in batch.to_records()] == expected
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (ticket_id, title, description, status, created_at, reporter, assigned_to)")
+    conn.executemany("INSERT INTO t VALUES (?, ?, ?, ?, ?, ?, ?)", batch.to_records())
+    loaded = ITTicketBatch.from_cursor(conn.execute("SELECT * FROM t"), fetch_size=77)
+    assert [t.to_dict() for t in loaded] == expected
+
+
+@pytest.mark.parametrize("fixture, time_column", [("tickets", "created_at"), ("incidents", "reported_at")])
+def test_arrow_matches_to_dict(request, fixture, time_column):
+    pytest.importorskip("pyarrow")
+    batch, expected = request.getfixturevalue(fixture)
+    rows = batch.to_arrow().to_pylist()
+    for row in rows:
+        row[time_column] = row[time_column].isoformat()
+    assert rows == expected
@@ -1,13 +1,24 @@
 """User model implemented as a class.
 
 Private attributes, getters, `to_dict` and `__str__`.
+`CompactUser` / `FrozenUser` keep the same interface in `__slots__`.
 """
 
-from typing import Optional, Dict, Any
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Mapping
 
+from .frozen import FrozenMixin, private_slots
 
-class User:
-	"""Represents a user in the system."""
+_EMPTY = MappingProxyType({})
+
+
+class _UserRecord:
+	"""Getters and helpers of User and CompactUser; subclasses choose the storage.
+
+	The extra dict is only created when first asked for.
+	"""
+
+	__slots__ = ()
 
 	def __init__(self, user_id: str, username: str, email: Optional[str] = None,
 				 role: str = "user", active: bool = True, extra: Optional[Dict[str, Any]] = None):
@@ -16,7 +27,7 @@ class User:
 		self.__email = email
 		self.__role = role
 		self.__active = active
-		self.__extra = extra or {}
+		self.__extra = extra or None
 
 	# Accessors
 	def get_id(self) -> str:
@@ -35,6 +46,8 @@ class User:
 		return self.__active
 
 	def get_extra(self) -> Dict[str, Any]:
+		if self.__extra is None:
+			self.__extra = {}
 		return self.__extra
 
 	# Small helpers
@@ -51,9 +64,34 @@ class User:
 			"email": self.__email,
 			"role": self.__role,
 			"active": self.__active,
-			"extra": self.__extra,
+			"extra": dict(self.__extra) if self.__extra else {},
 		}
 
 	def __str__(self) -> str:
 		return f"User(id={self.__user_id}, username={self.__username}, role={self.__role})"
 
+
+class User(_UserRecord):
+	"""Represents a user in the system."""
+
+
+class CompactUser(_UserRecord):
+	"""Same interface as User, stored in ``__slots__``."""
+
+	__slots__ = private_slots(_UserRecord, "user_id", "username", "email", "role", "active", "extra")
+
+
+class FrozenUser(FrozenMixin, CompactUser):
+	"""Read-only CompactUser: activate/deactivate raise AttributeError."""
+
+	__slots__ = ("_sealed",)
+
+	def __init__(self, user_id: str, username: str, email: Optional[str] = None,
+				 role: str = "user", active: bool = True, extra: Optional[Dict[str, Any]] = None):
+		self._unseal()
+		super().__init__(user_id, username, email, role, active,
+						 MappingProxyType(dict(extra)) if extra else None)
+		self._seal()
+
+	def get_extra(self) -> Mapping[str, Any]:
+		return self._UserRecord__extra or _EMPTY
@@ -1,20 +1,16 @@
-import bcrypt
 import os
+
+from app.services import auth_service
  
 # Function to hash passwords
 def hash_password(plain_text_password):
-    """Hash a password for storing."""
-    password_bytes = plain_text_password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(password_bytes, salt)
-    return hashed_password.decode('utf-8')  # Convert bytes to string for storage
+    """Hash a password for storing (cost from the auth service policy)."""
+    return auth_service.hash_password(plain_text_password)
  
 # Function to verify passwords
-def verify_password(plain_text_password, hashed_password):
-    """Verify a stored password against one provided by user."""
-    password_bytes = plain_text_password.encode('utf-8')
-    hashed_bytes = hashed_password.encode('utf-8')
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
+def verify_password(plain_text_password, hashed_password, username=""):
+    """Verify a stored password against one provided by user (cached after a success)."""
+    return auth_service.verify_password(username, plain_text_password, hashed_password)
  
 # Function to register users
 def register_user(username, password):
@@ -36,7 +32,7 @@ def login_user(username, password):
         for line in f:
             stored_user, stored_hash = line.strip().split(",", 1)
             if stored_user == username:
-                return verify_password(password, stored_hash)
+                return verify_password(password, stored_hash, username)
     return False  # Username not found
 
 if __name__ == "__main__":